@@ -0,0 +1,94 @@
+"""Compare read_pdf_text's adaptive extraction (plain mode, layout mode only on pages that need
+it) with layout mode on every page, per PDF.
+
+    python benchmarks/bench_pdf_extraction.py [more.pdf ...]
+
+Runs on the bundled 2026 word lists plus any PDFs given. For each PDF it prints the best time
+of a few runs for both approaches, which mode each page used, and how many words only one of
+them extracts. (On the bundled elementary list that is 3 entries each way: layout mode pads
+them with text from the next column, e.g. "vice president   pronunciations and".)
+
+It then times the text steps after reading, on the PDFs' text repeated to TEXT_MB megabytes
+(about the size of a large upload): normalize_pdf_text, its hyphen collapse against the regex it
+replaced, and extract_words (numbered-entry tokenizing, dedupe and sort), in MB/s.
+"""
+import io
+import re
+import sys
+import time
+from pathlib import Path
+
+import pypdf
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+from pdf_extraction import (  # noqa: E402
+    _collapse_spaced_hyphens, extract_words, normalize_pdf_text, read_pdf_text,
+)
+
+RUNS = 3
+TEXT_MB = 5
+SPACED_HYPHEN_RE = re.compile(r'([^\W\d_])\s+-\s*([^\W\d_])')  # what _collapse_spaced_hyphens replaced
+
+
+def layout_only_text(pdf_bytes):
+    """The text as extracted before adaptive mode: layout mode on every page."""
+    reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+    text = "".join(page.extract_text(extraction_mode="layout") + "\n" for page in reader.pages)
+    return normalize_pdf_text(text)
+
+
+def adaptive_text(pdf_bytes, page_info=None):
+    return read_pdf_text(io.BytesIO(pdf_bytes), page_info=page_info)
+
+
+def best_time(read, pdf_bytes):
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        read(pdf_bytes)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def text_throughput(texts):
+    """Print MB/s of each text step on the texts repeated to about TEXT_MB megabytes."""
+    sample = "".join(texts)
+    text = sample * max(1, TEXT_MB * 1_000_000 // max(len(sample), 1))
+    megabytes = len(text.encode("utf-8")) / 1_000_000
+    steps = {
+        "normalize_pdf_text": normalize_pdf_text,
+        "  hyphen collapse (scan)": _collapse_spaced_hyphens,
+        "  hyphen collapse (regex)": lambda t: SPACED_HYPHEN_RE.sub(r'\1-\2', t),
+        "extract_words": extract_words,
+    }
+    print(f"\n{'text step on ' + format(megabytes, '.1f') + ' MB':<45} {'best s':>10} {'MB/s':>10}")
+    for name, step in steps.items():
+        seconds = best_time(step, text)
+        print(f"{name:<45} {seconds:>10.3f} {megabytes / seconds:>10.1f}")
+
+
+def main(paths):
+    texts = []
+    print(f"{'PDF':<45} {'pages':>5} {'plain':>5} {'layout':>6} {'layout-only s':>13} "
+          f"{'adaptive s':>10} {'speedup':>7} {'words differing':>15}")
+    for path in paths:
+        pdf_bytes = Path(path).read_bytes()
+        page_info = []
+        texts.append(adaptive_text(pdf_bytes, page_info))
+        words = extract_words(texts[-1])
+        differing = len(set(words) ^ set(extract_words(layout_only_text(pdf_bytes))))
+        modes = [info['mode'] for info in page_info]
+        layout_seconds = best_time(layout_only_text, pdf_bytes)
+        adaptive_seconds = best_time(adaptive_text, pdf_bytes)
+        name = Path(path).resolve()
+        name = name.relative_to(APP_DIR) if name.is_relative_to(APP_DIR) else name
+        print(f"{str(name):<45} {len(modes):>5} {modes.count('plain'):>5} {modes.count('layout'):>6} "
+              f"{layout_seconds:>13.3f} {adaptive_seconds:>10.3f} {layout_seconds / adaptive_seconds:>6.1f}x "
+              f"{differing:>15}")
+    text_throughput(texts)
+
+
+if __name__ == "__main__":
+    main(sorted(APP_DIR.glob("2026/*/*.pdf")) + sys.argv[1:])
@@ -0,0 +1,399 @@
+import io
+import json
+import multiprocessing
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pypdf
+
+# These helpers live outside spellbowl.py (which runs Streamlit commands at import time)
+# so they can run in PDF worker processes and other non-Streamlit code.
+
+# PDF fonts commonly render these as single ligature glyphs instead of separate letters
+# (e.g. "beneﬁting" instead of "benefiting"), which breaks naive letter-only regexes.
+PDF_LIGATURES = {
+    'ﬀ': 'ff', 'ﬁ': 'fi', 'ﬂ': 'fl',
+    'ﬃ': 'ffi', 'ﬄ': 'ffl', 'ﬅ': 'ft', 'ﬆ': 'st',
+}
+# Smart/curly punctuation that word processors substitute for the plain ASCII versions
+PDF_SMART_PUNCT = {
+    '‘': "'", '’': "'", '“': '"', '”': '"',
+    '–': '-', '—': '-', '\xa0': ' ',
+}
+
+
+def _is_letter(ch):
+    """Same test as the regex class [^\\W\\d_]: Unicode letters, excluding digits and '_'."""
+    return ch.isalnum() and not ch.isdecimal()
+
+
+def _collapse_spaced_hyphens(text):
+    """Collapse "good -natured" (letter, whitespace, hyphen, optional whitespace, letter) into
+    "good-natured". Equivalent to re.sub(r'([^\\W\\d_])\\s+-\\s*([^\\W\\d_])', r'\\1-\\2', text),
+    but only looks at the text around each hyphen instead of trying a match at every letter,
+    which is ~100x faster on large uploads where hyphens are rare."""
+    pieces = []
+    copied = 0      # text[:copied] has been emitted to pieces
+    min_start = 0   # a letter consumed by the previous collapse can't start the next one
+    n = len(text)
+    hyphen = text.find('-')
+    while hyphen != -1:
+        i = hyphen - 1
+        while i >= min_start and text[i].isspace():
+            i -= 1
+        if min_start <= i < hyphen - 1 and _is_letter(text[i]):
+            j = hyphen + 1
+            while j < n and text[j].isspace():
+                j += 1
+            if j < n and _is_letter(text[j]):
+                pieces.append(text[copied:i + 1])
+                pieces.append('-')
+                copied = j
+                min_start = j + 1
+        hyphen = text.find('-', hyphen + 1)
+    if not pieces:
+        return text
+    pieces.append(text[copied:])
+    return ''.join(pieces)
+
+
+def normalize_pdf_text(text):
+    """Undo common PDF text-extraction quirks (ligatures, smart quotes) that would
+    otherwise fragment words like "o'clock" or "beneﬁting" during extraction."""
+    # Chained str.replace is faster here than a single str.translate pass: each replace is a
+    # C-level scan that returns the same string untouched when there's nothing to replace.
+    for ligature, plain in PDF_LIGATURES.items():
+        text = text.replace(ligature, plain)
+    for fancy, plain in PDF_SMART_PUNCT.items():
+        text = text.replace(fancy, plain)
+    # Some PDFs render hyphenated compounds with a stray space before the hyphen
+    # (e.g. "good -natured"); collapse that back into "good-natured".
+    return _collapse_spaced_hyphens(text)
+
+
+# Unicode-aware letter class (covers accented letters like "é") and word-char class
+# (letters plus apostrophes/hyphens, for words like "o'clock" or "cross-cultural")
+_LETTER = r'[^\W\d_]'
+_WORDCHAR = r"(?:[^\W\d_]|['\-])"
+
+# Matches numbered list entries like "1. aardvark", "2) Big Dipper", "3: about-face",
+# capturing the number and the entry.
+# Prefers stopping at the next list number or a newline, but falls back to a single
+# word if no clean boundary is found (e.g. the last entry runs into trailing prose).
+NUMBERED_ENTRY_RE = re.compile(
+    r'(\d+)\s*[\.\)\:]\s*('
+    rf'{_LETTER}{_WORDCHAR}*(?:[ \t]+{_LETTER}{_WORDCHAR}*){{0,3}}(?=\s*\d+\s*[\.\)\:]|\n|$)'
+    r'|'
+    rf'{_LETTER}{_WORDCHAR}*'
+    r')'
+)
+MIN_NUMBERED_ENTRIES = 5  # below this, the PDF probably isn't a numbered list - fall back to full-text scan
+
+
+def _numbered_entries(text):
+    """(list number, entry) for each numbered list entry in the text, in order."""
+    for number, raw in NUMBERED_ENTRY_RE.findall(text):
+        entry = raw.strip()
+        if entry and len(entry.replace(' ', '')) >= 2:
+            yield int(number), entry
+
+
+def extract_numbered_entries(text):
+    """Pull out only the words/phrases that follow a list number (e.g. '1. aardvark'),
+    which skips titles, headers, and instructions on official word-list PDFs."""
+    return [entry for _, entry in _numbered_entries(text)]
+
+
+def extract_numbered_list(text):
+    """{list number: entry}, numbered as printed (so gaps in the printed numbering stay
+    gaps). If a number appears twice, the first entry wins."""
+    numbered = {}
+    for number, entry in _numbered_entries(text):
+        numbered.setdefault(number, entry)
+    return numbered
+
+
+# Page-parallel extraction settings. Spinning up worker processes costs a few hundred
+# milliseconds, so short PDFs (like the bundled yearly lists) are read in-process.
+PARALLEL_MIN_PAGES = 8
+PDF_WORKERS = max(1, min(4, os.cpu_count() or 1))
+PAGE_TIMEOUT_SECONDS = 20  # a single pathological page is skipped rather than stalling the load
+# The worker pool runs in a helper process (`python -m pdf_extraction`, see _serve_pages) rather
+# than in the app. Forking the multi-threaded Streamlit server can deadlock a worker on a lock
+# another thread held, and "spawn"/"forkserver" workers re-run the __main__ module, which under
+# `streamlit run` is spellbowl.py - the whole app. The helper is started with a plain exec, is
+# single-threaded, and its __main__ is this module, so its spawned workers only import this file.
+_POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+
+# A line that starts with a list number, e.g. "12. aardvark"
+_LIST_NUMBER_LINE_RE = re.compile(r'^\s*(\d+)\s*[\.\)\:]')
+
+
+def _plain_text_is_clean(text):
+    """Cheap check that plain extraction read a page's numbered list in order: list numbers
+    run consecutively, one per line, with no wrapped continuation lines in between, and no
+    line holds a second entry. Multi-column tables fail this (plain mode reads across the
+    columns and splits words). A page with only a few entries, like the end of a list, is
+    judged the same way."""
+    lines = [line for line in text.split('\n') if line.strip()]
+    numbered = [i for i, line in enumerate(lines) if _LIST_NUMBER_LINE_RE.match(line)]
+    if not numbered:
+        return True  # no list on this page, so column order doesn't matter
+    if len(NUMBERED_ENTRY_RE.findall(text)) > len(numbered):
+        return False  # entries from several columns run together on one line
+    numbers = [int(_LIST_NUMBER_LINE_RE.match(lines[i]).group(1)) for i in numbered]
+    if numbers != list(range(numbers[0], numbers[0] + len(numbers))):
+        return False
+    return len(numbered) == numbered[-1] - numbered[0] + 1
+
+
+def _page_text(page):
+    """Text for one page plus the extraction mode used. Plain extraction is tried first since
+    it's several times faster; layout mode only runs on pages plain mode can't read cleanly.
+    The choice depends on this page alone, so a page reads the same whichever worker (or
+    the serial loop) handles it, and in whatever order."""
+    plain_text = page.extract_text()
+    if _plain_text_is_clean(plain_text):
+        return plain_text, 'plain'
+    try:
+        return page.extract_text(extraction_mode="layout"), 'layout'
+    except TypeError:  # pypdf without layout mode
+        return plain_text, 'plain'
+
+
+_worker_reader = None
+
+
+def _init_worker(pdf_bytes):
+    """Parse the PDF once per worker process instead of once per page."""
+    global _worker_reader
+    _worker_reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+
+
+def _extract_page(page_index):
+    return _page_text(_worker_reader.pages[page_index])
+
+
+def _read_pdf_bytes(pdf_source):
+    """Raw bytes of an uploaded file-like object or a PDF path on disk."""
+    if isinstance(pdf_source, (str, os.PathLike)):
+        return Path(pdf_source).read_bytes()
+    pdf_source.seek(0)
+    return pdf_source.read()
+
+
+def iter_page_texts(pdf_source, progress=None, page_info=None):
+    """Yield the raw text of each page of an uploaded file-like object or a PDF path on disk,
+    in page order. Pages that plain extraction can't read cleanly use layout-preserving
+    extraction: word lists formatted as multi-column tables (common in longer official lists)
+    otherwise get their columns read out of order, which can split numbers/words across lines
+    and silently drop entries.
+
+    Long PDFs are split across a process pool page by page; pages are still yielded in order.
+    `progress(done, total)` is called as pages finish; if `page_info` is a list, one
+    {'page', 'status', 'mode'} dict per page is appended (status 'ok' or 'timeout',
+    mode 'plain', 'layout', or None for a timed-out page)."""
+    pdf_bytes = _read_pdf_bytes(pdf_source)
+    reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+    total = len(reader.pages)
+
+    done = 0
+    if total >= PARALLEL_MIN_PAGES and PDF_WORKERS >= 2:
+        for page_text, mode, status in _iter_helper_pages(pdf_bytes, total):
+            done += 1
+            if page_info is not None:
+                page_info.append({'page': done, 'status': status, 'mode': mode})
+            if progress:
+                progress(done, total)
+            yield page_text
+
+    # Short PDFs, and any pages left if the helper process died, are read in-process
+    for i in range(done, total):
+        page_text, mode = _page_text(reader.pages[i])
+        if page_info is not None:
+            page_info.append({'page': i + 1, 'status': 'ok', 'mode': mode})
+        if progress:
+            progress(i + 1, total)
+        yield page_text
+
+
+def _iter_helper_pages(pdf_bytes, total):
+    """(text, mode, status) for each page in order, read by the helper process's worker pool."""
+    helper = subprocess.Popen(
+        [sys.executable, "-m", "pdf_extraction", str(min(PDF_WORKERS, total)), str(PAGE_TIMEOUT_SECONDS)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=Path(__file__).resolve().parent)
+    finished = False
+    try:
+        try:
+            helper.stdin.write(pdf_bytes)
+            helper.stdin.close()
+        except BrokenPipeError:
+            pass  # the helper died on startup; iter_page_texts reads the pages itself
+        for line in helper.stdout:
+            page = json.loads(line)
+            yield page['text'], page['mode'], page['status']
+        finished = True
+    finally:
+        if not finished:
+            # Stopped early: the helper terminates its pool on SIGTERM, so a worker stuck
+            # on a page is killed too
+            helper.terminate()
+        helper.stdout.close()
+        helper.wait()
+
+
+def _serve_pages(workers, timeout):
+    """Helper process side of _iter_helper_pages: read a PDF from stdin and write one JSON line
+    per page to stdout, in page order, extracting pages in a pool of `workers` processes."""
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+    pdf_bytes = sys.stdin.buffer.read()
+    total = len(pypdf.PdfReader(io.BytesIO(pdf_bytes)).pages)
+    out = sys.stdout.buffer
+    # the with block terminates (not closes) the pool, killing any worker stuck on a timed-out page
+    with _POOL_CONTEXT.Pool(workers, initializer=_init_worker, initargs=(pdf_bytes,)) as pool:
+        pending = [pool.apply_async(_extract_page, (i,)) for i in range(total)]
+        for result in pending:
+            try:
+                (page_text, mode), status = result.get(timeout=timeout), 'ok'
+            except multiprocessing.TimeoutError:
+                page_text, mode, status = None, None, 'timeout'
+            out.write(json.dumps({'text': page_text, 'mode': mode, 'status': status}).encode() + b"\n")
+            out.flush()
+
+
+def read_pdf_text(pdf_source, progress=None, page_info=None):
+    """Extract the full normalized text of a PDF (see iter_page_texts for the options)."""
+    # newline (not space) after each page so page breaks don't glue words together
+    text = "".join(page_text + "\n" for page_text in iter_page_texts(pdf_source, progress, page_info) if page_text)
+    return normalize_pdf_text(text)
+
+
+def dedupe_and_sort_words(words, phrases=()):
+    """Sorted, deduped word/phrase list (case preserved on first sighting). Multi-word
+    `phrases` (e.g. from smart extraction) are added and replace their individual words."""
+    unique_words = {}
+    for word in words:
+        lower_word = word.lower()
+        if lower_word not in unique_words:
+            unique_words[lower_word] = word
+
+    for phrase in phrases:
+        phrase_clean = phrase.strip()
+        if len(phrase_clean) < 4:
+            continue
+        lower_phrase = phrase_clean.lower()
+        if lower_phrase not in unique_words:
+            unique_words[lower_phrase] = phrase_clean
+        for part in phrase_clean.split():
+            unique_words.pop(part.lower(), None)
+
+    return [unique_words[key] for key in sorted(unique_words.keys())]
+
+
+def extract_words(text, phrases=()):
+    """Turn raw PDF text into a sorted, deduped word/phrase list.
+    Prefers numbered-list entries ('1. aardvark') when the PDF looks like one, since that reliably
+    skips titles/headers/instructions; otherwise falls back to scanning the whole text."""
+    numbered_words = extract_numbered_entries(text)
+    if len(numbered_words) >= MIN_NUMBERED_ENTRIES:
+        words = numbered_words
+    else:
+        words = re.findall(rf'\b{_LETTER}{{4,}}\b', text)
+        words = [w.strip() for w in words if len(w.strip()) >= 4]
+    return dedupe_and_sort_words(words, phrases)
+
+
+class ProgressiveWordList:
+    """Reads a PDF in a background thread so a quiz can start on the first numbered entries
+    while later pages are still being extracted.
+
+    `words` grows page by page (sorted and deduped); once every page is read it is replaced
+    by the same list extract_words() returns for the whole text, and `done` is set.
+
+    `refine` is an optional callable(text) -> phrases (e.g. smart extraction) that runs in the
+    same background thread after the last page; `refining` is set while it runs, and its phrases
+    are merged into the final list. If it raises, the plain list is kept and `refine_error` set."""
+
+    def __init__(self, pdf_source, refine=None):
+        self.pdf_bytes = _read_pdf_bytes(pdf_source)
+        self.refine = refine
+        self.words = []
+        self.pages_read = 0
+        self.total_pages = 0
+        self.page_info = []  # per-page status/extraction mode, see iter_page_texts
+        self.timed_out_pages = []
+        self.done = False
+        self.error = None
+        self.refining = False
+        self.phrases = []
+        self.refine_error = None
+        self._changed = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def wait_for_words(self, count, timeout=None):
+        """Block until at least `count` words are available or loading has finished."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.done or len(self.words) >= count, timeout)
+        return list(self.words)
+
+    def _update_progress(self, done, total):
+        self.pages_read, self.total_pages = done, total
+
+    def _run(self):
+        page_info = self.page_info
+        page_texts = []
+        entries = []
+        try:
+            for page_text in iter_page_texts(io.BytesIO(self.pdf_bytes), self._update_progress, page_info):
+                if not page_text:
+                    continue
+                page_texts.append(page_text + "\n")
+                entries.extend(extract_numbered_entries(normalize_pdf_text(page_text + "\n")))
+                # Multi-column lists are read row by row, so sort what we have so far; for an
+                # alphabetical list the first pages then already match the start of the final list
+                provisional_words = dedupe_and_sort_words(entries)
+                with self._changed:
+                    self.words = provisional_words
+                    self._changed.notify_all()
+            # Reconcile: entries can straddle page breaks and non-numbered PDFs need the
+            # full-text scan, so the final list always comes from the whole document.
+            text = normalize_pdf_text("".join(page_texts))
+            final_words = extract_words(text)
+        except Exception as e:
+            text, final_words = None, self.words
+            self.error = e
+        if self.refine is not None and text is not None:
+            final_words = self._refine(text, final_words)
+        with self._changed:
+            self.words = final_words
+            self.timed_out_pages = [info['page'] for info in page_info if info['status'] == 'timeout']
+            self.refining = False
+            self.done = True
+            self._changed.notify_all()
+
+    def _refine(self, text, words):
+        """Publish the plain final list, then run `refine` and merge its phrases into it."""
+        with self._changed:
+            self.words = words
+            self.refining = True
+            self._changed.notify_all()
+        try:
+            self.phrases = sorted(set(self.refine(text)))
+        except Exception as e:
+            self.refine_error = e
+            return words
+        return extract_words(text, self.phrases)
+
+
+if __name__ == "__main__":
+    _serve_pages(int(sys.argv[1]), float(sys.argv[2]))
@@ -0,0 +1,531 @@
+import argparse
+import asyncio
+import functools
+import io
+import json
+import secrets
+import time
+from pathlib import Path
+
+from aiohttp import web
+from gtts import gTTS
+
+import quiz_engine
+
+# A JSON HTTP API over quiz_engine.py, so other clients (a kiosk app, an LMS) can run quizzes
+# without a Streamlit session each. One asyncio process holds every quiz session in memory;
+# the slow steps (reading a yearly PDF list, text-to-speech) run in a thread pool so they never
+# hold up other sessions. Results land in the same files as the app's, so the app's
+# leaderboard and word stats include quizzes taken through the API.
+#
+# Run with: python quiz_api.py --port 8080   (needs aiohttp: pip install -r requirements-optional.txt)
+#
+#   POST /sessions               {"username", "password", "source": "predefined" | "yearly",
+#                                 "year", "category", "start", "end", "order", "review_first"}
+#   POST /sessions/{id}/next     -> the next word's number and audio URL (never its spelling)
+#   GET  /sessions/{id}/audio    -> the current word's pronunciation (audio/mpeg)
+#   POST /sessions/{id}/answer   {"answer"} -> the grade and the correct spelling
+#   POST /sessions/{id}/skip
+#   POST /sessions/{id}/finish   -> the result, saved to the leaderboard
+#   GET  /leaderboard?limit=10
+#
+# Competition rooms (a live classroom spelling bee, see quiz_engine.CompetitionRoom):
+#
+#   POST /rooms                  {"username", "password", "source", "year", "category", "start",
+#                                 "end", "order", "seconds"} -> room code and host token
+#   GET  /rooms/{code}           -> the room page (quiz_room.html); the host opens it with
+#                                   #host=<token>
+#   GET  /rooms/{code}/audio     -> the open word's pronunciation
+#   GET  /rooms/{code}/ws        -> WebSocket; the first message is {"type": "join", "username",
+#                                   "password"} or {"type": "host", "token"}
+#
+# The server pushes each word, the reveal and the standings to every socket, so participants
+# never poll. Each word's audio is synthesized once and shared, and standings are pushed at most
+# every STANDINGS_PUSH_SECONDS however fast answers arrive.
+
+SESSION_IDLE_SECONDS = 30 * 60  # sessions and rooms untouched for this long are dropped
+SESSION_SWEEP_SECONDS = 60
+AUDIO_CACHE_WORDS = 2048  # pronunciations kept in memory, shared by all sessions
+STANDINGS_PUSH_SECONDS = 0.5
+ROOM_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"  # no 0/O or 1/I lookalikes
+ROOM_CODE_LENGTH = 5
+MAX_ANSWER_LENGTH = 100
+ROOM_PAGE = Path(__file__).with_name("quiz_room.html")
+
+
+class ApiSession:
+    def __init__(self, quiz):
+        self.quiz = quiz
+        self.last_used = time.monotonic()
+
+
+def error(status, message):
+    return web.json_response({'error': message}, status=status)
+
+
+async def read_json(request):
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise web.HTTPBadRequest(text=json.dumps({'error': "Request body must be JSON."}),
+                                 content_type='application/json')
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text=json.dumps({'error': "Request body must be a JSON object."}),
+                                 content_type='application/json')
+    return body
+
+
+def get_session(request):
+    session = request.app['sessions'].get(request.match_info['session_id'])
+    if session is None:
+        raise web.HTTPNotFound(text=json.dumps({'error': "Unknown or expired session."}),
+                               content_type='application/json')
+    session.last_used = time.monotonic()
+    return session
+
+
+def load_request_words(body):
+    """(username, full name, words, list name, word source) for a /sessions or /rooms request
+    body. Runs in the thread pool: it may read a PDF."""
+    username = body.get('username', '')
+    full_name = quiz_engine.authenticate(username, body.get('password', ''))
+    if full_name is None:
+        raise PermissionError("Invalid username or password.")
+    words, list_name, word_source = quiz_engine.load_quiz_words(
+        body.get('source', 'predefined'), body.get('year'), body.get('category'))
+    # Optional 1-based, inclusive word range, like the app's custom range
+    start = int(body.get('start', 1))
+    end = int(body.get('end', len(words)))
+    if not 1 <= start <= end:
+        raise ValueError("Start word must be at least 1 and no more than the end word.")
+    return username, full_name, words[start - 1:end], list_name, word_source
+
+
+def build_quiz(body):
+    username, full_name, words, list_name, word_source = load_request_words(body)
+    return quiz_engine.QuizSession(username, full_name, words, list_name, word_source,
+                                   order=body.get('order', 'sequential'),
+                                   review_first=bool(body.get('review_first', False)))
+
+
+async def create_session(request):
+    body = await read_json(request)
+    loop = asyncio.get_running_loop()
+    try:
+        quiz = await loop.run_in_executor(None, build_quiz, body)
+    except PermissionError as e:
+        return error(401, str(e))
+    except (TypeError, ValueError) as e:
+        return error(400, str(e))
+    if not quiz.words:
+        return error(400, "That range has no words.")
+
+    session_id = secrets.token_urlsafe(16)
+    request.app['sessions'][session_id] = ApiSession(quiz)
+    return web.json_response({
+        'session_id': session_id,
+        'name': quiz.name,
+        'word_list': quiz.list_name,
+        'words': len(quiz.words),
+    }, status=201)
+
+
+def quiz_status(quiz):
+    return {'score': quiz.score, 'total': quiz.total, 'remaining': quiz.remaining}
+
+
+async def next_word(request):
+    session = get_session(request)
+    quiz = session.quiz
+    try:
+        word = quiz.next_word()
+    except ValueError as e:
+        return error(409, str(e))
+    if word is None:
+        return web.json_response({'done': True, **quiz_status(quiz)})
+    return web.json_response({
+        'done': False,
+        'word_number': quiz.words.index(word) + 1,
+        'audio_url': f"/sessions/{request.match_info['session_id']}/audio",
+        **quiz_status(quiz),
+    })
+
+
+@functools.lru_cache(maxsize=AUDIO_CACHE_WORDS)
+def pronounce(word, slow):
+    """MP3 bytes of gTTS speaking `word`."""
+    audio = io.BytesIO()
+    gTTS(text=word, lang='en', slow=slow, timeout=10).write_to_fp(audio)
+    return audio.getvalue()
+
+
+async def word_audio(request):
+    session = get_session(request)
+    word = session.quiz.current
+    if word is None:
+        return error(409, "Get a word first.")
+    slow = request.query.get('slow', '').lower() in ('1', 'true', 'yes')
+    loop = asyncio.get_running_loop()
+    try:
+        audio = await loop.run_in_executor(None, pronounce, word, slow)
+    except Exception as e:
+        return error(502, f"Text-to-speech failed: {e}")
+    return web.Response(body=audio, content_type='audio/mpeg')
+
+
+async def submit_answer(request):
+    session = get_session(request)
+    body = await read_json(request)
+    answer = body.get('answer')
+    if not isinstance(answer, str) or not answer:
+        return error(400, "Send a non-empty \"answer\".")
+    answer = answer[:MAX_ANSWER_LENGTH]  # as in rooms: no spelling is anywhere near this long
+    quiz = session.quiz
+    word = quiz.current
+    try:
+        grade = quiz.submit(answer)
+    except ValueError as e:
+        return error(409, str(e))
+    return web.json_response({
+        'correct': grade['correct'],
+        'error_type': grade['error_type'],
+        'similarity': round(grade['similarity'], 1),
+        'correct_word': word,
+        **quiz_status(quiz),
+    })
+
+
+async def skip_word(request):
+    session = get_session(request)
+    try:
+        session.quiz.skip()
+    except ValueError as e:
+        return error(409, str(e))
+    return web.json_response(quiz_status(session.quiz))
+
+
+async def finish_quiz(request):
+    session = get_session(request)
+    request.app['sessions'].pop(request.match_info['session_id'], None)
+    return web.json_response(session.quiz.finish())
+
+
+async def leaderboard(request):
+    try:
+        limit = max(1, min(100, int(request.query.get('limit', 10))))
+    except ValueError:
+        return error(400, "limit must be a number.")
+    # Same cached snapshot (and cache key) as the app's leaderboard views; reading the store
+    # (and rebuilding the snapshot after a change) blocks, so it runs in the thread pool
+    loop = asyncio.get_running_loop()
+    snapshot = await loop.run_in_executor(None, quiz_engine.leaderboard_file().cached,
+                                          'leaderboard_snapshot', quiz_engine.build_leaderboard_snapshot)
+    fields = ('name', 'best_accuracy', 'avg_accuracy', 'total_quizzes', 'total_score',
+              'total_questions', 'last_quiz_date')
+    return web.json_response([{field: entry[field] for field in fields}
+                              for entry in snapshot['ranking'][:limit]])
+
+
+# Competition Rooms
+class ApiRoom:
+    """A CompetitionRoom plus its sockets: one per participant (by username) and the hosts'."""
+
+    def __init__(self, code, room, host_token):
+        self.code = code
+        self.room = room
+        self.host_token = host_token
+        self.players = {}
+        self.hosts = set()
+        self.audio = None
+        self.timer = None
+        self.standings_push = None
+        self.last_used = time.monotonic()
+
+    def sockets(self):
+        return [*self.players.values(), *self.hosts]
+
+    async def broadcast(self, message):
+        """Send one message to every socket, serialized once and sent concurrently, so a slow
+        client doesn't hold up the rest."""
+        payload = json.dumps(message)
+        await asyncio.gather(*(ws.send_str(payload) for ws in self.sockets() if not ws.closed),
+                             return_exceptions=True)
+
+    def state(self):
+        """The room as a client joining (or rejoining) now needs it."""
+        room = self.room
+        state = {
+            'type': 'state',
+            'code': self.code,
+            'host': room.host,
+            'words': len(room.words),
+            'remaining': room.remaining,
+            'standings': room.standings(),
+            'finished': room.finished,
+            'word': None,
+        }
+        if room.current is not None:
+            state['word'] = self.word_message()
+        return state
+
+    def word_message(self):
+        room = self.room
+        return {
+            'type': 'word',
+            'number': room.position,
+            'words': len(room.words),
+            'seconds': room.seconds,
+            'seconds_left': max(0.0, round(room.deadline - time.monotonic(), 1)),
+            'audio_url': f"/rooms/{self.code}/audio?n={room.position}",
+        }
+
+    async def open_word(self):
+        """Close any open word, then open the next one (or finish when the list is used up)."""
+        await self.close_word()
+        word = self.room.open_word(time.monotonic())
+        if word is None:
+            await self.finish()
+            return
+        # Synthesize once for the whole room, before anyone asks for it
+        self.audio = asyncio.get_running_loop().run_in_executor(None, pronounce, word, False)
+        self.timer = asyncio.create_task(self.close_after(self.room.seconds))
+        await self.broadcast(self.word_message())
+
+    async def close_after(self, seconds):
+        await asyncio.sleep(seconds)
+        self.timer = None
+        await self.close_word()
+
+    async def close_word(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        word = self.room.close_word()
+        if word is not None:
+            await self.broadcast({'type': 'reveal', 'word': word, 'standings': self.room.standings(),
+                                  'remaining': self.room.remaining})
+
+    def push_standings_soon(self):
+        """Push the standings after STANDINGS_PUSH_SECONDS, coalescing the answers that arrive
+        in between into one broadcast."""
+        if self.standings_push is None or self.standings_push.done():
+            self.standings_push = asyncio.create_task(self.push_standings())
+
+    async def push_standings(self):
+        await asyncio.sleep(STANDINGS_PUSH_SECONDS)
+        await self.broadcast({'type': 'standings', 'standings': self.room.standings(),
+                              'answered': len(self.room.answers), 'players': len(self.room.players)})
+
+    async def finish(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        standings = self.room.finish()
+        await self.broadcast({'type': 'finished', 'standings': standings})
+        await asyncio.gather(*(ws.close() for ws in self.sockets()), return_exceptions=True)
+
+
+def new_room_code(rooms):
+    while True:
+        code = ''.join(secrets.choice(ROOM_CODE_ALPHABET) for _ in range(ROOM_CODE_LENGTH))
+        if code not in rooms:
+            return code
+
+
+def build_room(body):
+    host, _, words, list_name, word_source = load_request_words(body)
+    return quiz_engine.CompetitionRoom(host, words, list_name, word_source,
+                                       seconds=int(body.get('seconds', 30)),
+                                       order=body.get('order', 'sequential'))
+
+
+def get_room(request):
+    api_room = request.app['rooms'].get(request.match_info['code'].upper())
+    if api_room is None:
+        raise web.HTTPNotFound(text=json.dumps({'error': "Unknown or expired room."}),
+                               content_type='application/json')
+    api_room.last_used = time.monotonic()
+    return api_room
+
+
+async def create_room(request):
+    body = await read_json(request)
+    loop = asyncio.get_running_loop()
+    try:
+        room = await loop.run_in_executor(None, build_room, body)
+    except PermissionError as e:
+        return error(401, str(e))
+    except (TypeError, ValueError) as e:
+        return error(400, str(e))
+    if not room.words:
+        return error(400, "That range has no words.")
+
+    code = new_room_code(request.app['rooms'])
+    host_token = secrets.token_urlsafe(16)
+    request.app['rooms'][code] = ApiRoom(code, room, host_token)
+    return web.json_response({
+        'room_code': code,
+        'host_token': host_token,
+        'words': len(room.words),
+        'join_url': f"/rooms/{code}",
+        'host_url': f"/rooms/{code}#host={host_token}",
+    }, status=201)
+
+
+async def room_page(request):
+    get_room(request)
+    return web.Response(text=request.app['room_page'], content_type='text/html')
+
+
+async def room_audio(request):
+    api_room = get_room(request)
+    if api_room.room.current is None or api_room.audio is None:
+        return error(409, "No word is open.")
+    try:
+        # Shielded: one participant disconnecting mustn't cancel the room's shared synthesis
+        audio = await asyncio.shield(api_room.audio)
+    except Exception as e:
+        return error(502, f"Text-to-speech failed: {e}")
+    return web.Response(body=audio, content_type='audio/mpeg')
+
+
+async def room_socket(request):
+    api_room = get_room(request)
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+    user = None
+    is_host = False
+    try:
+        async for msg in ws:
+            if msg.type != web.WSMsgType.TEXT:
+                continue
+            try:
+                message = json.loads(msg.data)
+                kind = message.get('type')
+            except (json.JSONDecodeError, AttributeError):
+                await ws.send_json({'type': 'error', 'error': "Messages must be JSON objects."})
+                continue
+            api_room.last_used = time.monotonic()
+            room = api_room.room
+
+            if user is None and not is_host:
+                if kind == 'host' and secrets.compare_digest(str(message.get('token', '')),
+                                                             api_room.host_token):
+                    is_host = True
+                    api_room.hosts.add(ws)
+                elif kind == 'join':
+                    username = str(message.get('username', ''))
+                    # The account lookup reads users.json (and rebuilds the user index after a
+                    # change): keep it off the event loop, which serves every other socket
+                    name = await asyncio.get_running_loop().run_in_executor(
+                        None, quiz_engine.authenticate, username, str(message.get('password', '')))
+                    if name is None:
+                        await ws.send_json({'type': 'error', 'error': "Invalid username or password."})
+                        continue
+                    if room.finished:
+                        await ws.send_json({'type': 'error', 'error': "The competition is over."})
+                        continue
+                    user = username
+                    room.join(user, name)
+                    # Rejoining from another tab or after a dropped connection replaces the old socket
+                    old = api_room.players.get(user)
+                    api_room.players[user] = ws
+                    if old is not None and not old.closed:
+                        await old.close()
+                    api_room.push_standings_soon()
+                else:
+                    await ws.send_json({'type': 'error', 'error': "Join the room first."})
+                    continue
+                await ws.send_json({**api_room.state(), 'role': 'host' if is_host else 'player'})
+
+            elif is_host and kind in ('next', 'close', 'end'):
+                if room.finished:
+                    continue
+                # With several hosts, another one's action can land while this one is waiting
+                # on a broadcast (e.g. both click Next); report it instead of dropping the socket
+                try:
+                    if kind == 'next':
+                        await api_room.open_word()
+                    elif kind == 'close':
+                        await api_room.close_word()
+                    else:
+                        await api_room.finish()
+                except ValueError as e:
+                    await ws.send_json({'type': 'error', 'error': str(e)})
+
+            elif user is not None and kind == 'answer':
+                answer = str(message.get('answer', '')).strip()[:MAX_ANSWER_LENGTH]
+                if not answer:
+                    await ws.send_json({'type': 'error', 'error': "Type an answer first."})
+                    continue
+                try:
+                    grade = room.answer(user, answer, time.monotonic())
+                except ValueError as e:
+                    await ws.send_json({'type': 'error', 'error': str(e)})
+                    continue
+                await ws.send_json({'type': 'graded', 'correct': grade['correct'],
+                                    'error_type': grade['error_type'],
+                                    'similarity': round(grade['similarity'], 1)})
+                api_room.push_standings_soon()
+
+            else:
+                await ws.send_json({'type': 'error', 'error': f"Unexpected message: {kind}"})
+    finally:
+        if is_host:
+            api_room.hosts.discard(ws)
+        elif user is not None and api_room.players.get(user) is ws:
+            del api_room.players[user]
+    return ws
+
+
+async def sweep_sessions(app):
+    """Drop sessions and rooms that have been idle for SESSION_IDLE_SECONDS, and finished rooms.
+    An abandoned room is finished first, so its results are still saved."""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_SECONDS)
+        cutoff = time.monotonic() - SESSION_IDLE_SECONDS
+        for session_id, session in list(app['sessions'].items()):
+            if session.last_used < cutoff:
+                del app['sessions'][session_id]
+        for code, api_room in list(app['rooms'].items()):
+            if api_room.room.finished or api_room.last_used < cutoff:
+                del app['rooms'][code]
+                if not api_room.room.finished:
+                    await api_room.finish()
+
+
+async def start_sweeper(app):
+    app['sweeper'] = asyncio.create_task(sweep_sessions(app))
+
+
+async def stop_sweeper(app):
+    app['sweeper'].cancel()
+
+
+def create_app():
+    app = web.Application()
+    app['sessions'] = {}
+    app['rooms'] = {}
+    app['room_page'] = ROOM_PAGE.read_text(encoding='utf-8')
+    app.router.add_post('/sessions', create_session)
+    app.router.add_post('/sessions/{session_id}/next', next_word)
+    app.router.add_get('/sessions/{session_id}/audio', word_audio)
+    app.router.add_post('/sessions/{session_id}/answer', submit_answer)
+    app.router.add_post('/sessions/{session_id}/skip', skip_word)
+    app.router.add_post('/sessions/{session_id}/finish', finish_quiz)
+    app.router.add_get('/leaderboard', leaderboard)
+    app.router.add_post('/rooms', create_room)
+    app.router.add_get('/rooms/{code}', room_page)
+    app.router.add_get('/rooms/{code}/audio', room_audio)
+    app.router.add_get('/rooms/{code}/ws', room_socket)
+    app.on_startup.append(start_sweeper)
+    app.on_cleanup.append(stop_sweeper)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SpellBowl quiz API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    web.run_app(create_app(), host=args.host, port=args.port)
@@ -0,0 +1,1058 @@
+import csv
+import difflib
+import functools
+import hashlib
+import heapq
+import random
+import re
+import secrets
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pronouncing
+
+import storage
+from pdf_extraction import extract_numbered_list, extract_words, read_pdf_text
+from predefined_words import predefined_words
+
+# The quiz itself without the Streamlit UI: word lists, grading, word choice, and the users,
+# leaderboard, word stats and review schedule stores with their fold functions. spellbowl.py
+# renders it; quiz_api.py serves it over HTTP to other clients. Like pdf_extraction.py and
+# storage.py, it must not import Streamlit.
+
+# File paths
+LEADERBOARD_FILE = "leaderboard.json"
+LEADERBOARD_LOG_FILE = "leaderboard.log.jsonl"  # quiz results not yet compacted into LEADERBOARD_FILE
+# leaderboard.json schema: 1 = flat list of quiz results (legacy), 2 = per-user stats dict,
+# 3 = per-user stats with bounded quiz_history plus daily/weekly rollups of older attempts,
+# 4 = adds per-user day/week/month window totals
+LEADERBOARD_SCHEMA = 4
+# quiz_history retention: each user's most recent attempts are kept as-is, older ones are rolled
+# into per-day summaries, and days more than DAILY_ROLLUP_DAYS before their latest attempt into
+# per-week summaries - so a long-lived account's entry stops growing but keeps its trend data
+QUIZ_HISTORY_RETENTION = 50
+DAILY_ROLLUP_DAYS = 90
+# Time-windowed leaderboards: each user entry keeps running totals for the current day, ISO week
+# and month (the period of their latest quiz), so ranking a window never rescans quiz_history
+LEADERBOARD_WINDOWS = {"day": "Today", "week": "This Week", "month": "This Month"}
+USERS_FILE = "users.json"
+# Per-word attempt counters (word_stats.json), fed by an append-only log of graded quiz answers
+WORD_STATS_FILE = "word_stats.json"
+WORD_ATTEMPTS_LOG_FILE = "word_attempts.log.jsonl"
+WORD_STATS_SCHEMA = 1
+# Per-user spaced-repetition (SM-2) schedule for every word a user has been quizzed on
+REVISION_FILE = "revision.json"
+REVISION_LOG_FILE = "revision.log.jsonl"
+REVISION_SCHEMA = 2  # 2 = adds an attempts count to each word's schedule
+ADAPTIVE_SAMPLE_SIZE = 100  # adaptive word choice scores at most this many candidate words
+# Paper test answer sheets already saved to the leaderboard, so a sheet can't be counted twice
+PAPER_TESTS_FILE = "paper_tests.json"
+# A sheet still marked as being saved after this long belongs to a save that died (e.g. the
+# server restarted mid-save), so it may be saved again
+PAPER_TEST_SAVE_SECONDS = 600
+
+# Base directory of the app (used to find yearly word list folders regardless of cwd)
+APP_DIR = Path(__file__).resolve().parent
+
+
+# Yearly Prepopulated Word List Helpers
+def get_available_years():
+    """Find year folders (e.g. '2026') that sit next to spellbowl.py, newest first."""
+    years = []
+    if APP_DIR.exists():
+        for entry in APP_DIR.iterdir():
+            if entry.is_dir() and re.fullmatch(r"\d{4}", entry.name):
+                years.append(entry.name)
+    return sorted(years, reverse=True)
+
+
+def get_categories_for_year(year):
+    """Find division subfolders (e.g. 'elementary') inside a year folder that contain a PDF."""
+    year_dir = APP_DIR / year
+    categories = []
+    if year_dir.exists():
+        for entry in sorted(year_dir.iterdir()):
+            if entry.is_dir() and any(entry.glob("*.pdf")):
+                categories.append(entry.name)
+    return categories
+
+
+def get_pdf_path_for_category(year, category):
+    """Return the first PDF found for a given year/division, or None."""
+    cat_dir = APP_DIR / year / category
+    pdfs = sorted(cat_dir.glob("*.pdf"))
+    return pdfs[0] if pdfs else None
+
+
+@functools.lru_cache(maxsize=16)
+def _yearly_text(pdf_path):
+    return read_pdf_text(pdf_path)
+
+
+@functools.lru_cache(maxsize=16)
+def _yearly_words(pdf_path):
+    return tuple(extract_words(_yearly_text(pdf_path)))
+
+
+def _yearly_pdf_path(year, category):
+    # Only folders that exist, so a year/division can't point anywhere else on disk
+    if year not in get_available_years() or category not in get_categories_for_year(year):
+        raise ValueError(f"No word list found for {year}/{category}.")
+    return str(get_pdf_path_for_category(year, category))
+
+
+def load_quiz_words(source, year=None, category=None):
+    """(words, word list name, word source) for a quiz: source "predefined", or "yearly" with
+    a year and division from get_available_years()/get_categories_for_year(). Yearly PDFs are
+    read once per process. Raises ValueError for an unknown source or list."""
+    if source == "predefined":
+        return list(predefined_words), "predefined", "predefined"
+    if source == "yearly":
+        words = _yearly_words(_yearly_pdf_path(year, category))
+        return list(words), f"{year}/{category}", "yearly"
+    raise ValueError(f"Unknown word source: {source}")
+
+
+def load_numbered_list(year, category):
+    """({number: word} as printed on a yearly list, word list name). Unlike load_quiz_words'
+    sorted quiz list, this keeps the PDF's own numbering, which paper tests refer to.
+    Raises ValueError for an unknown list."""
+    numbered = extract_numbered_list(_yearly_text(_yearly_pdf_path(year, category)))
+    return numbered, f"{year}/{category}"
+
+
+# Grading
+def grade_answer(correct_word, answer):
+    """Grade an answer the way the quiz does: correct only on an exact match, otherwise a
+    'case' error if just the capitalization differs, else a 'spelling' error.
+    Returns {'correct', 'similarity' (0-100), 'error_type'}."""
+    if answer == correct_word:
+        return {'correct': True, 'similarity': 100.0, 'error_type': None}
+    similarity = difflib.SequenceMatcher(None, answer, correct_word).ratio() * 100
+    error_type = 'case' if answer.lower() == correct_word.lower() else 'spelling'
+    return {'correct': False, 'similarity': similarity, 'error_type': error_type}
+
+
+def timeout_grade():
+    """The grade for a Competition Mode word whose time ran out."""
+    return {'correct': False, 'similarity': 0, 'error_type': 'timeout'}
+
+
+# User Management Functions
+# Everything is written through storage.py's write-behind queue: saving a change returns
+# immediately and a background writer thread persists it. Users are a JSON file rewritten
+# atomically per batch; quiz results, answers and reviews are appended to logs that are
+# periodically compacted into their snapshot files.
+def users_file():
+    return storage.json_file(USERS_FILE)
+
+def build_user_index(users):
+    """Users plus a casefolded-username lookup, so duplicate checks don't scan every name."""
+    return {
+        'users': users,
+        'by_casefold': {name.casefold(): name for name in users},
+    }
+
+def authenticate(username, password):
+    """The user's full name if the username and password match, else None."""
+    users = users_file().cached('user_index', build_user_index)['users']
+    if username in users and users[username]['password'] == password:
+        return users[username]['full_name']
+    return None
+
+def record_user_quiz(users, username, accuracy):
+    """Count a finished quiz in the users data (a users_file() mutation step)."""
+    if username in users:
+        users[username]['total_quizzes'] = users[username].get('total_quizzes', 0) + 1
+        users[username]['best_score'] = max(users[username].get('best_score', 0), accuracy)
+
+def update_user_stats(username, accuracy):
+    """Queue a user statistics update after quiz completion."""
+    users_file().update(lambda users: record_user_quiz(users, username, accuracy))
+
+
+# Leaderboard
+def leaderboard_file():
+    return storage.snapshot_log(LEADERBOARD_FILE, LEADERBOARD_LOG_FILE, fold=apply_quiz_result,
+                                schema=LEADERBOARD_SCHEMA, migrate=migrate_leaderboard)
+
+def convert_legacy_leaderboard(data):
+    """Convert the old leaderboard format (a list of quiz results) to the per-user dict format."""
+    new_format = {}
+    for entry in data:
+        username = entry['name']
+        quiz_entry = {
+            'score': entry['score'],
+            'total': entry['total'],
+            'accuracy': entry['accuracy'],
+            'timestamp': entry.get('timestamp', ''),
+            'word_source': entry.get('word_source', 'unknown')
+        }
+        if username not in new_format:
+            new_format[username] = {
+                'name': entry['name'],
+                'total_score': entry['score'],
+                'total_questions': entry['total'],
+                'total_quizzes': 1,
+                'best_accuracy': entry['accuracy'],
+                'avg_accuracy': entry['accuracy'],
+                'last_quiz_date': entry.get('timestamp', entry.get('date', '')),
+                'quiz_history': [quiz_entry]
+            }
+        else:
+            # Aggregate multiple entries for same user
+            new_format[username]['total_score'] += entry['score']
+            new_format[username]['total_questions'] += entry['total']
+            new_format[username]['total_quizzes'] += 1
+            new_format[username]['best_accuracy'] = max(new_format[username]['best_accuracy'], entry['accuracy'])
+            new_format[username]['last_quiz_date'] = entry.get('timestamp', entry.get('date', ''))
+            new_format[username]['quiz_history'].append(quiz_entry)
+
+    # Average accuracy once per user, after all their entries are in
+    for user_data in new_format.values():
+        total_acc = sum(q['accuracy'] for q in user_data['quiz_history'])
+        user_data['avg_accuracy'] = round(total_acc / len(user_data['quiz_history']), 1)
+    return new_format
+
+def migrate_leaderboard(data, schema):
+    """Upgrade leaderboard data from an older schema (None: saved before the schema header
+    existed) to LEADERBOARD_SCHEMA. storage.py runs this once and saves the result."""
+    if schema is None and isinstance(data, list):
+        data = convert_legacy_leaderboard(data)
+    if schema is None or schema < 3:
+        for user_data in data.values():
+            user_data.setdefault('accuracy_sum', sum(q['accuracy'] for q in user_data['quiz_history']))
+            apply_history_retention(user_data)
+    if schema is None or schema < 4:
+        for user_data in data.values():
+            # Rolled-up days are all older than the attempts still in quiz_history
+            daily = user_data.get('history_rollups', {}).get('daily', {})
+            for day, bucket in sorted(daily.items()):
+                update_window_totals(user_data, day, bucket)
+            for entry in user_data['quiz_history']:
+                update_window_totals(user_data, entry['timestamp'][:10], _attempt_summary(entry))
+    return data
+
+def _attempt_summary(entry):
+    """A single quiz_history entry in rollup-bucket form."""
+    return {
+        'count': 1,
+        'accuracy_sum': entry['accuracy'],
+        'best_accuracy': entry['accuracy'],
+        'score': entry['score'],
+        'total': entry['total'],
+    }
+
+def _merge_rollup(buckets, key, summary):
+    """Add an attempt summary (count, accuracy_sum, best_accuracy, score, total) to a bucket."""
+    bucket = buckets.setdefault(key, {'count': 0, 'accuracy_sum': 0, 'best_accuracy': 0, 'score': 0, 'total': 0})
+    bucket['count'] += summary['count']
+    bucket['accuracy_sum'] += summary['accuracy_sum']
+    bucket['best_accuracy'] = max(bucket['best_accuracy'], summary['best_accuracy'])
+    bucket['score'] += summary['score']
+    bucket['total'] += summary['total']
+
+def _parse_day(day):
+    try:
+        return datetime.strptime(day, "%Y-%m-%d")
+    except ValueError:
+        return None  # legacy entries may have no timestamp
+
+def apply_history_retention(user_data):
+    """Keep the last QUIZ_HISTORY_RETENTION attempts in quiz_history, rolling older ones into
+    daily buckets, and daily buckets more than DAILY_ROLLUP_DAYS before the latest attempt into
+    weekly ones. Only looks at the user's own data, so replaying the log gives the same result."""
+    history = user_data['quiz_history']
+    overflow = len(history) - QUIZ_HISTORY_RETENTION
+    if overflow <= 0:
+        return
+
+    rollups = user_data.setdefault('history_rollups', {'daily': {}, 'weekly': {}})
+    for entry in history[:overflow]:
+        _merge_rollup(rollups['daily'], entry['timestamp'][:10] or 'undated', _attempt_summary(entry))
+    del history[:overflow]
+
+    latest = _parse_day(history[-1]['timestamp'][:10])
+    if latest is None:
+        return
+    cutoff = latest - timedelta(days=DAILY_ROLLUP_DAYS)
+    for day in list(rollups['daily']):
+        day_date = _parse_day(day)
+        if day_date is not None and day_date < cutoff:
+            iso_year, iso_week, _ = day_date.isocalendar()
+            _merge_rollup(rollups['weekly'], f"{iso_year}-W{iso_week:02d}", rollups['daily'].pop(day))
+
+def window_period(window, day_date):
+    """The day ("2026-10-19"), ISO week ("2026-W42") or month ("2026-10") containing a date."""
+    if window == "day":
+        return day_date.strftime("%Y-%m-%d")
+    if window == "week":
+        iso_year, iso_week, _ = day_date.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    return day_date.strftime("%Y-%m")
+
+def update_window_totals(user_data, day, summary):
+    """Add an attempt summary dated `day` to the user's running totals for each leaderboard
+    window. A window only holds its latest period: a later period starts it afresh."""
+    day_date = _parse_day(day)
+    if day_date is None:
+        return
+    windows = user_data.setdefault('windows', {})
+    for window in LEADERBOARD_WINDOWS:
+        period = window_period(window, day_date)
+        buckets = windows.get(window, {})
+        if period not in buckets:
+            if any(current > period for current in buckets):
+                continue  # older than the period already tracked
+            buckets = windows[window] = {}
+        _merge_rollup(buckets, period, summary)
+
+def get_accuracy_trend(user_data):
+    """Accuracy over time for a user, oldest first: one row per rolled-up week, then per
+    rolled-up day, then per day of the attempts still kept in quiz_history."""
+    rollups = user_data.get('history_rollups', {'daily': {}, 'weekly': {}})
+    recent = {}
+    for entry in user_data['quiz_history']:
+        _merge_rollup(recent, entry['timestamp'][:10] or 'undated', _attempt_summary(entry))
+    # A day can be split between a rolled-up bucket and the kept attempts
+    days = {day: dict(bucket) for day, bucket in rollups['daily'].items()}
+    for day, bucket in recent.items():
+        _merge_rollup(days, day, bucket)
+
+    trend = []
+    for period, bucket in sorted(rollups['weekly'].items()):
+        trend.append((f"Week {period}", bucket))
+    for period, bucket in sorted(days.items()):
+        trend.append((period, bucket))
+    return [
+        {
+            'Period': period,
+            'Quizzes': bucket['count'],
+            'Avg Accuracy (%)': round(bucket['accuracy_sum'] / bucket['count'], 1),
+            'Best (%)': bucket['best_accuracy'],
+        }
+        for period, bucket in trend
+    ]
+
+def apply_quiz_result(leaderboard, result):
+    """Fold one logged quiz result into the leaderboard - updates existing user or creates new entry."""
+    name = result['name']
+    quiz_entry = {
+        'score': result['score'],
+        'total': result['total'],
+        'accuracy': result['accuracy'],
+        'timestamp': result['timestamp'],
+        'word_source': result['word_source']
+    }
+
+    if name in leaderboard:
+        # Update existing user
+        leaderboard[name]['total_score'] += quiz_entry['score']
+        leaderboard[name]['total_questions'] += quiz_entry['total']
+        leaderboard[name]['total_quizzes'] += 1
+        leaderboard[name]['best_accuracy'] = max(leaderboard[name]['best_accuracy'], quiz_entry['accuracy'])
+        leaderboard[name]['last_quiz_date'] = quiz_entry['timestamp']
+        leaderboard[name]['quiz_history'].append(quiz_entry)
+        
+        # Running accuracy total, since quiz_history no longer holds every attempt
+        leaderboard[name]['accuracy_sum'] += quiz_entry['accuracy']
+        leaderboard[name]['avg_accuracy'] = round(leaderboard[name]['accuracy_sum'] / leaderboard[name]['total_quizzes'], 1)
+        update_window_totals(leaderboard[name], quiz_entry['timestamp'][:10], _attempt_summary(quiz_entry))
+        apply_history_retention(leaderboard[name])
+    else:
+        # Create new user entry
+        leaderboard[name] = {
+            'name': name,
+            'total_score': quiz_entry['score'],
+            'total_questions': quiz_entry['total'],
+            'total_quizzes': 1,
+            'best_accuracy': quiz_entry['accuracy'],
+            'avg_accuracy': quiz_entry['accuracy'],
+            'accuracy_sum': quiz_entry['accuracy'],
+            'last_quiz_date': quiz_entry['timestamp'],
+            'quiz_history': [quiz_entry]
+        }
+        update_window_totals(leaderboard[name], quiz_entry['timestamp'][:10], _attempt_summary(quiz_entry))
+
+def quiz_result_record(name, score, total, accuracy, word_source):
+    """A finished quiz, as appended to the leaderboard log."""
+    return {
+        'name': name,
+        'score': score,
+        'total': total,
+        'accuracy': accuracy,
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'word_source': word_source
+    }
+
+def save_quiz_result(user, name, score, total, word_source):
+    """Append a finished quiz to the leaderboard and, for a logged-in user, their stats.
+    Returns the accuracy saved. Used by the app's quiz card, QuizSession and CompetitionRoom."""
+    accuracy = round(score / total * 100, 1) if total > 0 else 0
+    leaderboard_file().append(quiz_result_record(name, score, total, accuracy, word_source))
+    if user:
+        update_user_stats(user, accuracy)
+    return accuracy
+
+def leaderboard_rank_key(entry):
+    """Leaderboard order: best accuracy, then total score (both descending)."""
+    return (entry['best_accuracy'], entry['total_score'])
+
+def build_leaderboard_snapshot(leaderboard):
+    """Leaderboard data plus the full ranking, sorted once per change rather than per view."""
+    ranking = sorted(leaderboard.values(), key=leaderboard_rank_key, reverse=True)
+    return {
+        'users': leaderboard,
+        'ranking': ranking,
+        'search_names': [entry['name'].casefold() for entry in ranking],
+        # Ascending (negated) rank keys, parallel to ranking, for bisecting a user's rank
+        'rank_keys': [tuple(-value for value in leaderboard_rank_key(entry)) for entry in ranking],
+        'window_rankings': {},  # (window, period) -> ranking, filled in by get_window_ranking
+    }
+
+
+# Word Difficulty Stats
+def word_stats_file():
+    return storage.snapshot_log(WORD_STATS_FILE, WORD_ATTEMPTS_LOG_FILE, fold=apply_word_attempt,
+                                schema=WORD_STATS_SCHEMA)
+
+def apply_word_attempt(word_stats, attempt):
+    """Fold one logged quiz answer into the per-list, per-word counters."""
+    words = word_stats.setdefault(attempt['list'], {})
+    stats = words.setdefault(attempt['word'], {
+        'attempts': 0,
+        'misses': 0,
+        'case_errors': 0,
+        'timeouts': 0,
+        'miss_similarity_sum': 0,
+        'misspellings': {}
+    })
+    stats['attempts'] += 1
+    if attempt['correct']:
+        return
+    stats['misses'] += 1
+    stats['miss_similarity_sum'] += attempt['similarity']
+    if attempt['error_type'] == 'case':
+        stats['case_errors'] += 1
+    elif attempt['error_type'] == 'timeout':
+        stats['timeouts'] += 1
+    if attempt['answer']:
+        stats['misspellings'][attempt['answer']] = stats['misspellings'].get(attempt['answer'], 0) + 1
+
+def build_word_difficulty(word_stats):
+    """Per word list, one row per word, hardest (highest miss rate) first."""
+    tables = {}
+    for list_name, words in word_stats.items():
+        rows = []
+        for word, stats in words.items():
+            misses = stats['misses']
+            common = sorted(stats['misspellings'].items(), key=lambda item: item[1], reverse=True)[:3]
+            rows.append({
+                'Word': word,
+                'Attempts': stats['attempts'],
+                'Misses': misses,
+                'Miss Rate (%)': round(100 * misses / stats['attempts'], 1),
+                'Case Errors': stats['case_errors'],
+                'Timeouts': stats['timeouts'],
+                'Avg Similarity When Missed (%)': round(stats['miss_similarity_sum'] / misses, 1) if misses else None,
+                'Common Misspellings': ", ".join(f"{answer} ({count})" for answer, count in common),
+            })
+        rows.sort(key=lambda row: (row['Miss Rate (%)'], row['Attempts']), reverse=True)
+        tables[list_name] = rows
+    return tables
+
+
+# Review Schedule (spaced repetition) and Error Model
+def revision_file():
+    return storage.snapshot_log(REVISION_FILE, REVISION_LOG_FILE, fold=apply_review,
+                                schema=REVISION_SCHEMA, migrate=migrate_revisions)
+
+def migrate_revisions(data, schema):
+    """Upgrade revision.json from an older schema to REVISION_SCHEMA."""
+    if schema is None or schema < 2:
+        for words in data.values():
+            for record in words.values():
+                # Every review either continued a run or lapsed; earlier runs were reset
+                # by a lapse, so this is a lower bound on the true count
+                record.setdefault('attempts', record['reps'] + record['lapses'])
+    return data
+
+def answer_quality(grade):
+    """SM-2 recall quality (0-5) for a graded answer (see grade_answer)."""
+    if grade['correct']:
+        return 5
+    if grade['error_type'] == 'case':
+        return 3  # spelled right, capitalized wrong
+    if grade['error_type'] == 'timeout':
+        return 0
+    return 2 if grade['similarity'] >= 70 else 1
+
+def schedule_review(record, quality, day):
+    """The SM-2 schedule after reviewing a word on `day` (YYYY-MM-DD) with recall `quality`.
+    Returns a new record: {'ef', 'interval', 'reps', 'lapses', 'attempts', 'due', 'last_review'}."""
+    record = dict(record or {'ef': 2.5, 'interval': 0, 'reps': 0, 'lapses': 0, 'attempts': 0})
+    record['attempts'] += 1
+    if quality >= 3:
+        record['reps'] += 1
+        if record['reps'] == 1:
+            record['interval'] = 1
+        elif record['reps'] == 2:
+            record['interval'] = 6
+        else:
+            record['interval'] = round(record['interval'] * record['ef'])
+    else:
+        # Forgotten: start the word over, due again tomorrow
+        record['reps'] = 0
+        record['interval'] = 1
+        record['lapses'] += 1
+    record['ef'] = round(max(1.3, record['ef'] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)), 2)
+    review_date = _parse_day(day) or datetime.now()
+    record['due'] = (review_date + timedelta(days=record['interval'])).strftime("%Y-%m-%d")
+    record['last_review'] = review_date.strftime("%Y-%m-%d")
+    return record
+
+def apply_review(revisions, review):
+    """Fold one logged review into the reviewing user's schedule."""
+    words = revisions.setdefault(review['user'], {})
+    words[review['word']] = schedule_review(words.get(review['word']), review['quality'], review['timestamp'][:10])
+
+@functools.lru_cache(maxsize=20000)
+def word_features(word):
+    """Spelling patterns a word shares with others: its letter trigrams (with ^/$ marking the
+    ends, so "^kn" and "ght$" are patterns of their own) and its sound pairs (ARPAbet phoneme
+    bigrams, stress removed) - so words with the same tricky spot share a feature."""
+    letters = f"^{word.lower()}$"
+    features = {f"g:{letters[i:i + 3]}" for i in range(len(letters) - 2)}
+    phones = pronouncing.phones_for_word(word.lower())
+    if phones:
+        phonemes = [p.rstrip('012') for p in phones[0].split()]
+        features.update(f"p:{a}-{b}" for a, b in zip(phonemes, phonemes[1:]))
+    return tuple(features)
+
+def add_error_features(features, word, misses, attempts):
+    """Add a word's misses/attempts to each of its patterns' [misses, attempts] totals."""
+    for feature in word_features(word):
+        counts = features.setdefault(feature, [0, 0])
+        counts[0] += misses
+        counts[1] += attempts
+
+def word_error_rate(word, records, features):
+    """Estimated chance (0-1) the user misspells `word`: from their own record of the word
+    where there is one, blended with their error rate on its spelling patterns."""
+    pattern_rates = [(misses + 1) / (attempts + 2)
+                     for misses, attempts in (features.get(f, (0, 0)) for f in word_features(word))
+                     if attempts]
+    pattern_rate = sum(pattern_rates) / len(pattern_rates) if pattern_rates else 0.5
+    record = records.get(word)
+    if not record or not record['attempts']:
+        return pattern_rate
+    word_rate = (record['lapses'] + 1) / (record['attempts'] + 2)
+    return 0.6 * word_rate + 0.4 * pattern_rate
+
+class ReviewQueue:
+    """A user's review schedule in memory: their records, a heap of (due date, word) per word
+    list quizzed from (see next_due) and their error model (see add_error_features). Heap
+    entries whose date no longer matches the schedule are stale and skipped when popped."""
+
+    def __init__(self, user, records):
+        self.user = user
+        self.records = dict(records)
+        self.list_heaps = {}  # {list_name: (words seen from the list, heap of (due, word))}
+        self.features = {}
+        for word, record in self.records.items():
+            add_error_features(self.features, word, record['lapses'], record['attempts'])
+
+    @classmethod
+    def load(cls, user):
+        """The user's saved schedule. Load it before logging the user's next answer, or that
+        answer would be applied to it twice."""
+        return cls(user, revision_file().load().get(user, {}))
+
+    def review(self, word, quality, day):
+        """Reschedule a word reviewed on `day` with recall `quality`; returns its new record."""
+        previous = self.records.get(word)
+        record = schedule_review(previous, quality, day)
+        self.records[word] = record
+        for words, heap in self.list_heaps.values():
+            if word in words:
+                heapq.heappush(heap, (record['due'], word))
+        # A lapse is a miss; update the error model by the difference
+        add_error_features(self.features, word,
+                           record['lapses'] - (previous['lapses'] if previous else 0),
+                           record['attempts'] - (previous['attempts'] if previous else 0))
+        return record
+
+    def next_due(self, candidates, list_name=None):
+        """The most overdue word among `candidates` (unused words of the list `list_name`) that
+        is due for review today, or None.
+        Each list has its own heap, so due words from the user's other lists are never popped;
+        words of the list that are new to the heap (e.g. still loading) are added as they appear.
+        An answered word is rescheduled to a later day, so the only due entries set aside are the
+        list's words skipped in this quiz: a pick is O(log n) plus those."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        candidates = set(candidates)
+        words, heap = self.list_heaps.setdefault(list_name, (set(), []))
+        new_words = candidates - words
+        if new_words:
+            words |= new_words
+            heap.extend((self.records[word]['due'], word) for word in new_words if word in self.records)
+            heapq.heapify(heap)
+        skipped = []
+        found = None
+        while heap and heap[0][0] <= today:
+            due, word = heapq.heappop(heap)
+            if self.records[word]['due'] != due:
+                continue  # rescheduled since this entry was pushed
+            skipped.append((due, word))
+            if word in candidates:
+                found = word
+                break
+        # Due words that aren't available right now stay queued for later
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        return found
+
+    def due_count(self):
+        """How many of the user's words are due for review today."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        return sum(1 for record in self.records.values() if record['due'] <= today)
+
+    def pick_adaptive(self, candidates):
+        """Pick a quiz word at random, weighted towards the ones the user is likely to misspell.
+        Large lists are sampled first, so a pick costs the same for 50 words or 5,000."""
+        if len(candidates) > ADAPTIVE_SAMPLE_SIZE:
+            candidates = random.sample(candidates, ADAPTIVE_SAMPLE_SIZE)
+        # A floor weight keeps easy words in rotation
+        weights = [0.1 + word_error_rate(word, self.records, self.features) for word in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+
+def review_record(user, word, grade, timestamp):
+    """A graded answer, as appended to the review schedule log."""
+    return {
+        'user': user,
+        'word': word,
+        'quality': answer_quality(grade),
+        'timestamp': timestamp
+    }
+
+def word_attempt_record(user, word, answer, grade, list_name, timestamp):
+    """A graded answer, as appended to the word stats log."""
+    return {
+        'user': user,
+        'word': word,
+        'answer': answer,
+        'correct': grade['correct'],
+        'similarity': round(grade['similarity'], 1),
+        'error_type': grade['error_type'],
+        'list': list_name,
+        'timestamp': timestamp
+    }
+
+def log_answer(user, word, answer, grade, list_name, review_queue=None):
+    """Queue a graded answer for the word difficulty stats and, when there is a user, their
+    review schedule - also applied to `review_queue`, the user's schedule in memory."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if user:
+        record = review_record(user, word, grade, timestamp)
+        revision_file().append(record)
+        if review_queue is not None:
+            review_queue.review(word, record['quality'], timestamp[:10])
+    word_stats_file().append(word_attempt_record(user, word, answer, grade, list_name, timestamp))
+
+
+# Quiz Sessions
+QUIZ_ORDERS = ("sequential", "random", "adaptive")
+
+def choose_next_word(available, order="sequential", review_queue=None, review_first=False, list_name=None):
+    """Pick the next quiz word from `available` (the unused words of the list `list_name`, in
+    list order): a review word that is due if review_first, otherwise by `order` ("adaptive"
+    favours the user's weak words). Returns (word, is_review). Used by the app's quiz card and
+    QuizSession."""
+    if review_first and review_queue is not None:
+        word = review_queue.next_due(available, list_name)
+        if word is not None:
+            return word, True
+    if order == "adaptive" and review_queue is not None:
+        return review_queue.pick_adaptive(available), False
+    if order in ("random", "adaptive"):
+        return random.choice(available), False
+    return available[0], False
+
+
+class QuizSession:
+    """One student's quiz over a word list, with the same steps as the app's quiz card: get a
+    word, answer or skip it, repeat, then finish to save the result to the leaderboard. Answers
+    go to the word stats and the user's review schedule as they are graded. Word choice, grading
+    and saving go through the same functions the quiz card uses (choose_next_word, grade_answer,
+    log_answer, save_quiz_result)."""
+
+    ORDERS = QUIZ_ORDERS
+
+    def __init__(self, user, name, words, list_name, word_source, order="sequential", review_first=False):
+        if order not in self.ORDERS:
+            raise ValueError(f"Unknown word order: {order}")
+        self.user = user
+        self.name = name
+        self.words = list(words)
+        self.list_name = list_name
+        self.word_source = word_source
+        self.order = order
+        self.review_first = review_first
+        self.review_queue = ReviewQueue.load(user) if user else None
+        self.used = []
+        self._used = set()
+        self.current = None
+        self.answered = False
+        self.score = 0
+        self.total = 0
+        self.wrong_attempts = []
+        self.finished = False
+
+    @property
+    def remaining(self):
+        return len(self.words) - len(self.used)
+
+    @property
+    def accuracy(self):
+        return round(self.score / self.total * 100, 1) if self.total > 0 else 0
+
+    def next_word(self):
+        """Move on to the next word and return it, or None when every word has been used."""
+        if self.current is not None and not self.answered:
+            raise ValueError("Answer or skip the current word first.")
+        available = [w for w in self.words if w not in self._used]
+        if not available:
+            self.current = None
+            return None
+        word, _ = choose_next_word(
+            available, self.order, self.review_queue, self.review_first, self.list_name)
+        self.current = word
+        self.answered = False
+        return word
+
+    def submit(self, answer):
+        """Grade an answer to the current word (see grade_answer) and record it."""
+        if self.current is None or self.answered:
+            raise ValueError("There is no word waiting for an answer.")
+        word = self.current
+        grade = grade_answer(word, answer)
+        self.answered = True
+        self.total += 1
+        self.used.append(word)
+        self._used.add(word)
+        if grade['correct']:
+            self.score += 1
+        else:
+            self.wrong_attempts.append({
+                'correct': word,
+                'your_answer': answer,
+                'similarity': grade['similarity'],
+                'error_type': grade['error_type']
+            })
+        log_answer(self.user, word, answer, grade, self.list_name, self.review_queue)
+        return grade
+
+    def skip(self):
+        """Skip the current word without grading it."""
+        if self.current is None or self.answered:
+            raise ValueError("There is no word to skip.")
+        self.used.append(self.current)
+        self._used.add(self.current)
+        self.current = None
+
+    def finish(self):
+        """Save the result to the leaderboard and the user's stats (once) and return it."""
+        if not self.finished and self.total > 0:
+            save_quiz_result(self.user, self.name, self.score, self.total, self.word_source)
+            self.finished = True
+        return {
+            'name': self.name,
+            'score': self.score,
+            'total': self.total,
+            'accuracy': self.accuracy,
+            'word_source': self.word_source,
+            'saved': self.finished,
+            'wrong_attempts': self.wrong_attempts,
+        }
+
+
+# Competition Rooms
+class CompetitionRoom:
+    """A classroom spelling bee: the host moves everyone through the same words, each open for
+    `seconds`, and answers are graded here rather than by the clients. As in Competition Mode,
+    a participant who doesn't answer in time gets the word marked as a timeout. Times are
+    passed in (`now`, in seconds) so the caller owns the clock; quiz_api.py pushes the room to
+    its participants."""
+
+    ORDERS = ("sequential", "random")
+    MIN_SECONDS = 5
+    MAX_SECONDS = 120
+
+    def __init__(self, host, words, list_name, word_source, seconds=30, order="sequential"):
+        if order not in self.ORDERS:
+            raise ValueError(f"Unknown word order: {order}")
+        if not self.MIN_SECONDS <= seconds <= self.MAX_SECONDS:
+            raise ValueError(f"Time per word must be {self.MIN_SECONDS}-{self.MAX_SECONDS} seconds.")
+        self.host = host
+        self.words = list(words)
+        if order == "random":
+            random.shuffle(self.words)
+        self.list_name = list_name
+        self.word_source = word_source
+        self.seconds = seconds
+        self.position = 0
+        self.current = None
+        self.opened_at = None
+        self.deadline = None
+        self.players = {}
+        self.expected = set()
+        self.answers = {}
+        self.finished = False
+
+    @property
+    def remaining(self):
+        return len(self.words) - self.position
+
+    def join(self, user, name):
+        """Add a participant, or return the standing of one who is rejoining."""
+        if user not in self.players:
+            self.players[user] = {'user': user, 'name': name, 'score': 0, 'total': 0, 'time': 0.0}
+        return self.players[user]
+
+    def open_word(self, now):
+        """Open the next word for answers and return it, or None when the list is used up."""
+        if self.finished:
+            raise ValueError("The competition is over.")
+        if self.current is not None:
+            raise ValueError("Close the current word first.")
+        if self.position >= len(self.words):
+            return None
+        self.current = self.words[self.position]
+        self.position += 1
+        self.opened_at = now
+        self.deadline = now + self.seconds
+        # Whoever is here when the word opens owes an answer; later joiners may still give one
+        self.expected = set(self.players)
+        self.answers = {}
+        return self.current
+
+    def answer(self, user, answer, now):
+        """Grade a participant's answer to the open word (see grade_answer) and record it."""
+        if user not in self.players:
+            raise ValueError("Join the room first.")
+        if self.current is None or now > self.deadline:
+            raise ValueError("No word is open for answers.")
+        if user in self.answers:
+            raise ValueError("You have already answered this word.")
+        grade = grade_answer(self.current, answer)
+        standing = self.players[user]
+        standing['total'] += 1
+        if grade['correct']:
+            standing['score'] += 1
+            standing['time'] += now - self.opened_at
+        self.answers[user] = grade
+        log_answer(user, self.current, answer, grade, self.list_name)
+        return grade
+
+    def close_word(self):
+        """Close the open word, marking it as timed out for everyone who didn't answer, and
+        return it."""
+        word = self.current
+        if word is None:
+            return None
+        for user in self.expected - self.answers.keys():
+            self.players[user]['total'] += 1
+            log_answer(user, word, '', timeout_grade(), self.list_name)
+        self.current = None
+        self.deadline = None
+        return word
+
+    def standings(self):
+        """Participants by words right, then by total time taken on them (fastest first)."""
+        ranked = sorted(self.players.values(), key=lambda p: (-p['score'], p['time'], p['name']))
+        return [{'rank': rank, 'name': p['name'], 'score': p['score'], 'total': p['total'],
+                 'time': round(p['time'], 1)}
+                for rank, p in enumerate(ranked, 1)]
+
+    def finish(self):
+        """Close the open word and save each participant's result to the leaderboard and
+        their stats (once). Returns the final standings."""
+        if not self.finished:
+            self.close_word()
+            for standing in self.players.values():
+                if standing['total'] > 0:
+                    save_quiz_result(standing['user'], standing['name'], standing['score'],
+                                     standing['total'], self.word_source)
+            self.finished = True
+        return self.standings()
+
+
+# Batch Grading (paper / form tests)
+ANSWER_SHEET_COLUMNS = {
+    'student': ('student', 'name', 'username', 'student name'),
+    'number': ('word#', 'word #', 'word number', 'word_number', 'number', '#', 'no', 'no.'),
+    'answer': ('answer', 'spelling', 'response'),
+}
+
+def read_answer_sheet(text):
+    """Parse a CSV of (student, word number, answer) rows, with or without a header row (in any
+    column order, see ANSWER_SHEET_COLUMNS). Returns (rows, problems): rows are
+    (line, student, number, answer) tuples, problems are (line, message) for rows skipped."""
+    reader = csv.reader(text.splitlines())
+    columns = (0, 1, 2)
+    rows, problems = [], []
+    first = True  # the first non-blank record, which may be a header
+    for line, fields in enumerate(reader, 1):
+        if not any(field.strip() for field in fields):
+            continue
+        is_first, first = first, False
+        if is_first:
+            header = [field.strip().lower() for field in fields]
+            found = [next((i for i, name in enumerate(header) if name in names), None)
+                     for names in ANSWER_SHEET_COLUMNS.values()]
+            if None not in found:
+                columns = tuple(found)
+                continue
+        try:
+            student, number, answer = (fields[i].strip() for i in columns)
+        except IndexError:
+            problems.append((line, "Expected three columns: student, word number, answer."))
+            continue
+        if not student:
+            problems.append((line, "Missing student."))
+            continue
+        try:
+            number = int(number.lstrip('#'))
+        except ValueError:
+            if is_first:  # an unrecognised header
+                problems.append((line, "Skipped header row."))
+            else:
+                problems.append((line, f"Word number {number!r} is not a number."))
+            continue
+        rows.append((line, student, number, answer))
+    return rows, problems
+
+def match_students(students):
+    """{student as written: (username or None, display name)}. A student matches an account
+    by username (ignoring case), then by full name if exactly one account has it; anyone else
+    keeps the name as written and is only added to the leaderboard."""
+    index = users_file().cached('user_index', build_user_index)
+    users = index['users']
+    by_full_name = {}
+    for username, user in users.items():
+        by_full_name.setdefault(user['full_name'].casefold(), []).append(username)
+    matched = {}
+    for student in students:
+        username = index['by_casefold'].get(student.casefold())
+        if username is None:
+            candidates = by_full_name.get(student.casefold(), [])
+            username = candidates[0] if len(candidates) == 1 else None
+        matched[student] = (username, users[username]['full_name']) if username else (None, student)
+    return matched
+
+def grade_answer_sheet(rows, numbered):
+    """Grade answer sheet rows (see read_answer_sheet) against `numbered`, the list's
+    {number: word} as printed (see load_numbered_list), with grade_answer's classification.
+    An answer given by several students (the common misspellings) is graded once. Returns
+    (graded, problems): one dict per graded row, and (line, message) for rows skipped (bad
+    word number, duplicate answer)."""
+    grades = {}
+    seen = set()
+    graded, problems = [], []
+    for line, student, number, answer in rows:
+        word = numbered.get(number)
+        if word is None:
+            problems.append((line, f"Word number {number} is not on the list."))
+            continue
+        if (student, number) in seen:
+            problems.append((line, f"{student} already has an answer for word {number}."))
+            continue
+        seen.add((student, number))
+        grade = grades.get((number, answer))
+        if grade is None:
+            grade = grades[(number, answer)] = grade_answer(word, answer)
+        graded.append({'student': student, 'number': number, 'word': word,
+                       'answer': answer, **grade})
+    return graded, problems
+
+def summarize_answer_sheet(graded):
+    """Per student: {'student', 'score', 'total', 'accuracy'}, in the order they first appear."""
+    totals = {}
+    for row in graded:
+        total = totals.setdefault(row['student'], {'student': row['student'], 'score': 0, 'total': 0})
+        total['total'] += 1
+        total['score'] += row['correct']
+    for total in totals.values():
+        total['accuracy'] = round(total['score'] / total['total'] * 100, 1)
+    return list(totals.values())
+
+def paper_tests_file():
+    return storage.json_file(PAPER_TESTS_FILE)
+
+def answer_sheet_key(text, list_name):
+    """Identifies an uploaded answer sheet graded against a list, for paper_tests.json."""
+    return hashlib.sha256(f"{list_name}\n{text}".encode()).hexdigest()
+
+def save_answer_sheet(graded, list_name, sheet_key, saved_by, word_source="paper"):
+    """Record a graded sheet: one leaderboard result per student, and every answer in the word
+    stats and (for students with accounts) their review schedules. Each store gets the whole
+    sheet as one batch (see storage.SnapshotLog.append_many) rather than a write per row.
+
+    The sheet (`sheet_key`, see answer_sheet_key) is claimed in paper_tests.json, under the
+    file lock, before anything is written, so two people saving it at once can't both count
+    it: raises ValueError if it is saved or being saved. The claim only becomes "saved" once
+    every store has the sheet on disk; if a write fails it is removed again, so the sheet can
+    be saved later. Returns the number of students saved."""
+    now = datetime.now()
+    timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+    claim = secrets.token_hex(8)
+
+    # Build every record first, so a bad sheet fails before anything is claimed or written
+    summary = summarize_answer_sheet(graded)
+    students = match_students(total['student'] for total in summary)
+    results, reviews, attempts = [], [], []
+    for total in summary:
+        username, name = students[total['student']]
+        result = quiz_result_record(name, total['score'], total['total'], total['accuracy'], word_source)
+        result['timestamp'] = timestamp
+        results.append(result)
+    for row in graded:
+        username, _ = students[row['student']]
+        if username:
+            reviews.append(review_record(username, row['word'], row, timestamp))
+        attempts.append(word_attempt_record(username, row['word'], row['answer'], row, list_name, timestamp))
+
+    def record_quizzes(users):
+        for total in summary:
+            record_user_quiz(users, students[total['student']][0], total['accuracy'])
+
+    def claim_sheet(sheets):
+        saved = sheets.get(sheet_key)
+        if saved is not None:
+            started = datetime.strptime(saved['timestamp'], "%Y-%m-%d %H:%M:%S")
+            if 'saving' not in saved:
+                raise ValueError(f"This sheet was already saved by {saved['saved_by']} on {saved['timestamp']}.")
+            if (now - started).total_seconds() < PAPER_TEST_SAVE_SECONDS:
+                raise ValueError(f"This sheet is being saved by {saved['saved_by']} right now.")
+        sheets[sheet_key] = {'list': list_name, 'saved_by': saved_by, 'timestamp': timestamp, 'saving': claim}
+
+    def finish_claim(sheets):
+        if sheets.get(sheet_key, {}).get('saving') == claim:
+            del sheets[sheet_key]['saving']
+
+    def release_claim(sheets):
+        if sheets.get(sheet_key, {}).get('saving') == claim:
+            del sheets[sheet_key]
+
+    paper_tests_file().update(claim_sheet).result()
+    try:
+        writes = [*leaderboard_file().append_many(results), *word_stats_file().append_many(attempts),
+                  *revision_file().append_many(reviews), users_file().update(record_quizzes)]
+        for write in writes:
+            write.result()
+    except BaseException:
+        paper_tests_file().update(release_claim)
+        raise
+    paper_tests_file().update(finish_claim).result()
+    return len(summary)
@@ -0,0 +1,297 @@
+import importlib.util
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from pdf_extraction import read_pdf_text
+
+# Smart extraction: a small Hugging Face NER model that keeps multi-word proper-noun phrases
+# ("Mount Rushmore") together. Like pdf_extraction.py this has no Streamlit dependency, so the
+# model code can be checked outside the app (see tests/test_smart_extraction.py); spellbowl.py
+# only adds the Streamlit caching around it.
+
+APP_DIR = Path(__file__).resolve().parent
+
+# Chunks are run through the model in batches, which is much faster on CPU than one call per
+# chunk; raise NER_BATCH_SIZE on hosts with spare memory.
+NER_MODEL = "dslim/distilbert-NER"
+NER_BATCH_SIZE = 8
+# Chunks are whole lines of the PDF text (see chunk_text_for_ner), measured with the model's own
+# tokenizer so none overflows its 512-token input (a chunk that did would fail and be skipped).
+NER_CHUNK_TOKENS = 400
+NER_CHUNK_CHARS = 1200  # the budget for a pipeline without a tokenizer to measure with
+NER_OVERLAP_LINES = 2
+NER_THREADS = None  # torch intra-op threads for the model; None keeps torch's default (one per core)
+# Which runtime executes the model:
+#   "auto"  - the ONNX Runtime export if it matched torch on the bundled lists, otherwise torch
+#   "onnx"  - ONNX Runtime export of the model (same weights, faster CPU inference, less memory)
+#   "int8"  - torch with int8 dynamically-quantized linear layers (smaller/faster, tiny accuracy cost)
+#   "torch" - the original full-precision torch model
+NER_BACKEND = "auto"
+# The ONNX export is made once per model and kept here, so later starts load it directly
+# instead of re-exporting (which also needs torch). Run `python smart_extraction.py` to
+# export and check it ahead of time, e.g. as a deploy step.
+NER_ONNX_DIR = Path.home() / ".cache" / "spellbowl" / "onnx"
+ONNX_PARITY_FILE = "parity.json"  # written next to the export: did it match torch?
+
+_loaded_backends = {}  # {(model_name, requested backend): backend load_ner actually loaded}
+
+
+def smart_extraction_installed():
+    """True if the optional smart extraction packages (see requirements-optional.txt) are installed."""
+    return importlib.util.find_spec("transformers") is not None
+
+
+def onnx_backend_available():
+    """True if the optional ONNX Runtime packages for smart extraction are installed."""
+    return all(importlib.util.find_spec(name) is not None for name in ("optimum", "onnxruntime"))
+
+
+def onnx_model_dir(model_name=NER_MODEL):
+    """Where the ONNX export of model_name is kept."""
+    return NER_ONNX_DIR / model_name.replace("/", "--")
+
+
+def onnx_parity(model_name=NER_MODEL):
+    """The parity result saved with the ONNX export, or None if it hasn't been exported yet."""
+    try:
+        return json.loads((onnx_model_dir(model_name) / ONNX_PARITY_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def onnx_backend_verified(model_name=NER_MODEL):
+    """True once the ONNX export has been found to give the same phrases as torch on the
+    bundled word lists - only then is it used by "auto" and smart extraction switched on by default."""
+    parity = onnx_parity(model_name)
+    return bool(parity and parity.get("matches"))
+
+
+def bundled_list_texts():
+    """{path: text} of the word list PDFs shipped with the app (e.g. 2026/junior/...pdf)."""
+    return {
+        path.relative_to(APP_DIR).as_posix(): read_pdf_text(path)
+        for path in sorted(APP_DIR.glob("[0-9][0-9][0-9][0-9]/*/*.pdf"))
+    }
+
+
+def _ner_pipeline(model, tokenizer):
+    from transformers import pipeline
+    return pipeline("ner", model=model, tokenizer=tokenizer, aggregation_strategy="simple")
+
+
+def _load_exported_onnx(model_dir):
+    from optimum.onnxruntime import ORTModelForTokenClassification
+    from transformers import AutoTokenizer
+    model = ORTModelForTokenClassification.from_pretrained(model_dir)
+    return _ner_pipeline(model, AutoTokenizer.from_pretrained(model_dir))
+
+
+def _load_torch_ner(model_name, quantize=False):
+    import torch
+    from transformers import AutoModelForTokenClassification, AutoTokenizer
+    if NER_THREADS:
+        torch.set_num_threads(NER_THREADS)
+    model = AutoModelForTokenClassification.from_pretrained(model_name)
+    if quantize:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return _ner_pipeline(model, AutoTokenizer.from_pretrained(model_name))
+
+
+def compare_ner_pipelines(ner_pipe, reference_pipe, texts):
+    """Phrases found by only one of two pipelines, per text ({name: {...}}); empty when they agree."""
+    mismatches = {}
+    for name, text in texts.items():
+        found = extract_ner_phrases(text, ner_pipe)
+        expected = extract_ner_phrases(text, reference_pipe)
+        if found != expected:
+            mismatches[name] = {"missing": sorted(expected - found), "extra": sorted(found - expected)}
+    return mismatches
+
+
+def export_onnx_model(model_name=NER_MODEL):
+    """Export model_name to ONNX into onnx_model_dir and check it against the torch model on
+    the bundled word lists, saving the result with it. Needs torch; loading the export later doesn't.
+    Returns the parity result ({"matches": bool, "mismatches": {...}})."""
+    from optimum.onnxruntime import ORTModelForTokenClassification
+    from transformers import AutoTokenizer
+
+    model_dir = onnx_model_dir(model_name)
+    model_dir.parent.mkdir(parents=True, exist_ok=True)
+    # Build the export in a temp dir and move it into place, so a half-written export (or a
+    # second app process exporting at the same time) is never loaded
+    export_dir = Path(tempfile.mkdtemp(prefix=model_dir.name + ".", dir=model_dir.parent))
+    try:
+        ORTModelForTokenClassification.from_pretrained(model_name, export=True).save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+        mismatches = compare_ner_pipelines(
+            _load_exported_onnx(export_dir), _load_torch_ner(model_name), bundled_list_texts())
+        parity = {"model": model_name, "matches": not mismatches, "mismatches": mismatches}
+        (export_dir / ONNX_PARITY_FILE).write_text(json.dumps(parity, indent=2), encoding="utf-8")
+        shutil.rmtree(model_dir, ignore_errors=True)
+        try:
+            os.replace(export_dir, model_dir)
+        except OSError:
+            pass  # another process moved its export in first; that one is used instead
+    finally:
+        shutil.rmtree(export_dir, ignore_errors=True)
+    return parity
+
+
+def _load_onnx_ner(model_name, verified_only=False):
+    if onnx_parity(model_name) is None:
+        export_onnx_model(model_name)
+    if verified_only and not onnx_backend_verified(model_name):
+        raise RuntimeError("the ONNX export finds different phrases from the torch model")
+    return _load_exported_onnx(onnx_model_dir(model_name))
+
+
+def ner_backend(model_name=NER_MODEL, backend=NER_BACKEND):
+    """The backend load_ner(model_name, backend) runs the model on: the one it loaded, once it
+    has in this process, otherwise the one it will try first. Results cached per backend (see
+    spellbowl.find_ner_phrases) key on this, so a fallback to torch never passes for "int8"."""
+    if (model_name, backend) in _loaded_backends:
+        return _loaded_backends[model_name, backend]
+    if backend == "auto":
+        parity = onnx_parity(model_name)
+        if not onnx_backend_available() or (parity is not None and not parity.get("matches")):
+            return "torch"
+        return "onnx"
+    return backend
+
+
+def load_ner(model_name=NER_MODEL, backend=NER_BACKEND):
+    """Load the NER pipeline, trying the requested backend first and falling back to
+    full-precision torch. Returns None if transformers/torch aren't installed."""
+    requested = backend
+    loaders = {
+        "auto": lambda: _load_onnx_ner(model_name, verified_only=True),
+        "onnx": lambda: _load_onnx_ner(model_name),
+        "int8": lambda: _load_torch_ner(model_name, quantize=True),
+        "torch": lambda: _load_torch_ner(model_name),
+    }
+    if backend == "auto" and not onnx_backend_available():
+        backend = "torch"
+    for name in dict.fromkeys([backend, "torch"]):
+        try:
+            ner_pipe = loaders[name]()
+        except Exception:
+            continue
+        _loaded_backends[model_name, requested] = "onnx" if name == "auto" else name
+        return ner_pipe
+    return None
+
+
+def run_ner_batched(ner_pipe, chunks, batch_size=NER_BATCH_SIZE):
+    """Run the NER pipeline over all chunks in batches, returning one entity list per chunk.
+    If a batch fails, its chunks are retried one at a time so a single bad chunk is skipped
+    instead of losing the whole batch."""
+    results = []
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start:start + batch_size]
+        try:
+            results.extend(ner_pipe(batch, batch_size=batch_size))
+        except Exception:
+            for c in batch:
+                try:
+                    results.append(ner_pipe(c))
+                except Exception:
+                    results.append([])
+    return results
+
+
+def _text_size(piece):
+    """Default chunk measure: characters, counting each whitespace run as one."""
+    return len(" ".join(piece.split()))
+
+
+def chunk_text_for_ner(text, max_size=NER_CHUNK_CHARS, overlap_lines=NER_OVERLAP_LINES, size=_text_size):
+    """Split text into (offset, chunk) pairs for NER, where chunk == text[offset:offset + len(chunk)].
+    Chunks are built from whole lines, so a numbered entry like "12. Mount Rushmore" is never cut
+    in half. The last `overlap_lines` lines of each chunk are repeated at the start of the next.
+    `size(piece)` measures a line or word against `max_size` (extract_ner_phrases passes the
+    model's token count), plus one per line or word joined.
+    A line too long for one chunk is split at word boundaries into runs of at most half a chunk,
+    so every run shares a chunk with the one after it and a name across a cut is still seen whole."""
+    # (start, end, size) of non-blank lines, with over-long lines split into word runs
+    segments = []
+    for line in re.finditer(r'[^\n]*\S[^\n]*', text):
+        line_size = size(line.group())
+        if line_size <= max_size:
+            segments.append((line.start(), line.end(), line_size))
+            continue
+        run_start = run_end = None
+        run_size = 0
+        for word in re.finditer(r'\S+', line.group()):
+            word_start, word_end = line.start() + word.start(), line.start() + word.end()
+            word_size = size(word.group())
+            if run_start is not None and run_size + 1 + word_size > (max_size - 1) // 2:
+                segments.append((run_start, run_end, run_size))
+                run_start = None
+            if run_start is None:
+                run_start, run_size = word_start, word_size
+            else:
+                run_size += 1 + word_size
+            run_end = word_end
+        segments.append((run_start, run_end, run_size))
+
+    chunks = []
+    first = 0
+    while first < len(segments):
+        last, chunk_size = first, segments[first][2]
+        while last + 1 < len(segments) and chunk_size + 1 + segments[last + 1][2] <= max_size:
+            last += 1
+            chunk_size += 1 + segments[last][2]
+        start = segments[first][0]
+        chunks.append((start, text[start:segments[last][1]]))
+        if last + 1 == len(segments):
+            break
+        first = max(first + 1, last + 1 - overlap_lines)
+    return chunks
+
+
+def stitch_entity_spans(spans, text):
+    """Merge (start, end, at_chunk_edge) entity spans found in overlapping chunks into phrases.
+    Overlapping spans (the same entity seen in two chunks) are merged, and so are spans one
+    space apart where one touches a chunk edge - the two halves of a name cut by a chunk break."""
+    merged = []
+    for start, end, at_edge in sorted(spans):
+        if merged:
+            prev_start, prev_end, prev_edge = merged[-1]
+            if start <= prev_end or ((at_edge or prev_edge) and text[prev_end:start] == ' '):
+                merged[-1] = (prev_start, max(end, prev_end), at_edge or prev_edge)
+                continue
+        merged.append((start, end, at_edge))
+    return [" ".join(text[start:end].split()) for start, end, _ in merged]
+
+
+def extract_ner_phrases(text, ner_pipe, batch_size=NER_BATCH_SIZE):
+    """Run NER over the text in chunks and return multi-word phrases like 'Mount Rushmore'."""
+    tokenizer = getattr(ner_pipe, 'tokenizer', None)
+    if tokenizer is not None:
+        chunks = chunk_text_for_ner(text, NER_CHUNK_TOKENS, size=lambda piece: len(
+            tokenizer(piece, add_special_tokens=False)['input_ids']))
+    else:
+        chunks = chunk_text_for_ner(text, NER_CHUNK_CHARS)
+    spans, found = [], []
+    for (offset, chunk), entities in zip(chunks, run_ner_batched(ner_pipe, [c for _, c in chunks], batch_size)):
+        for ent in entities:
+            if ent.get('start') is not None and ent.get('end') is not None:
+                at_edge = ent['start'] == 0 or ent['end'] == len(chunk)
+                spans.append((offset + ent['start'], offset + ent['end'], at_edge))
+            else:  # slow (non-fast) tokenizers don't report character offsets
+                found.append(ent.get('word', '').strip())
+    found.extend(stitch_entity_spans(spans, text))
+
+    return {phrase for phrase in found if phrase and not phrase.startswith('#') and len(phrase) >= 4}
+
+
+if __name__ == "__main__":
+    # Export the ONNX model and check it against torch ahead of time (needs torch + optimum)
+    result = export_onnx_model()
+    print(json.dumps(result, indent=2))
+    print(f"Saved to {onnx_model_dir()}")
+    raise SystemExit(0 if result["matches"] else 1)
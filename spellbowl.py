@@ -1,20 +1,32 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+import bisect
 import difflib
-import pypdf
+import hashlib
 from gtts import gTTS
 import tempfile
 import pronouncing
 import time
-import os
 import nltk
-import re
 import random
 import threading
-import json
 from datetime import datetime
 from pathlib import Path
 from nltk.corpus import wordnet
 from predefined_words import predefined_words
+from pdf_extraction import ProgressiveWordList, extract_words, read_pdf_text
+from smart_extraction import (
+    NER_BACKEND, NER_MODEL, extract_ner_phrases, load_ner, ner_backend, onnx_backend_verified,
+    smart_extraction_installed,
+)
+from quiz_engine import (
+    LEADERBOARD_WINDOWS, ReviewQueue, build_leaderboard_snapshot, build_user_index,
+    build_word_difficulty, choose_next_word, get_accuracy_trend, get_available_years, get_categories_for_year,
+    get_pdf_path_for_category, grade_answer, grade_answer_sheet, leaderboard_file,
+    answer_sheet_key, leaderboard_rank_key, load_numbered_list, log_answer, read_answer_sheet,
+    save_answer_sheet, save_quiz_result, summarize_answer_sheet, timeout_grade, users_file,
+    window_period, word_stats_file,
+)
 
 # Page Configuration
 st.set_page_config(
@@ -24,153 +36,55 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# File paths
-LEADERBOARD_FILE = "leaderboard.json"
-USERS_FILE = "users.json"
-
-# Base directory of the app (used to find yearly word list folders regardless of cwd)
-APP_DIR = Path(__file__).resolve().parent
+ALL_SCORES_PAGE_SIZE = 25  # users per page in the leaderboard's "All Scores" tab
 
 
-# Yearly Prepopulated Word List Helpers
-def get_available_years():
-    """Find year folders (e.g. '2026') that sit next to spellbowl.py, newest first."""
-    years = []
-    if APP_DIR.exists():
-        for entry in APP_DIR.iterdir():
-            if entry.is_dir() and re.fullmatch(r"\d{4}", entry.name):
-                years.append(entry.name)
-    return sorted(years, reverse=True)
+# PDF Extraction Helpers (PDF reading and regex extraction live in pdf_extraction.py)
+PROGRESSIVE_START_WORDS = 10  # words needed from a streaming PDF load before the quiz can start
 
 
-def get_categories_for_year(year):
-    """Find division subfolders (e.g. 'elementary') inside a year folder that contain a PDF."""
-    year_dir = APP_DIR / year
-    categories = []
-    if year_dir.exists():
-        for entry in sorted(year_dir.iterdir()):
-            if entry.is_dir() and any(entry.glob("*.pdf")):
-                categories.append(entry.name)
-    return categories
+def read_pdf_with_progress(pdf_source):
+    """read_pdf_text with a page progress bar, warning about any pages that timed out."""
+    progress_bar = st.progress(0.0, text="📖 Reading page 1...")
 
+    def update_progress(done, total):
+        progress_bar.progress(done / total, text=f"📖 Read page {done} of {total}")
 
-def get_pdf_path_for_category(year, category):
-    """Return the first PDF found for a given year/division, or None."""
-    cat_dir = APP_DIR / year / category
-    pdfs = sorted(cat_dir.glob("*.pdf"))
-    return pdfs[0] if pdfs else None
+    page_info = []
+    text = read_pdf_text(pdf_source, progress=update_progress, page_info=page_info)
+    progress_bar.empty()
 
-
-# PDF Extraction Helpers
-
-# PDF fonts commonly render these as single ligature glyphs instead of separate letters
-# (e.g. "beneﬁting" instead of "benefiting"), which breaks naive letter-only regexes.
-PDF_LIGATURES = {
-    'ﬀ': 'ff', 'ﬁ': 'fi', 'ﬂ': 'fl',
-    'ﬃ': 'ffi', 'ﬄ': 'ffl', 'ﬅ': 'ft', 'ﬆ': 'st',
-}
-# Smart/curly punctuation that word processors substitute for the plain ASCII versions
-PDF_SMART_PUNCT = {
-    '‘': "'", '’': "'", '“': '"', '”': '"',
-    '–': '-', '—': '-', '\xa0': ' ',
-}
-
-
-def normalize_pdf_text(text):
-    """Undo common PDF text-extraction quirks (ligatures, smart quotes) that would
-    otherwise fragment words like "o'clock" or "beneﬁting" during extraction."""
-    for ligature, plain in PDF_LIGATURES.items():
-        text = text.replace(ligature, plain)
-    for fancy, plain in PDF_SMART_PUNCT.items():
-        text = text.replace(fancy, plain)
-    # Some PDFs render hyphenated compounds with a stray space before the hyphen
-    # (e.g. "good -natured"); collapse that back into "good-natured".
-    text = re.sub(r'([^\W\d_])\s+-\s*([^\W\d_])', r'\1-\2', text)
+    timed_out = [info['page'] for info in page_info if info['status'] == 'timeout']
+    if timed_out:
+        st.warning(f"⚠️ Skipped page(s) {', '.join(map(str, timed_out))} - they took too long to read.")
     return text
 
 
-# Unicode-aware letter class (covers accented letters like "é") and word-char class
-# (letters plus apostrophes/hyphens, for words like "o'clock" or "cross-cultural")
-_LETTER = r'[^\W\d_]'
-_WORDCHAR = r"(?:[^\W\d_]|['\-])"
-
-# Matches numbered list entries like "1. aardvark", "2) Big Dipper", "3: about-face".
-# Prefers stopping at the next list number or a newline, but falls back to a single
-# word if no clean boundary is found (e.g. the last entry runs into trailing prose).
-NUMBERED_ENTRY_RE = re.compile(
-    r'\d+\s*[\.\)\:]\s*('
-    rf'{_LETTER}{_WORDCHAR}*(?:[ \t]+{_LETTER}{_WORDCHAR}*){{0,3}}(?=\s*\d+\s*[\.\)\:]|\n|$)'
-    r'|'
-    rf'{_LETTER}{_WORDCHAR}*'
-    r')'
-)
-MIN_NUMBERED_ENTRIES = 5  # below this, the PDF probably isn't a numbered list - fall back to full-text scan
-
-
-def extract_numbered_entries(text):
-    """Pull out only the words/phrases that follow a list number (e.g. '1. aardvark'),
-    which skips titles, headers, and instructions on official word-list PDFs."""
-    entries = []
-    for raw in NUMBERED_ENTRY_RE.findall(text):
-        entry = raw.strip()
-        if entry and len(entry.replace(' ', '')) >= 2:
-            entries.append(entry)
-    return entries
-
-
-def read_pdf_text(pdf_source):
-    """Extract raw text from an uploaded file-like object or a PDF path on disk.
-    Uses layout-preserving extraction: word lists formatted as multi-column tables
-    (common in longer official lists) otherwise get their columns read out of order,
-    which can split numbers/words across lines and silently drop entries."""
-    reader = pypdf.PdfReader(pdf_source)
-    text = ""
-    for page in reader.pages:
-        try:
-            page_text = page.extract_text(extraction_mode="layout")
-        except TypeError:
-            page_text = page.extract_text()
-        if page_text:
-            text += page_text + "\n"  # newline (not space) so page breaks don't glue words together
-    return normalize_pdf_text(text)
+# Smart extraction (NER): the model code lives in smart_extraction.py; this adds Streamlit caching
+@st.cache_resource(show_spinner="🧠 Loading smart extraction model (first time only)...")
+def load_ner_pipeline(model_name=NER_MODEL, backend=NER_BACKEND):
+    """load_ner, shared across sessions. Returns None if transformers/torch aren't installed,
+    so callers can fall back gracefully."""
+    return load_ner(model_name, backend)
 
 
-@st.cache_resource(show_spinner="🧠 Loading smart extraction model (first time only)...")
-def load_ner_pipeline():
-    """Load a small Hugging Face NER model to help keep proper-noun phrases together.
-    Returns None if transformers/torch aren't installed, so callers can fall back gracefully."""
-    try:
-        from transformers import pipeline
-        return pipeline("ner", model="dslim/distilbert-NER", aggregation_strategy="simple")
-    except Exception:
-        return None
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_ner_phrases(text_hash, model_name, _text):
+    """extract_ner_phrases, cached across sessions per (PDF text hash, model), so re-uploading
+    or re-selecting the same list never reruns the model. The model is only loaded on a cache
+    miss. Underscored args aren't hashed."""
+    ner_pipe = load_ner_pipeline()
+    if ner_pipe is None:
+        raise RuntimeError("the smart extraction model could not be loaded")
+    return sorted(extract_ner_phrases(_text, ner_pipe))
 
 
-def extract_ner_phrases(text, ner_pipe, chunk_chars=800):
-    """Run NER over the text in chunks and return multi-word phrases like 'Mount Rushmore'."""
-    phrases = set()
-    words_in_text = text.split()
-
-    chunks, chunk, chunk_len = [], [], 0
-    for w in words_in_text:
-        chunk.append(w)
-        chunk_len += len(w) + 1
-        if chunk_len >= chunk_chars:
-            chunks.append(" ".join(chunk))
-            chunk, chunk_len = [], 0
-    if chunk:
-        chunks.append(" ".join(chunk))
-
-    for c in chunks:
-        try:
-            entities = ner_pipe(c)
-        except Exception:
-            continue
-        for ent in entities:
-            phrase = ent.get('word', '').strip()
-            if phrase and not phrase.startswith('#') and len(phrase) >= 4:
-                phrases.add(phrase)
-    return phrases
+def find_ner_phrases(text):
+    """Multi-word phrases found by smart extraction, cached per (PDF text hash, model, backend
+    the model runs on - see ner_backend). Makes no Streamlit UI calls, so it can run in a
+    background loader thread."""
+    text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return cached_ner_phrases(text_hash, f"{NER_MODEL}:{ner_backend()}", text)
 
 
 def extract_words_from_text(text, use_smart_extraction=False):
@@ -179,81 +93,59 @@ def extract_words_from_text(text, use_smart_extraction=False):
     skips titles/headers/instructions; otherwise falls back to scanning the whole text."""
     phrases = set()
     if use_smart_extraction:
-        ner_pipe = load_ner_pipeline()
-        if ner_pipe is not None:
+        if smart_extraction_installed():
             try:
-                phrases = extract_ner_phrases(text, ner_pipe)
+                phrases = find_ner_phrases(text)
             except Exception as e:
                 st.warning(f"⚠️ Smart extraction had an issue, using standard extraction instead. ({str(e)})")
         else:
             st.info("💡 Smart extraction needs extra packages (`pip install -r requirements-optional.txt`). Using standard extraction for now.")
 
-    numbered_words = extract_numbered_entries(text)
-    if len(numbered_words) >= MIN_NUMBERED_ENTRIES:
-        words = numbered_words
-    else:
-        words = re.findall(rf'\b{_LETTER}{{4,}}\b', text)
-        words = [w.strip() for w in words if len(w.strip()) >= 4]
-
-    unique_words = {}
-    for word in words:
-        lower_word = word.lower()
-        if lower_word not in unique_words:
-            unique_words[lower_word] = word
-
-    for phrase in phrases:
-        phrase_clean = phrase.strip()
-        if len(phrase_clean) < 4:
-            continue
-        lower_phrase = phrase_clean.lower()
-        if lower_phrase not in unique_words:
-            unique_words[lower_phrase] = phrase_clean
-        for part in phrase_clean.split():
-            unique_words.pop(part.lower(), None)
+    return extract_words(text, phrases)
 
-    return [unique_words[key] for key in sorted(unique_words.keys())]
 
-
-# User Management Functions
-def load_users():
-    """Load users data from JSON file."""
+# User Management Functions (the stores and their data model live in quiz_engine.py)
+def user_index():
+    """The process-wide user index, shared by all sessions and only rebuilt when users.json
+    changes - so a login is a dict lookup, not a parse of the whole file."""
     try:
-        if os.path.exists(USERS_FILE):
-            with open(USERS_FILE, 'r') as f:
-                return json.load(f)
-        return {}
+        return users_file().cached('user_index', build_user_index)
     except Exception as e:
         st.error(f"Error loading users: {e}")
-        return {}
+        return build_user_index({})
 
-def save_users(users):
-    """Save users data to JSON file."""
-    try:
-        with open(USERS_FILE, 'w') as f:
-            json.dump(users, f, indent=2)
-        return True
-    except Exception as e:
-        st.error(f"Error saving users: {e}")
-        return False
+def load_users():
+    """Load users data (shared and cached - don't modify it; queue changes on users_file())."""
+    return user_index()['users']
 
 def register_user(username, password, full_name):
     """Register a new user."""
-    users = load_users()
-    
-    if username.lower() in [u.lower() for u in users.keys()]:
+    if username.casefold() in user_index()['by_casefold']:
         return False, "Username already exists. Please choose another one."
     
-    users[username] = {
+    new_user = {
         'password': password,  # In production, use hashed passwords!
         'full_name': full_name,
         'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         'total_quizzes': 0,
         'best_score': 0
     }
-    
-    if save_users(users):
+
+    def add_user(users):
+        # Checked again here: another session may have taken the name since the check above
+        if any(name.casefold() == username.casefold() for name in users):
+            raise ValueError("Username already exists. Please choose another one.")
+        users[username] = dict(new_user)
+
+    # Registration waits for the write, so the account is on disk before we report success
+    try:
+        users_file().update(add_user).result()
         return True, "Registration successful!"
-    return False, "Error during registration."
+    except ValueError as e:
+        return False, str(e)
+    except Exception as e:
+        st.error(f"Error saving users: {e}")
+        return False, "Error during registration."
 
 def authenticate_user(username, password):
     """Authenticate user login."""
@@ -263,123 +155,92 @@ def authenticate_user(username, password):
         return True, users[username]['full_name']
     return False, None
 
-def update_user_stats(username, accuracy):
-    """Update user statistics after quiz completion."""
-    users = load_users()
-    
-    if username in users:
-        users[username]['total_quizzes'] = users[username].get('total_quizzes', 0) + 1
-        users[username]['best_score'] = max(users[username].get('best_score', 0), accuracy)
-        save_users(users)
-
 def load_leaderboard():
-    """Load leaderboard data from JSON file."""
-    try:
-        if os.path.exists(LEADERBOARD_FILE):
-            with open(LEADERBOARD_FILE, 'r') as f:
-                data = json.load(f)
-                # Handle old format (list) and convert to new format (dict)
-                if isinstance(data, list):
-                    # Convert old list format to new dict format
-                    new_format = {}
-                    for entry in data:
-                        username = entry['name']
-                        if username not in new_format:
-                            new_format[username] = {
-                                'name': entry['name'],
-                                'total_score': entry['score'],
-                                'total_questions': entry['total'],
-                                'total_quizzes': 1,
-                                'best_accuracy': entry['accuracy'],
-                                'avg_accuracy': entry['accuracy'],
-                                'last_quiz_date': entry.get('timestamp', entry.get('date', '')),
-                                'quiz_history': [{
-                                    'score': entry['score'],
-                                    'total': entry['total'],
-                                    'accuracy': entry['accuracy'],
-                                    'timestamp': entry.get('timestamp', ''),
-                                    'word_source': entry.get('word_source', 'unknown')
-                                }]
-                            }
-                        else:
-                            # Aggregate multiple entries for same user
-                            new_format[username]['total_score'] += entry['score']
-                            new_format[username]['total_questions'] += entry['total']
-                            new_format[username]['total_quizzes'] += 1
-                            new_format[username]['best_accuracy'] = max(new_format[username]['best_accuracy'], entry['accuracy'])
-                            new_format[username]['last_quiz_date'] = entry.get('timestamp', entry.get('date', ''))
-                            new_format[username]['quiz_history'].append({
-                                'score': entry['score'],
-                                'total': entry['total'],
-                                'accuracy': entry['accuracy'],
-                                'timestamp': entry.get('timestamp', ''),
-                                'word_source': entry.get('word_source', 'unknown')
-                            })
-                            # Recalculate average accuracy
-                            total_acc = sum(q['accuracy'] for q in new_format[username]['quiz_history'])
-                            new_format[username]['avg_accuracy'] = round(total_acc / len(new_format[username]['quiz_history']), 1)
-                    return new_format
-                return data
-        return {}
-    except Exception as e:
-        st.error(f"Error loading leaderboard: {e}")
-        return {}
+    """Load leaderboard data (shared and cached - don't modify it)."""
+    return leaderboard_snapshot()['users']
 
-def save_to_leaderboard(name, score, total, accuracy, word_source, total_words):
-    """Save a quiz result to the leaderboard - updates existing user or creates new entry."""
+def leaderboard_snapshot():
+    """The process-wide leaderboard snapshot, shared by all sessions and only rebuilt when the
+    leaderboard changes - so the sidebar and every leaderboard tab read it without parsing."""
     try:
-        leaderboard = load_leaderboard()
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        quiz_entry = {
-            'score': score,
-            'total': total,
-            'accuracy': accuracy,
-            'timestamp': timestamp,
-            'word_source': word_source
-        }
-        
-        if name in leaderboard:
-            # Update existing user
-            leaderboard[name]['total_score'] += score
-            leaderboard[name]['total_questions'] += total
-            leaderboard[name]['total_quizzes'] += 1
-            leaderboard[name]['best_accuracy'] = max(leaderboard[name]['best_accuracy'], accuracy)
-            leaderboard[name]['last_quiz_date'] = timestamp
-            leaderboard[name]['quiz_history'].append(quiz_entry)
-            
-            # Recalculate average accuracy
-            total_acc = sum(q['accuracy'] for q in leaderboard[name]['quiz_history'])
-            leaderboard[name]['avg_accuracy'] = round(total_acc / len(leaderboard[name]['quiz_history']), 1)
-        else:
-            # Create new user entry
-            leaderboard[name] = {
-                'name': name,
-                'total_score': score,
-                'total_questions': total,
-                'total_quizzes': 1,
-                'best_accuracy': accuracy,
-                'avg_accuracy': accuracy,
-                'last_quiz_date': timestamp,
-                'quiz_history': [quiz_entry]
-            }
-        
-        with open(LEADERBOARD_FILE, 'w') as f:
-            json.dump(leaderboard, f, indent=2)
-        
-        return True
+        return leaderboard_file().cached('leaderboard_snapshot', build_leaderboard_snapshot)
     except Exception as e:
-        st.error(f"Error saving to leaderboard: {e}")
+        st.error(f"Error loading leaderboard: {e}")
+        return build_leaderboard_snapshot({})
+
+def save_to_leaderboard(username, name, score, total, word_source):
+    """Queue a finished quiz to be saved to the leaderboard and the user's stats (save_quiz_result)."""
+    store = leaderboard_file()
+    if store.last_error is not None:
+        # The writer is still retrying an earlier save; report it rather than queue more
+        st.error(f"Error saving to leaderboard: {store.last_error}")
         return False
 
-def get_top_scores(limit=10):
-    """Get top scores from leaderboard sorted by best accuracy."""
-    leaderboard = load_leaderboard()
-    # Convert dict to list and sort by best accuracy (descending), then by total score
-    leaderboard_list = list(leaderboard.values())
-    sorted_board = sorted(leaderboard_list, key=lambda x: (x['best_accuracy'], x['total_score']), reverse=True)
-    return sorted_board[:limit]
+    save_quiz_result(username, name, score, total, word_source)
+    return True
+
+def get_window_ranking(window):
+    """Ranking of the users who took a quiz in the current day/week/month, with each entry's
+    stats covering that period only. Built from the users' window totals once per period and
+    leaderboard change, then shared like the rest of the snapshot."""
+    snapshot = leaderboard_snapshot()
+    period = window_period(window, datetime.now())
+    ranking = snapshot['window_rankings'].get((window, period))
+    if ranking is None:
+        ranking = []
+        for user_data in snapshot['users'].values():
+            bucket = user_data.get('windows', {}).get(window, {}).get(period)
+            if bucket:
+                ranking.append({
+                    'name': user_data['name'],
+                    'total_score': bucket['score'],
+                    'total_questions': bucket['total'],
+                    'total_quizzes': bucket['count'],
+                    'best_accuracy': bucket['best_accuracy'],
+                    'avg_accuracy': round(bucket['accuracy_sum'] / bucket['count'], 1),
+                    'last_quiz_date': user_data['last_quiz_date'],
+                })
+        ranking.sort(key=leaderboard_rank_key, reverse=True)
+        snapshot['window_rankings'][(window, period)] = ranking
+    return ranking
+
+def get_top_scores(limit=10, window=None):
+    """Get top scores from leaderboard sorted by best accuracy - all time, or for the current
+    day/week/month (a LEADERBOARD_WINDOWS key)."""
+    if window:
+        return get_window_ranking(window)[:limit]
+    return leaderboard_snapshot()['ranking'][:limit]
+
+def shared_rank(rank_keys, rank_key):
+    """Overall rank for a leaderboard rank key (a snapshot 'rank_keys' value). Users tied on
+    best accuracy and total score share the rank of the first of them, in every view."""
+    return bisect.bisect_left(rank_keys, rank_key) + 1
+
+def get_leaderboard_page(query="", start=0, limit=ALL_SCORES_PAGE_SIZE):
+    """One page of the ranking as ([(rank, entry), ...], number of matching users), optionally
+    filtered to names containing `query`. Ranks are overall ranks (see shared_rank), not
+    positions in the results."""
+    snapshot = leaderboard_snapshot()
+    ranking = snapshot['ranking']
+    rank_keys = snapshot['rank_keys']
+    query = query.strip().casefold()
+    if not query:
+        positions, total = range(start, min(start + limit, len(ranking))), len(ranking)
+    else:
+        matches = [position for position, name in enumerate(snapshot['search_names']) if query in name]
+        positions, total = matches[start:start + limit], len(matches)
+    return [(shared_rank(rank_keys, rank_keys[position]), ranking[position]) for position in positions], total
+
+def get_user_rank(name):
+    """(rank, number of ranked users, top percent) for a user, or None if they have no scores.
+    The rank is the same one the All Scores tab shows (see shared_rank)."""
+    snapshot = leaderboard_snapshot()
+    user_data = snapshot['users'].get(name)
+    if user_data is None:
+        return None
+    rank_keys = snapshot['rank_keys']
+    rank = shared_rank(rank_keys, tuple(-value for value in leaderboard_rank_key(user_data)))
+    return rank, len(rank_keys), max(1, round(100 * rank / len(rank_keys)))
 
 def get_user_scores(name, limit=5):
     """Get recent quiz history for a specific user."""
@@ -391,6 +252,33 @@ def get_user_scores(name, limit=5):
         return user_data, recent_quizzes
     return None, []
 
+def record_word_attempt(word, answer, grade):
+    """Queue a graded quiz answer for the word difficulty stats and the user's review schedule."""
+    username = st.session_state.get('username')
+    log_answer(username, word, answer, grade, st.session_state.get('word_list_name', 'unknown'),
+               revision_queue() if username else None)
+
+def word_difficulty_tables():
+    """The process-wide word difficulty tables, only rebuilt when new answers are recorded."""
+    try:
+        return word_stats_file().cached('word_difficulty', build_word_difficulty)
+    except Exception as e:
+        st.error(f"Error loading word statistics: {e}")
+        return {}
+
+def revision_queue():
+    """This session's ReviewQueue for the logged-in user, loaded from revision.json once per login."""
+    username = st.session_state.get('username')
+    queue = st.session_state.get('revision_queue')
+    if queue is None or queue.user != username:
+        try:
+            queue = ReviewQueue.load(username)
+        except Exception as e:
+            st.error(f"Error loading review schedule: {e}")
+            queue = ReviewQueue(username, {})
+        st.session_state.revision_queue = queue
+    return queue
+
 def sidebar_leaderboard():
     """Display leaderboard in sidebar."""
     with st.sidebar:
@@ -925,6 +813,7 @@ def quiz_tile(speech_rate=100):
                         st.session_state.all_loaded_words = all_words
                         st.session_state.quiz_words = all_words[:50] if len(all_words) > 50 else all_words
                         st.session_state.word_source_type = "predefined"
+                        st.session_state.word_list_name = "predefined"
                         
                         # Reset quiz state when new words are loaded
                         st.session_state.used_quiz_words = []
@@ -936,6 +825,7 @@ def quiz_tile(speech_rate=100):
                         st.session_state.quiz_history = []
                         st.session_state.leaderboard_saved = False
                         st.session_state.last_pdf_name = "predefined_list"
+                        st.session_state.word_list_loader = None
                         
                         st.success(f"✅ Loaded {len(st.session_state.all_loaded_words)} words from predefined list!")
                         st.info("👇 Select word range below and click 'Get Next Word' to start!")
@@ -994,6 +884,7 @@ def quiz_tile(speech_rate=100):
                 st.session_state.all_loaded_words = random.sample(system_words, min(500, len(system_words)))
                 st.session_state.quiz_words = st.session_state.all_loaded_words[:50]  # Default to first 50
                 st.session_state.word_source_type = "system"
+                st.session_state.word_list_name = f"system/{difficulty_level}"
                 
                 # Reset quiz state when new words are loaded
                 st.session_state.used_quiz_words = []
@@ -1004,6 +895,7 @@ def quiz_tile(speech_rate=100):
                 st.session_state.wrong_attempts = []
                 st.session_state.quiz_history = []
                 st.session_state.last_pdf_name = None  # Clear PDF tracking
+                st.session_state.word_list_loader = None
                 st.session_state.leaderboard_saved = False
                 
                 st.success(f"✅ Loaded {len(st.session_state.all_loaded_words)} words from {difficulty_level}!")
@@ -1015,7 +907,8 @@ def quiz_tile(speech_rate=100):
         if word_source in ("Upload PDF", "📅 This Year's Word List") and (quiz_pdf is not None or selected_pdf_path is not None):
             use_smart_extraction = st.checkbox(
                 "✨ Smart extraction (keeps proper-noun phrases like \"Mount Rushmore\" together)",
-                value=False,
+                # on by default once the fast ONNX Runtime export has been checked against torch
+                value=onnx_backend_verified(),
                 key="use_smart_extraction",
                 help="Uses a small AI model (Hugging Face) to detect multi-word names. Downloads ~250MB the first time it's used."
             )
@@ -1026,9 +919,20 @@ def quiz_tile(speech_rate=100):
 
         if pdf_source is not None and (not st.session_state.quiz_words or st.session_state.get('last_pdf_name') != pdf_identifier):
             try:
+                # Smart extraction runs in the background after the last page, so it never
+                # delays the start of the quiz; its phrases are merged in when it finishes
+                refine = None
+                if use_smart_extraction:
+                    if smart_extraction_installed():
+                        refine = find_ner_phrases
+                    else:
+                        st.info("💡 Smart extraction needs extra packages (`pip install -r requirements-optional.txt`). Using standard extraction for now.")
+
+                # Stream numbered entries page by page so the quiz can start on the first
+                # words while the rest of the PDF is still being read in the background
                 with st.spinner("📖 Reading your PDF... this'll just take a moment!"):
-                    text = read_pdf_text(pdf_source)
-                    all_words = extract_words_from_text(text, use_smart_extraction=use_smart_extraction)
+                    loader = ProgressiveWordList(pdf_source, refine=refine).start()
+                    all_words = loader.wait_for_words(PROGRESSIVE_START_WORDS)
 
                 if not all_words:
                     st.error("No valid words found in PDF. Please upload a different PDF.")
@@ -1039,6 +943,7 @@ def quiz_tile(speech_rate=100):
                 st.session_state.all_loaded_words = all_words
                 st.session_state.quiz_words = all_words[:50] if len(all_words) > 50 else all_words
                 st.session_state.word_source_type = "yearly" if selected_pdf_path is not None else "pdf"
+                st.session_state.word_list_name = f"{selected_year}/{selected_category}" if selected_pdf_path is not None else f"pdf/{quiz_pdf.name}"
 
                 # Reset quiz state when new PDF is loaded
                 st.session_state.used_quiz_words = []
@@ -1050,16 +955,26 @@ def quiz_tile(speech_rate=100):
                 st.session_state.quiz_history = []
                 st.session_state.last_pdf_name = pdf_identifier
                 st.session_state.leaderboard_saved = False
+                st.session_state.word_list_loader = loader
 
-                st.success(f"✅ Loaded {len(st.session_state.all_loaded_words)} words!")
-                st.info("👇 Select word range below and click 'Get Next Word' to start!")
+                if not loader.done:
+                    st.success(f"✅ Loaded the first {len(all_words)} words - the rest of the list is still loading!")
+                    st.info("👇 Click 'Get Next Word' to start right away!")
+                else:
+                    st.success(f"✅ Loaded {len(st.session_state.all_loaded_words)} words!")
+                    st.info("👇 Select word range below and click 'Get Next Word' to start!")
             except Exception as e:
                 st.error(f"Error reading PDF: {str(e)}")
                 return
         
         if st.session_state.quiz_words:
-            # Word range selector
-            if 'all_loaded_words' in st.session_state and len(st.session_state.all_loaded_words) > 0:
+            # Only drawn while a list is loading: a run_every fragment keeps rerunning as long as
+            # the app renders it, and the full rerun at the end of loading leaves it out again
+            if st.session_state.get('word_list_loader') is not None:
+                word_list_loading_status()
+
+            # Word range selector (once the whole list has loaded)
+            if 'all_loaded_words' in st.session_state and len(st.session_state.all_loaded_words) > 0 and st.session_state.get('word_list_loader') is None:
                 st.markdown("### 🎯 Select Word Range")
                 
                 total_words = len(st.session_state.all_loaded_words)
@@ -1180,578 +1095,730 @@ def quiz_tile(speech_rate=100):
                     key="randomize_order",
                     help="Off by default: words come one after another in list order. Turn this on to get them in random order instead."
                 )
+                st.checkbox(
+                    "🧠 Adaptive order",
+                    value=False,
+                    key="adaptive_order",
+                    help="Picks words you're more likely to misspell more often, based on your past answers to each word and to words with the same spelling patterns or sounds. Overrides random order."
+                )
+                st.checkbox(
+                    "🔁 Review due words first",
+                    value=False,
+                    key="review_due_first",
+                    help="Words you've been quizzed on come back on a spaced-repetition schedule - sooner if you missed them, later as you master them. Turn this on to get this list's due words before new ones."
+                )
                 st.markdown("---")
             
-            # Display score
-            remaining = len(st.session_state.quiz_words) - len(st.session_state.used_quiz_words)
-            col_score1, col_score2, col_score3 = st.columns(3)
+            quiz_card(speech_rate=speech_rate)
+        else:
+            st.info("📤 Choose a word source above to start the pronunciation quiz!")
+            st.markdown("""
+            **How it works:**
+            1. Pick a word source: the predefined list, this year's official list, your own PDF, or a difficulty level
+            2. System will load words for you (up to 50 to start)
+            3. Click 'Get Next Word' to start
+            4. Listen to pronunciation (no spelling shown!)
+            5. Type what you heard and check your answer
+            """)
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+
+def rerun_fragment():
+    """Rerun only the running fragment (the quiz card, the All Scores tab). Fragment-scoped reruns are only allowed while
+    Streamlit is running the fragment on its own, so fall back to a full rerun otherwise."""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+@st.fragment(run_every=1)
+def quiz_timer():
+    """Competition Mode countdown, redrawn once a second without rerunning the quiz card."""
+    if not (st.session_state.competition_mode and
+            st.session_state.current_quiz_word and
+            not st.session_state.answer_submitted):
+        return
+
+    if st.session_state.timer_start is None:
+        # Timer not started yet - waiting for audio to play
+        st.markdown("""
+        <div style='background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%); 
+                    padding: 1em; 
+                    border-radius: 10px; 
+                    border: 3px solid #f59e0b; 
+                    margin: 1em 0;
+                    text-align: center;'>
+            <p style='margin: 0; color: #92400e; font-size: 1.2em; font-weight: 700;'>
+                ⚡ Competition Mode Active
+            </p>
+            <p style='margin: 0.3em 0 0 0; color: #78350f; font-size: 0.9em;'>
+                Click "Play Pronunciation" to start the timer!
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+        return
+
+    # Timer is running
+    elapsed_time = time.time() - st.session_state.timer_start
+    remaining_time = max(0, st.session_state.timer_seconds - elapsed_time)
+    
+    if remaining_time > 0:
+        # Calculate color based on remaining time
+        time_percentage = (remaining_time / st.session_state.timer_seconds) * 100
+        if time_percentage > 50:
+            timer_color = "#10b981"  # Green
+        elif time_percentage > 25:
+            timer_color = "#f59e0b"  # Orange
+        else:
+            timer_color = "#ef4444"  # Red
+        
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%); 
+                    padding: 1em; 
+                    border-radius: 10px; 
+                    border: 3px solid {timer_color}; 
+                    margin: 1em 0;
+                    text-align: center;'>
+            <p style='margin: 0; color: {timer_color}; font-size: 2.5em; font-weight: 800;'>
+                ⏱️ {int(remaining_time)}s
+            </p>
+            <p style='margin: 0.3em 0 0 0; color: #0c4a6e; font-size: 0.9em;'>
+                Time Remaining
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        # Time expired - record it, then rerun the app so the card and answer form lock
+        if not st.session_state.time_expired:
+            st.session_state.time_expired = True
+            st.session_state.answer_submitted = True
+            st.session_state.quiz_total += 1
+            st.session_state.quiz_history.append(0)
+            st.session_state.used_quiz_words.append(st.session_state.current_quiz_word)
+            
+            st.session_state.wrong_attempts.append({
+                'correct': st.session_state.current_quiz_word,
+                'your_answer': '(Time Expired)',
+                'similarity': 0,
+                'error_type': 'timeout'
+            })
+            record_word_attempt(st.session_state.current_quiz_word, '', timeout_grade())
+        st.rerun()
+
+
+@st.fragment(run_every=1)
+def word_list_loading_status():
+    """Progress of a PDF word list still loading in the background. When it finishes, the
+    provisional (streamed) list is swapped for the final sorted/deduped one and the whole app
+    reruns, which also stops this fragment's one-second timer."""
+    loader = st.session_state.get('word_list_loader')
+    if loader is None:
+        return
+
+    if loader.refining:
+        st.info(f"✨ All {len(loader.words)} words are read - smart extraction is still looking for multi-word phrases like \"Mount Rushmore\". They'll be added when it's done.")
+        return
+    if not loader.done:
+        total_pages = max(loader.total_pages, 1)
+        st.progress(
+            min(loader.pages_read / total_pages, 1.0),
+            text=f"📖 Still reading your PDF (page {loader.pages_read} of {total_pages}) - {len(loader.words)} words so far. You can start on the first words now!"
+        )
+        return
+
+    st.session_state.word_list_loader = None
+    if loader.error is not None or not loader.words:
+        st.toast("⚠️ Couldn't read the rest of the PDF - keeping the words loaded so far.", icon="⚠️")
+        st.rerun()
+    if loader.timed_out_pages:
+        st.toast(f"⚠️ Skipped page(s) {', '.join(map(str, loader.timed_out_pages))} - they took too long to read.", icon="⚠️")
+    if loader.refine_error is not None:
+        st.toast("⚠️ Smart extraction had an issue - using standard extraction instead.", icon="⚠️")
+    elif loader.phrases:
+        st.toast(f"✨ Smart extraction added {len(loader.phrases)} multi-word phrases to your list!", icon="✨")
+
+    # Keep any words already asked (or being asked) in this quiz, then fill up the default
+    # 50-word range from the final list
+    final_words = loader.words
+    final_set = set(final_words)
+    asked = set(st.session_state.used_quiz_words)
+    kept = [w for w in st.session_state.quiz_words if w in asked or w == st.session_state.current_quiz_word]
+    kept_set = set(kept)
+    rest = [w for w in final_words if w not in kept_set]
+    st.session_state.all_loaded_words = final_words + [w for w in kept if w not in final_set]
+    st.session_state.quiz_words = kept + rest[:max(0, 50 - len(kept))]
+    st.rerun()
+
+
+@st.fragment
+def quiz_card(speech_rate=100):
+    """Score, word controls, answer form and revision list for the loaded quiz words.
+    Runs as a fragment: quiz buttons rerun only this card, not the sidebar or other tabs."""
+    # Display score
+    remaining = len(st.session_state.quiz_words) - len(st.session_state.used_quiz_words)
+    col_score1, col_score2, col_score3 = st.columns(3)
+    
+    with col_score1:
+        st.metric("Score", f"{st.session_state.quiz_score}/{st.session_state.quiz_total}")
+    with col_score2:
+        if st.session_state.quiz_total > 0:
+            percentage = (st.session_state.quiz_score / st.session_state.quiz_total) * 100
+            st.metric("Accuracy", f"{percentage:.1f}%")
+        else:
+            st.metric("Accuracy", "0%")
+    with col_score3:
+        st.metric("Remaining Words", remaining)
+    
+    # Performance Visualization
+    if st.session_state.quiz_history:
+        st.markdown("### 📊 Performance Tracker")
+        
+        # Create visual progress bar with emojis and word details
+        history_display = ""
+        for idx, result in enumerate(st.session_state.quiz_history, 1):
+            # Get the word for this question
+            word_idx = idx - 1
+            if word_idx < len(st.session_state.used_quiz_words):
+                word = st.session_state.used_quiz_words[word_idx]
+                if result == 1:
+                    history_display += f'<span style="color: #10b981; font-weight: 600;" title="✅ {word}">✅</span> '
+                else:
+                    history_display += f'<span style="color: #ef4444; font-weight: 600;" title="❌ {word}">❌</span> '
+            else:
+                if result == 1:
+                    history_display += "✅ "
+                else:
+                    history_display += "❌ "
+            
+            # Add line break every 10 results
+            if idx % 10 == 0:
+                history_display += "<br>"
+        
+        st.markdown(f"""
+        <div style='background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%); 
+                    padding: 1em; 
+                    border-radius: 10px; 
+                    border-left: 4px solid #0ea5e9; 
+                    margin: 1em 0;
+                    text-align: center;'>
+            <p style='margin: 0; color: #0c4a6e; font-size: 1.2em; line-height: 1.8;'>
+                {history_display}
+            </p>
+            <p style='margin: 0.5em 0 0 0; color: #64748b; font-size: 0.85em; font-style: italic;'>
+                💡 Hover over each emoji to see the word
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Show detailed list in expander
+        with st.expander("📋 View Detailed Performance", expanded=False):
+            for idx, result in enumerate(st.session_state.quiz_history, 1):
+                word_idx = idx - 1
+                if word_idx < len(st.session_state.used_quiz_words):
+                    word = st.session_state.used_quiz_words[word_idx]
+                    if result == 1:
+                        st.markdown(f"**{idx}.** ✅ **{word.upper()}** - Correct")
+                    else:
+                        st.markdown(f"**{idx}.** ❌ **{word.upper()}** - Wrong")
+        
+        # Show streak information
+        if st.session_state.quiz_history:
+            current_streak = 0
+            max_streak = 0
+            temp_streak = 0
             
-            with col_score1:
-                st.metric("Score", f"{st.session_state.quiz_score}/{st.session_state.quiz_total}")
-            with col_score2:
-                if st.session_state.quiz_total > 0:
-                    percentage = (st.session_state.quiz_score / st.session_state.quiz_total) * 100
-                    st.metric("Accuracy", f"{percentage:.1f}%")
+            for result in reversed(st.session_state.quiz_history):
+                if result == 1:
+                    if current_streak == temp_streak:
+                        current_streak += 1
+                    temp_streak += 1
+                    max_streak = max(max_streak, temp_streak)
                 else:
-                    st.metric("Accuracy", "0%")
-            with col_score3:
-                st.metric("Remaining Words", remaining)
+                    temp_streak = 0
             
-            # Performance Visualization
-            if st.session_state.quiz_history:
-                st.markdown("### 📊 Performance Tracker")
-                
-                # Create visual progress bar with emojis and word details
-                history_display = ""
-                for idx, result in enumerate(st.session_state.quiz_history, 1):
-                    # Get the word for this question
-                    word_idx = idx - 1
-                    if word_idx < len(st.session_state.used_quiz_words):
-                        word = st.session_state.used_quiz_words[word_idx]
-                        if result == 1:
-                            history_display += f'<span style="color: #10b981; font-weight: 600;" title="✅ {word}">✅</span> '
+            col_streak1, col_streak2 = st.columns(2)
+            with col_streak1:
+                st.metric("🔥 Current Streak", f"{current_streak}")
+            with col_streak2:
+                st.metric("⭐ Best Streak", f"{max_streak}")
+    
+    # Show status message
+    randomize_order = st.session_state.get('randomize_order', False)
+    if st.session_state.get('adaptive_order'):
+        word_btn_label = "🧠 Get Practice Word"
+    else:
+        word_btn_label = "🎲 Get Random Word" if randomize_order else "➡️ Get Next Word"
+
+    if st.session_state.current_quiz_word is None:
+        st.info(f"👉 {st.session_state.student_name}, click '{word_btn_label}' to start!")
+    elif not st.session_state.answer_submitted:
+        st.info(f"🎧 {st.session_state.student_name}, listen carefully and type your answer!")
+
+    col_a, col_b, col_c = st.columns([1, 1, 1])
+
+    with col_a:
+        # Check if all words have been used
+        if st.session_state.quiz_words:
+            available_words = [w for w in st.session_state.quiz_words if w not in st.session_state.used_quiz_words]
+
+            if available_words:
+                # Only allow getting a new word if no current word or answer was already submitted
+                can_get_word = st.session_state.current_quiz_word is None or st.session_state.answer_submitted
+
+                if can_get_word:
+                    if st.button(word_btn_label, key="random_word_btn"):
+                        if st.session_state.get('adaptive_order'):
+                            order = "adaptive"
                         else:
-                            history_display += f'<span style="color: #ef4444; font-weight: 600;" title="❌ {word}">❌</span> '
-                    else:
-                        if result == 1:
-                            history_display += "✅ "
+                            order = "random" if randomize_order else "sequential"
+                        review_first = st.session_state.get('review_due_first', False)
+                        selected_word, review_word = choose_next_word(
+                            available_words, order,
+                            revision_queue() if review_first or order == "adaptive" else None,
+                            review_first, st.session_state.get('word_list_name'))
+                        st.session_state.current_quiz_word = selected_word
+                        st.session_state.quiz_attempts = 0
+                        st.session_state.answer_submitted = False
+                        st.session_state.time_expired = False
+                        # Reset timer - will start when pronunciation is played
+                        st.session_state.timer_start = None
+
+                        # Debug: Find the word position in original list
+                        if review_word:
+                            st.toast("🔁 Review time! You've practiced this word before.", icon="✅")
+                        elif 'all_loaded_words' in st.session_state:
+                            try:
+                                word_position = st.session_state.all_loaded_words.index(selected_word) + 1
+                                st.toast(f"Word #{word_position} selected from full list!", icon="✅")
+                            except ValueError:
+                                st.toast(f"Word selected! Click 'Play Pronunciation' to hear it.", icon="✅")
                         else:
-                            history_display += "❌ "
-                    
-                    # Add line break every 10 results
-                    if idx % 10 == 0:
-                        history_display += "<br>"
+                            st.toast(f"Word selected! Click 'Play Pronunciation' to hear it.", icon="✅")
+                        rerun_fragment()
+                else:
+                    st.button(word_btn_label, key="random_word_btn", disabled=True)
+                    st.caption("⚠️ Answer the current word first or skip it")
+            elif st.session_state.get('word_list_loader') is not None:
+                # Every word streamed so far is used, but the final list can still add words to
+                # this quiz: finishing now would save the score against a partial list.
+                # word_list_loading_status reruns the app (and this card) once loading is done
+                st.button(word_btn_label, key="random_word_btn", disabled=True)
+                st.caption("⏳ The rest of the list is still loading - the next words will be here in a moment")
+            else:
+                # Quiz completed - save to leaderboard
+                final_accuracy = (st.session_state.quiz_score / st.session_state.quiz_total * 100) if st.session_state.quiz_total > 0 else 0
                 
+                # Save to leaderboard if not already saved
+                if 'leaderboard_saved' not in st.session_state or not st.session_state.leaderboard_saved:
+                    word_source = st.session_state.get('word_source_type', 'unknown')
+
+                    if save_to_leaderboard(
+                        st.session_state.get('username'),
+                        st.session_state.student_name,
+                        st.session_state.quiz_score,
+                        st.session_state.quiz_total,
+                        word_source
+                    ):
+                        st.session_state.leaderboard_saved = True
+                        # Full rerun (not just this fragment) so the sidebar leaderboard picks up the new score
+                        st.rerun()
+
                 st.markdown(f"""
-                <div style='background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%); 
-                            padding: 1em; 
-                            border-radius: 10px; 
-                            border-left: 4px solid #0ea5e9; 
-                            margin: 1em 0;
-                            text-align: center;'>
-                    <p style='margin: 0; color: #0c4a6e; font-size: 1.2em; line-height: 1.8;'>
-                        {history_display}
+                <div style='background: linear-gradient(135deg, #ffeaa7 0%, #fdcb6e 100%); 
+                            padding: 2em; 
+                            border-radius: 15px; 
+                            text-align: center;
+                            border: 3px solid #fdcb6e;
+                            margin: 1em 0;'>
+                    <p style='margin: 0; font-size: 3em;'>🥳</p>
+                    <p style='margin: 0.5em 0 0 0; color: #2d3436; font-size: 1.8em; font-weight: 800;'>
+                        Congratulations, {st.session_state.student_name}!
+                    </p>
+                    <p style='margin: 0.3em 0 0 0; color: #2d3436; font-size: 1.2em;'>
+                        You've completed the quiz! 🌟
                     </p>
-                    <p style='margin: 0.5em 0 0 0; color: #64748b; font-size: 0.85em; font-style: italic;'>
-                        💡 Hover over each emoji to see the word
+                    <p style='margin: 0.5em 0 0 0; color: #636e72; font-size: 1em;'>
+                        Final Score: {st.session_state.quiz_score}/{st.session_state.quiz_total} ({final_accuracy:.1f}%)
+                    </p>
+                    <p style='margin: 0.3em 0 0 0; color: #2ecc71; font-size: 0.9em; font-weight: 600;'>
+                        ✅ Score saved to leaderboard!
                     </p>
                 </div>
                 """, unsafe_allow_html=True)
                 
-                # Show detailed list in expander
-                with st.expander("📋 View Detailed Performance", expanded=False):
-                    for idx, result in enumerate(st.session_state.quiz_history, 1):
-                        word_idx = idx - 1
-                        if word_idx < len(st.session_state.used_quiz_words):
-                            word = st.session_state.used_quiz_words[word_idx]
-                            if result == 1:
-                                st.markdown(f"**{idx}.** ✅ **{word.upper()}** - Correct")
-                            else:
-                                st.markdown(f"**{idx}.** ❌ **{word.upper()}** - Wrong")
+                if st.button("🔄 Reset Quiz", key="reset_quiz_btn"):
+                    st.session_state.used_quiz_words = []
+                    st.session_state.current_quiz_word = None
+                    st.session_state.quiz_score = 0
+                    st.session_state.quiz_total = 0
+                    st.session_state.answer_submitted = False
+                    st.session_state.quiz_history = []
+                    st.session_state.leaderboard_saved = False
+                    rerun_fragment()
+        else:
+            st.warning("Please upload a PDF first to load quiz words.")
+    
+    with col_b:
+        if st.session_state.current_quiz_word:
+            if st.button("🔊 Play Pronunciation", key="quiz_play_btn"):
+                with st.spinner("🎵 Generating audio... Please wait..."):
+                    play_audio(st.session_state.current_quiz_word, rate=speech_rate)
+                # Start timer after audio plays (only if competition mode and not already started)
+                if st.session_state.competition_mode and st.session_state.timer_start is None and not st.session_state.answer_submitted:
+                    st.session_state.timer_start = time.time()
+                    rerun_fragment()
+        else:
+            st.button("🔊 Play Pronunciation", key="quiz_play_btn", disabled=True)
+    
+    with col_c:
+        if st.session_state.current_quiz_word:
+            if st.button("⏭️ Skip Word", key="skip_word_btn"):
+                if not st.session_state.answer_submitted:
+                    st.session_state.used_quiz_words.append(st.session_state.current_quiz_word)
+                    st.session_state.current_quiz_word = None
+                    st.session_state.timer_start = None
+                    st.session_state.time_expired = False
+                    rerun_fragment()
+        else:
+            st.button("⏭️ Skip Word", key="skip_word_btn", disabled=True)
+    
+    # Show the quiz interface when a word is selected
+    if st.session_state.current_quiz_word:
+        st.markdown("---")
+        
+        # Competition Mode timer runs in its own fragment so its 1s tick stays local
+        if st.session_state.competition_mode:
+            quiz_timer()
+        if st.session_state.time_expired:
+            st.error("⏰ **TIME'S UP!** You ran out of time for this question.")
+            st.markdown(f"""
+            <div style='background: linear-gradient(135deg, #d1fae5 0%, #a7f3d0 100%); 
+                        padding: 1.5em; 
+                        border-radius: 12px; 
+                        border-left: 5px solid #10b981; 
+                        margin: 1em 0;
+                        text-align: center;'>
+                <p style='margin: 0; color: #065f46; font-size: 0.9em; font-weight: 600; text-transform: uppercase;'>
+                    The correct answer was:
+                </p>
+                <p style='margin: 0.3em 0 0 0; color: #047857; font-size: 2.5em; font-weight: 800;'>
+                    {st.session_state.current_quiz_word}
+                </p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.info(f"🎧 {st.session_state.student_name}, listen to the pronunciation and spell the word below:")
+        st.success(f"✓ Word selected! ({len(st.session_state.current_quiz_word)} letters)")
+        
+        # Add Hint Button
+        if not st.session_state.answer_submitted:
+            if st.button("💡 Get Hint", key="hint_btn"):
+                word_info = get_word_info(st.session_state.current_quiz_word)
                 
-                # Show streak information
-                if st.session_state.quiz_history:
-                    current_streak = 0
-                    max_streak = 0
-                    temp_streak = 0
-                    
-                    for result in reversed(st.session_state.quiz_history):
-                        if result == 1:
-                            if current_streak == temp_streak:
-                                current_streak += 1
-                            temp_streak += 1
-                            max_streak = max(max_streak, temp_streak)
-                        else:
-                            temp_streak = 0
+                with st.expander("📖 Word Hints", expanded=True):
+                    st.markdown(f"### Hints for the word ({len(st.session_state.current_quiz_word)} letters)")
                     
-                    col_streak1, col_streak2 = st.columns(2)
-                    with col_streak1:
-                        st.metric("🔥 Current Streak", f"{current_streak}")
-                    with col_streak2:
-                        st.metric("⭐ Best Streak", f"{max_streak}")
-            
-            # Show status message
-            randomize_order = st.session_state.get('randomize_order', False)
-            word_btn_label = "🎲 Get Random Word" if randomize_order else "➡️ Get Next Word"
-
-            if st.session_state.current_quiz_word is None:
-                st.info(f"👉 {st.session_state.student_name}, click '{word_btn_label}' to start!")
-            elif not st.session_state.answer_submitted:
-                st.info(f"🎧 {st.session_state.student_name}, listen carefully and type your answer!")
-
-            col_a, col_b, col_c = st.columns([1, 1, 1])
-
-            with col_a:
-                # Check if all words have been used
-                if st.session_state.quiz_words:
-                    available_words = [w for w in st.session_state.quiz_words if w not in st.session_state.used_quiz_words]
-
-                    if available_words:
-                        # Only allow getting a new word if no current word or answer was already submitted
-                        can_get_word = st.session_state.current_quiz_word is None or st.session_state.answer_submitted
-
-                        if can_get_word:
-                            if st.button(word_btn_label, key="random_word_btn"):
-                                if randomize_order:
-                                    import random
-                                    selected_word = random.choice(available_words)
-                                else:
-                                    selected_word = available_words[0]
-                                st.session_state.current_quiz_word = selected_word
-                                st.session_state.quiz_attempts = 0
-                                st.session_state.answer_submitted = False
-                                st.session_state.time_expired = False
-                                # Reset timer - will start when pronunciation is played
-                                st.session_state.timer_start = None
-
-                                # Debug: Find the word position in original list
-                                if 'all_loaded_words' in st.session_state:
-                                    try:
-                                        word_position = st.session_state.all_loaded_words.index(selected_word) + 1
-                                        st.toast(f"Word #{word_position} selected from full list!", icon="✅")
-                                    except ValueError:
-                                        st.toast(f"Word selected! Click 'Play Pronunciation' to hear it.", icon="✅")
-                                else:
-                                    st.toast(f"Word selected! Click 'Play Pronunciation' to hear it.", icon="✅")
-                                st.rerun()
-                        else:
-                            st.button(word_btn_label, key="random_word_btn", disabled=True)
-                            st.caption("⚠️ Answer the current word first or skip it")
+                    # Show definition
+                    if word_info['meaning']:
+                        st.markdown("#### 📚 Definition:")
+                        for part_of_speech, definitions in word_info['meaning'].items():
+                            st.markdown(f"**{part_of_speech.capitalize()}:**")
+                            for idx, definition in enumerate(definitions[:2], 1):  # Show first 2 definitions
+                                st.write(f"{idx}. {definition}")
                     else:
-                        # Quiz completed - save to leaderboard
-                        final_accuracy = (st.session_state.quiz_score / st.session_state.quiz_total * 100) if st.session_state.quiz_total > 0 else 0
-                        
-                        # Save to leaderboard if not already saved
-                        if 'leaderboard_saved' not in st.session_state or not st.session_state.leaderboard_saved:
-                            word_source = st.session_state.get('word_source_type', 'unknown')
-                            total_words = len(st.session_state.get('all_loaded_words', []))
-                            
-                            if save_to_leaderboard(
-                                st.session_state.student_name,
-                                st.session_state.quiz_score,
-                                st.session_state.quiz_total,
-                                round(final_accuracy, 1),
-                                word_source,
-                                total_words
-                            ):
-                                st.session_state.leaderboard_saved = True
-                                # Update user stats
-                                if 'username' in st.session_state:
-                                    update_user_stats(st.session_state.username, round(final_accuracy, 1))
-                        
-                        st.markdown(f"""
-                        <div style='background: linear-gradient(135deg, #ffeaa7 0%, #fdcb6e 100%); 
-                                    padding: 2em; 
-                                    border-radius: 15px; 
-                                    text-align: center;
-                                    border: 3px solid #fdcb6e;
-                                    margin: 1em 0;'>
-                            <p style='margin: 0; font-size: 3em;'>🥳</p>
-                            <p style='margin: 0.5em 0 0 0; color: #2d3436; font-size: 1.8em; font-weight: 800;'>
-                                Congratulations, {st.session_state.student_name}!
-                            </p>
-                            <p style='margin: 0.3em 0 0 0; color: #2d3436; font-size: 1.2em;'>
-                                You've completed the quiz! 🌟
-                            </p>
-                            <p style='margin: 0.5em 0 0 0; color: #636e72; font-size: 1em;'>
-                                Final Score: {st.session_state.quiz_score}/{st.session_state.quiz_total} ({final_accuracy:.1f}%)
-                            </p>
-                            <p style='margin: 0.3em 0 0 0; color: #2ecc71; font-size: 0.9em; font-weight: 600;'>
-                                ✅ Score saved to leaderboard!
-                            </p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        if st.button("🔄 Reset Quiz", key="reset_quiz_btn"):
-                            st.session_state.used_quiz_words = []
-                            st.session_state.current_quiz_word = None
-                            st.session_state.quiz_score = 0
-                            st.session_state.quiz_total = 0
-                            st.session_state.answer_submitted = False
-                            st.session_state.quiz_history = []
-                            st.session_state.leaderboard_saved = False
-                            st.rerun()
-                else:
-                    st.warning("Please upload a PDF first to load quiz words.")
-            
-            with col_b:
-                if st.session_state.current_quiz_word:
-                    if st.button("🔊 Play Pronunciation", key="quiz_play_btn"):
-                        with st.spinner("🎵 Generating audio... Please wait..."):
-                            play_audio(st.session_state.current_quiz_word, rate=speech_rate)
-                        # Start timer after audio plays (only if competition mode and not already started)
-                        if st.session_state.competition_mode and st.session_state.timer_start is None and not st.session_state.answer_submitted:
-                            st.session_state.timer_start = time.time()
-                            st.rerun()
-                else:
-                    st.button("🔊 Play Pronunciation", key="quiz_play_btn", disabled=True)
-            
-            with col_c:
-                if st.session_state.current_quiz_word:
-                    if st.button("⏭️ Skip Word", key="skip_word_btn"):
-                        if not st.session_state.answer_submitted:
-                            st.session_state.used_quiz_words.append(st.session_state.current_quiz_word)
-                            st.session_state.current_quiz_word = None
-                            st.session_state.timer_start = None
-                            st.session_state.time_expired = False
-                            st.rerun()
-                else:
-                    st.button("⏭️ Skip Word", key="skip_word_btn", disabled=True)
-            
-            # Show the quiz interface when a word is selected
-            if st.session_state.current_quiz_word:
-                st.markdown("---")
-                
-                # Competition Mode Timer Display or Waiting Message
-                if st.session_state.competition_mode and not st.session_state.answer_submitted:
-                    if st.session_state.timer_start is None:
-                        # Timer not started yet - waiting for audio to play
-                        st.markdown("""
-                        <div style='background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%); 
-                                    padding: 1em; 
-                                    border-radius: 10px; 
-                                    border: 3px solid #f59e0b; 
-                                    margin: 1em 0;
-                                    text-align: center;'>
-                            <p style='margin: 0; color: #92400e; font-size: 1.2em; font-weight: 700;'>
-                                ⚡ Competition Mode Active
-                            </p>
-                            <p style='margin: 0.3em 0 0 0; color: #78350f; font-size: 0.9em;'>
-                                Click "Play Pronunciation" to start the timer!
-                            </p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        # Timer is running
-                        elapsed_time = time.time() - st.session_state.timer_start
-                        remaining_time = max(0, st.session_state.timer_seconds - elapsed_time)
-                        
-                        if remaining_time > 0:
-                            # Calculate color based on remaining time
-                            time_percentage = (remaining_time / st.session_state.timer_seconds) * 100
-                            if time_percentage > 50:
-                                timer_color = "#10b981"  # Green
-                            elif time_percentage > 25:
-                                timer_color = "#f59e0b"  # Orange
-                            else:
-                                timer_color = "#ef4444"  # Red
-                            
-                            # Create placeholder for timer that will be updated
-                            timer_placeholder = st.empty()
-                            timer_placeholder.markdown(f"""
-                            <div style='background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%); 
-                                        padding: 1em; 
-                                        border-radius: 10px; 
-                                        border: 3px solid {timer_color}; 
-                                        margin: 1em 0;
-                                        text-align: center;'>
-                                <p style='margin: 0; color: {timer_color}; font-size: 2.5em; font-weight: 800;'>
-                                    ⏱️ {int(remaining_time)}s
-                                </p>
-                                <p style='margin: 0.3em 0 0 0; color: #0c4a6e; font-size: 0.9em;'>
-                                    Time Remaining
-                                </p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        else:
-                            # Time expired
-                            if not st.session_state.time_expired:
-                                st.session_state.time_expired = True
-                                st.session_state.answer_submitted = True
-                                st.session_state.quiz_total += 1
-                                st.session_state.quiz_history.append(0)
-                                st.session_state.used_quiz_words.append(st.session_state.current_quiz_word)
-                                
-                                st.session_state.wrong_attempts.append({
-                                    'correct': st.session_state.current_quiz_word,
-                                    'your_answer': '(Time Expired)',
-                                    'similarity': 0,
-                                    'error_type': 'timeout'
-                                })
-                            
-                            st.error("⏰ **TIME'S UP!** You ran out of time for this question.")
-                            st.markdown(f"""
-                            <div style='background: linear-gradient(135deg, #d1fae5 0%, #a7f3d0 100%); 
-                                        padding: 1.5em; 
-                                        border-radius: 12px; 
-                                        border-left: 5px solid #10b981; 
-                                        margin: 1em 0;
-                                        text-align: center;'>
-                                <p style='margin: 0; color: #065f46; font-size: 0.9em; font-weight: 600; text-transform: uppercase;'>
-                                    The correct answer was:
-                                </p>
-                                <p style='margin: 0.3em 0 0 0; color: #047857; font-size: 2.5em; font-weight: 800;'>
-                                    {st.session_state.current_quiz_word}
-                                </p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                
-                st.info(f"🎧 {st.session_state.student_name}, listen to the pronunciation and spell the word below:")
-                st.success(f"✓ Word selected! ({len(st.session_state.current_quiz_word)} letters)")
-                
-                # Add Hint Button
-                if not st.session_state.answer_submitted:
-                    if st.button("💡 Get Hint", key="hint_btn"):
-                        word_info = get_word_info(st.session_state.current_quiz_word)
-                        
-                        with st.expander("📖 Word Hints", expanded=True):
-                            st.markdown(f"### Hints for the word ({len(st.session_state.current_quiz_word)} letters)")
-                            
-                            # Show definition
-                            if word_info['meaning']:
-                                st.markdown("#### 📚 Definition:")
-                                for part_of_speech, definitions in word_info['meaning'].items():
-                                    st.markdown(f"**{part_of_speech.capitalize()}:**")
-                                    for idx, definition in enumerate(definitions[:2], 1):  # Show first 2 definitions
-                                        st.write(f"{idx}. {definition}")
-                            else:
-                                st.warning("Definition not available for this word.")
-                            
-                            # Show synonyms
-                            if word_info['synonym']:
-                                st.markdown("#### 🔄 Synonyms:")
-                                synonyms_list = word_info['synonym'][:5]  # Show first 5 synonyms
-                                st.write(", ".join(synonyms_list))
-                            
-                            # Show antonyms
-                            if word_info['antonym']:
-                                st.markdown("#### ↔️ Antonyms:")
-                                antonyms_list = word_info['antonym'][:5]  # Show first 5 antonyms
-                                st.write(", ".join(antonyms_list))
-                
-                is_answer_submitted = bool(st.session_state.answer_submitted)
+                        st.warning("Definition not available for this word.")
+                    
+                    # Show synonyms
+                    if word_info['synonym']:
+                        st.markdown("#### 🔄 Synonyms:")
+                        synonyms_list = word_info['synonym'][:5]  # Show first 5 synonyms
+                        st.write(", ".join(synonyms_list))
+                    
+                    # Show antonyms
+                    if word_info['antonym']:
+                        st.markdown("#### ↔️ Antonyms:")
+                        antonyms_list = word_info['antonym'][:5]  # Show first 5 antonyms
+                        st.write(", ".join(antonyms_list))
+        
+        is_answer_submitted = bool(st.session_state.answer_submitted)
+        
+        # Create a form to allow Enter key submission
+        with st.form(key="answer_form", clear_on_submit=False):
+            user_answer = st.text_input("Your spelling:", key="quiz_answer_input", disabled=is_answer_submitted, placeholder="Type the word you heard and press Enter...")
+            submit_button = st.form_submit_button("Check Answer", disabled=is_answer_submitted)
+        
+        if submit_button and not is_answer_submitted:
+            if user_answer:
+                correct_word = st.session_state.current_quiz_word
+                st.session_state.quiz_attempts += 1
+                st.session_state.quiz_total += 1
+                st.session_state.answer_submitted = True
+                st.session_state.used_quiz_words.append(correct_word)
                 
-                # Create a form to allow Enter key submission
-                with st.form(key="answer_form", clear_on_submit=False):
-                    user_answer = st.text_input("Your spelling:", key="quiz_answer_input", disabled=is_answer_submitted, placeholder="Type the word you heard and press Enter...")
-                    submit_button = st.form_submit_button("Check Answer", disabled=is_answer_submitted)
+                grade = grade_answer(correct_word, user_answer)
+                record_word_attempt(correct_word, user_answer, grade)
                 
-                if submit_button and not is_answer_submitted:
-                    if user_answer:
-                        correct_word = st.session_state.current_quiz_word
-                        st.session_state.quiz_attempts += 1
-                        st.session_state.quiz_total += 1
-                        st.session_state.answer_submitted = True
-                        st.session_state.used_quiz_words.append(correct_word)
-                        
-                        if user_answer == correct_word:
-                            st.session_state.quiz_score += 1
-                            st.session_state.quiz_history.append(1)  # Track correct answer
-                            
-                            # Animated success message
-                            st.markdown("""
-                            <div style='background: linear-gradient(135deg, #d1fae5 0%, #a7f3d0 100%); 
-                                        padding: 2em; 
-                                        border-radius: 15px; 
-                                        border: 3px solid #10b981; 
-                                        margin: 1em 0;
-                                        text-align: center;
-                                        animation: successPulse 0.5s ease-in-out;'>
-                                <p style='margin: 0; font-size: 3em;'>🎉</p>
-                                <p style='margin: 0.5em 0 0 0; color: #065f46; font-size: 1.5em; font-weight: 800;'>
-                                    CORRECT!
-                                </p>
-                                <p style='margin: 0.3em 0 0 0; color: #047857; font-size: 1.2em; font-weight: 600;'>
-                                    The word is: {word}
-                                </p>
-                            </div>
-                            <style>
-                            @keyframes successPulse {{
-                                0% {{ transform: scale(0.8); opacity: 0; }}
-                                50% {{ transform: scale(1.05); }}
-                                100% {{ transform: scale(1); opacity: 1; }}
-                            }}
-                            </style>
-                            """.replace('{word}', correct_word.upper()), unsafe_allow_html=True)
-                            
-                            phones = pronouncing.phones_for_word(correct_word)
-                            if phones:
-                                st.markdown(f'<span class="pronunciation">Pronunciation (ARPAbet): {phones[0]}</span>', unsafe_allow_html=True)
-                            
-                            # Celebration animation for correct answer
-                            st.balloons()
-                        else:
-                            similarity = difflib.SequenceMatcher(None, user_answer, correct_word).ratio()
-                            st.session_state.quiz_history.append(0)  # Track wrong answer
-                            
-                            # Determine what went wrong: case or spelling or both
-                            case_mismatch = user_answer.lower() == correct_word.lower() and user_answer != correct_word
-                            spelling_wrong = user_answer.lower() != correct_word.lower()
-                            
-                            if case_mismatch:
-                                error_type = "❗ Case Sensitivity Error"
-                                error_detail = "Your spelling is correct, but the capitalization is wrong!"
-                                error_icon = "🔡"
-                            elif spelling_wrong:
-                                error_type = "❌ Spelling Error"
-                                error_detail = "The spelling is incorrect."
-                                error_icon = "❌"
-                            
-                            # Track wrong attempt for revision
-                            st.session_state.wrong_attempts.append({
-                                'correct': correct_word,
-                                'your_answer': user_answer,
-                                'similarity': similarity * 100,
-                                'error_type': 'case' if case_mismatch else 'spelling'
-                            })
-                            
-                            # Animated error message
-                            st.markdown(f"""
-                            <div style='background: linear-gradient(135deg, #fee2e2 0%, #fecaca 100%); 
-                                        padding: 2em; 
-                                        border-radius: 15px; 
-                                        border: 3px solid #ef4444; 
-                                        margin: 1em 0;
-                                        text-align: center;
-                                        animation: shakeTilt 0.5s ease-in-out;'>
-                                <p style='margin: 0; font-size: 3em;'>{error_icon}</p>
-                                <p style='margin: 0.5em 0 0 0; color: #991b1b; font-size: 1.5em; font-weight: 800;'>
-                                    {error_type}
-                                </p>
-                                <p style='margin: 0.3em 0 0 0; color: #b91c1c; font-size: 1em;'>
-                                    {error_detail}
-                                </p>
-                                <p style='margin: 0.3em 0 0 0; color: #b91c1c; font-size: 1em;'>
-                                    You wrote: <strong>{user_answer}</strong>
-                                </p>
-                            </div>
-                            <style>
-                            @keyframes shakeTilt {{
-                                0%, 100% {{ transform: translateX(0) rotate(0deg); }}
-                                25% {{ transform: translateX(-5px) rotate(-2deg); }}
-                                75% {{ transform: translateX(5px) rotate(2deg); }}
-                            }}
-                            </style>
-                            """, unsafe_allow_html=True)
-                            
-                            # Show correct spelling prominently with actual case
-                            st.markdown(f"""
-                            <div style='background: linear-gradient(135deg, #d1fae5 0%, #a7f3d0 100%); 
-                                        padding: 1.5em; 
-                                        border-radius: 12px; 
-                                        border-left: 5px solid #10b981; 
-                                        margin: 1em 0;
-                                        text-align: center;
-                                        animation: slideIn 0.5s ease-out;'>
-                                <p style='margin: 0; color: #065f46; font-size: 0.9em; font-weight: 600; text-transform: uppercase; letter-spacing: 0.05em;'>
-                                    Correct Spelling
-                                </p>
-                                <p style='margin: 0.3em 0 0 0; color: #047857; font-size: 2.5em; font-weight: 800; letter-spacing: 0.02em;'>
-                                    {correct_word}
-                                </p>
-                            </div>
-                            <style>
-                            @keyframes slideIn {{
-                                from {{ transform: translateY(-20px); opacity: 0; }}
-                                to {{ transform: translateY(0); opacity: 1; }}
-                            }}
-                            </style>
-                            """, unsafe_allow_html=True)
-                            
-                            # Snow animation for wrong answer
-                            st.snow()
-                            
-                            st.info(f"📊 Similarity Score: **{similarity*100:.1f}%** - You were {similarity*100:.1f}% close!")
-                            
-                            phones = pronouncing.phones_for_word(correct_word)
-                            if phones:
-                                st.markdown(f'<span class="pronunciation">Pronunciation (ARPAbet): {phones[0]}</span>', unsafe_allow_html=True)
-                            
-                            # Give hints based on error type and similarity
-                            if case_mismatch:
-                                st.warning(f"⚠️ **Case Sensitivity Tip:** Pay attention to which letters are uppercase and lowercase. The correct word is: **{correct_word}**")
-                            elif similarity > 0.7:
-                                st.info("💡 You're very close! Just a few letters off.")
-                            elif similarity > 0.5:
-                                st.info(f"💡 The word has {len(correct_word)} letters and you got most of them right.")
-                            else:
-                                st.info(f"💡 Tip: The word starts with **'{correct_word[0]}'** and has **{len(correct_word)} letters**.")
+                if grade['correct']:
+                    st.session_state.quiz_score += 1
+                    st.session_state.quiz_history.append(1)  # Track correct answer
+                    
+                    # Animated success message
+                    st.markdown("""
+                    <div style='background: linear-gradient(135deg, #d1fae5 0%, #a7f3d0 100%); 
+                                padding: 2em; 
+                                border-radius: 15px; 
+                                border: 3px solid #10b981; 
+                                margin: 1em 0;
+                                text-align: center;
+                                animation: successPulse 0.5s ease-in-out;'>
+                        <p style='margin: 0; font-size: 3em;'>🎉</p>
+                        <p style='margin: 0.5em 0 0 0; color: #065f46; font-size: 1.5em; font-weight: 800;'>
+                            CORRECT!
+                        </p>
+                        <p style='margin: 0.3em 0 0 0; color: #047857; font-size: 1.2em; font-weight: 600;'>
+                            The word is: {word}
+                        </p>
+                    </div>
+                    <style>
+                    @keyframes successPulse {{
+                        0% {{ transform: scale(0.8); opacity: 0; }}
+                        50% {{ transform: scale(1.05); }}
+                        100% {{ transform: scale(1); opacity: 1; }}
+                    }}
+                    </style>
+                    """.replace('{word}', correct_word.upper()), unsafe_allow_html=True)
+                    
+                    phones = pronouncing.phones_for_word(correct_word)
+                    if phones:
+                        st.markdown(f'<span class="pronunciation">Pronunciation (ARPAbet): {phones[0]}</span>', unsafe_allow_html=True)
+                    
+                    # Celebration animation for correct answer
+                    st.balloons()
+                else:
+                    similarity = grade['similarity'] / 100
+                    st.session_state.quiz_history.append(0)  # Track wrong answer
+                    
+                    # Determine what went wrong: case or spelling
+                    case_mismatch = grade['error_type'] == 'case'
+                    
+                    if case_mismatch:
+                        error_type = "❗ Case Sensitivity Error"
+                        error_detail = "Your spelling is correct, but the capitalization is wrong!"
+                        error_icon = "🔡"
                     else:
-                        st.warning("Please enter a word before checking.")
-                
-                # Show result after answer is submitted
-                if st.session_state.answer_submitted:
-                    correct_word = st.session_state.current_quiz_word
+                        error_type = "❌ Spelling Error"
+                        error_detail = "The spelling is incorrect."
+                        error_icon = "❌"
                     
-                    col_next1, col_next2 = st.columns(2)
-                    with col_next1:
-                        if st.button("➡️ Next Word", key="next_word_btn", use_container_width=True):
-                            st.session_state.current_quiz_word = None
-                            st.session_state.answer_submitted = False
-                            st.session_state.timer_start = None
-                            st.session_state.time_expired = False
-                            st.rerun()
+                    # Track wrong attempt for revision
+                    st.session_state.wrong_attempts.append({
+                        'correct': correct_word,
+                        'your_answer': user_answer,
+                        'similarity': grade['similarity'],
+                        'error_type': grade['error_type']
+                    })
                     
-                    with col_next2:
-                        if st.button("🔊 Hear it again", key="hear_again_btn", use_container_width=True):
-                            play_audio(correct_word, rate=speech_rate)
+                    # Animated error message
+                    st.markdown(f"""
+                    <div style='background: linear-gradient(135deg, #fee2e2 0%, #fecaca 100%); 
+                                padding: 2em; 
+                                border-radius: 15px; 
+                                border: 3px solid #ef4444; 
+                                margin: 1em 0;
+                                text-align: center;
+                                animation: shakeTilt 0.5s ease-in-out;'>
+                        <p style='margin: 0; font-size: 3em;'>{error_icon}</p>
+                        <p style='margin: 0.5em 0 0 0; color: #991b1b; font-size: 1.5em; font-weight: 800;'>
+                            {error_type}
+                        </p>
+                        <p style='margin: 0.3em 0 0 0; color: #b91c1c; font-size: 1em;'>
+                            {error_detail}
+                        </p>
+                        <p style='margin: 0.3em 0 0 0; color: #b91c1c; font-size: 1em;'>
+                            You wrote: <strong>{user_answer}</strong>
+                        </p>
+                    </div>
+                    <style>
+                    @keyframes shakeTilt {{
+                        0%, 100% {{ transform: translateX(0) rotate(0deg); }}
+                        25% {{ transform: translateX(-5px) rotate(-2deg); }}
+                        75% {{ transform: translateX(5px) rotate(2deg); }}
+                    }}
+                    </style>
+                    """, unsafe_allow_html=True)
+                    
+                    # Show correct spelling prominently with actual case
+                    st.markdown(f"""
+                    <div style='background: linear-gradient(135deg, #d1fae5 0%, #a7f3d0 100%); 
+                                padding: 1.5em; 
+                                border-radius: 12px; 
+                                border-left: 5px solid #10b981; 
+                                margin: 1em 0;
+                                text-align: center;
+                                animation: slideIn 0.5s ease-out;'>
+                        <p style='margin: 0; color: #065f46; font-size: 0.9em; font-weight: 600; text-transform: uppercase; letter-spacing: 0.05em;'>
+                            Correct Spelling
+                        </p>
+                        <p style='margin: 0.3em 0 0 0; color: #047857; font-size: 2.5em; font-weight: 800; letter-spacing: 0.02em;'>
+                            {correct_word}
+                        </p>
+                    </div>
+                    <style>
+                    @keyframes slideIn {{
+                        from {{ transform: translateY(-20px); opacity: 0; }}
+                        to {{ transform: translateY(0); opacity: 1; }}
+                    }}
+                    </style>
+                    """, unsafe_allow_html=True)
+                    
+                    # Snow animation for wrong answer
+                    st.snow()
+                    
+                    st.info(f"📊 Similarity Score: **{similarity*100:.1f}%** - You were {similarity*100:.1f}% close!")
+                    
+                    phones = pronouncing.phones_for_word(correct_word)
+                    if phones:
+                        st.markdown(f'<span class="pronunciation">Pronunciation (ARPAbet): {phones[0]}</span>', unsafe_allow_html=True)
+                    
+                    # Give hints based on error type and similarity
+                    if case_mismatch:
+                        st.warning(f"⚠️ **Case Sensitivity Tip:** Pay attention to which letters are uppercase and lowercase. The correct word is: **{correct_word}**")
+                    elif similarity > 0.7:
+                        st.info("💡 You're very close! Just a few letters off.")
+                    elif similarity > 0.5:
+                        st.info(f"💡 The word has {len(correct_word)} letters and you got most of them right.")
+                    else:
+                        st.info(f"💡 Tip: The word starts with **'{correct_word[0]}'** and has **{len(correct_word)} letters**.")
+            else:
+                st.warning("Please enter a word before checking.")
+        
+        # Show result after answer is submitted
+        if st.session_state.answer_submitted:
+            correct_word = st.session_state.current_quiz_word
             
-            # Show revision list of wrong attempts
-            if st.session_state.wrong_attempts:
-                st.markdown("---")
-                st.markdown("### 📝 Revision List - Words to Practice")
-                st.info(f"You have **{len(st.session_state.wrong_attempts)}** word(s) to review")
+            col_next1, col_next2 = st.columns(2)
+            with col_next1:
+                if st.button("➡️ Next Word", key="next_word_btn", use_container_width=True):
+                    st.session_state.current_quiz_word = None
+                    st.session_state.answer_submitted = False
+                    st.session_state.timer_start = None
+                    st.session_state.time_expired = False
+                    rerun_fragment()
+            
+            with col_next2:
+                if st.button("🔊 Hear it again", key="hear_again_btn", use_container_width=True):
+                    play_audio(correct_word, rate=speech_rate)
+    
+    # Show revision list of wrong attempts
+    if st.session_state.wrong_attempts:
+        st.markdown("---")
+        st.markdown("### 📝 Revision List - Words to Practice")
+        st.info(f"You have **{len(st.session_state.wrong_attempts)}** word(s) to review")
+        
+        with st.expander("View All Wrong Attempts", expanded=False):
+            for idx, attempt in enumerate(st.session_state.wrong_attempts, 1):
+                if attempt.get('error_type') == 'timeout':
+                    error_badge = "⏰ Time Expired"
+                    border_color = "#ef4444"
+                elif attempt.get('error_type') == 'case':
+                    error_badge = "🔡 Case Error"
+                    border_color = "#3b82f6"
+                else:
+                    error_badge = "❌ Spelling Error"
+                    border_color = "#f59e0b"
                 
-                with st.expander("View All Wrong Attempts", expanded=False):
-                    for idx, attempt in enumerate(st.session_state.wrong_attempts, 1):
-                        if attempt.get('error_type') == 'timeout':
-                            error_badge = "⏰ Time Expired"
-                            border_color = "#ef4444"
-                        elif attempt.get('error_type') == 'case':
-                            error_badge = "🔡 Case Error"
-                            border_color = "#3b82f6"
-                        else:
-                            error_badge = "❌ Spelling Error"
-                            border_color = "#f59e0b"
-                        
-                        st.markdown(f"""
-                        <div style='background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%); 
-                                    padding: 1em; 
-                                    border-radius: 10px; 
-                                    border-left: 4px solid {border_color}; 
-                                    margin: 0.8em 0;'>
-                            <p style='margin: 0; color: #92400e; font-size: 0.85em; font-weight: 600;'>
-                                #{idx} - {error_badge} - Similarity: {attempt['similarity']:.1f}%
-                            </p>
-                            <p style='margin: 0.3em 0 0 0; color: #b45309;'>
-                                <strong>Your Answer:</strong> <span style='text-decoration: line-through;'>{attempt['your_answer']}</span>
-                            </p>
-                            <p style='margin: 0.3em 0 0 0; color: #065f46; font-weight: 700;'>
-                                <strong>Correct:</strong> {attempt['correct']}
-                            </p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        col_rev1, col_rev2 = st.columns([1, 3])
-                        with col_rev1:
-                            if st.button(f"🔊 Hear", key=f"revision_play_{idx}"):
-                                play_audio(attempt['correct'], rate=speech_rate)
+                st.markdown(f"""
+                <div style='background: linear-gradient(135deg, #fef3c7 0%, #fde68a 100%); 
+                            padding: 1em; 
+                            border-radius: 10px; 
+                            border-left: 4px solid {border_color}; 
+                            margin: 0.8em 0;'>
+                    <p style='margin: 0; color: #92400e; font-size: 0.85em; font-weight: 600;'>
+                        #{idx} - {error_badge} - Similarity: {attempt['similarity']:.1f}%
+                    </p>
+                    <p style='margin: 0.3em 0 0 0; color: #b45309;'>
+                        <strong>Your Answer:</strong> <span style='text-decoration: line-through;'>{attempt['your_answer']}</span>
+                    </p>
+                    <p style='margin: 0.3em 0 0 0; color: #065f46; font-weight: 700;'>
+                        <strong>Correct:</strong> {attempt['correct']}
+                    </p>
+                </div>
+                """, unsafe_allow_html=True)
                 
-                if st.button("🗑️ Clear Revision List", key="clear_revision_btn"):
-                    st.session_state.wrong_attempts = []
-                    st.rerun()
+                col_rev1, col_rev2 = st.columns([1, 3])
+                with col_rev1:
+                    if st.button(f"🔊 Hear", key=f"revision_play_{idx}"):
+                        play_audio(attempt['correct'], rate=speech_rate)
+        
+        if st.button("🗑️ Clear Revision List", key="clear_revision_btn"):
+            st.session_state.wrong_attempts = []
+            rerun_fragment()
+    
+    due_count = revision_queue().due_count()
+    if due_count:
+        st.caption(f"📅 {due_count} word(s) due for review today across all your lists - turn on \"🔁 Review due words first\" to practice them.")
+
+
+@st.fragment
+def all_scores_view():
+    """The "All Scores" tab: the full ranking, searchable and a page at a time, so only the
+    rows shown are rendered. Runs as a fragment: paging and searching rerun only this tab."""
+    st.markdown("### 📋 All Users Overview")
+    
+    query = st.text_input("🔍 Search by name", key="all_scores_search")
+    if query != st.session_state.get('all_scores_query'):
+        # New search: back to the first page
+        st.session_state.all_scores_query = query
+        st.session_state.all_scores_start = 0
+    start = st.session_state.get('all_scores_start', 0)
+    
+    page, total = get_leaderboard_page(query, start)
+    if not page and start > 0:
+        # The page emptied (e.g. the ranking shrank); show the last one instead
+        start = max(0, (total - 1) // ALL_SCORES_PAGE_SIZE * ALL_SCORES_PAGE_SIZE)
+        st.session_state.all_scores_start = start
+        page, total = get_leaderboard_page(query, start)
+    
+    if page:
+        st.info(f"Showing {start + 1}–{start + len(page)} of {total} users")
+        
+        for idx, entry in page:
+            accuracy_color = "#2ecc71" if entry['best_accuracy'] >= 75 else "#f39c12" if entry['best_accuracy'] >= 50 else "#e74c3c"
             
-            # Auto-refresh for timer updates (only if timer is running and no answer submitted)
-            if (st.session_state.competition_mode and 
-                st.session_state.current_quiz_word and 
-                st.session_state.timer_start and 
-                not st.session_state.answer_submitted):
-                elapsed = time.time() - st.session_state.timer_start
-                if elapsed < st.session_state.timer_seconds:
-                    time.sleep(1)
-                    st.rerun()
-        else:
-            st.info("📤 Choose a word source above to start the pronunciation quiz!")
-            st.markdown("""
-            **How it works:**
-            1. Pick a word source: the predefined list, this year's official list, your own PDF, or a difficulty level
-            2. System will load words for you (up to 50 to start)
-            3. Click 'Get Next Word' to start
-            4. Listen to pronunciation (no spelling shown!)
-            5. Type what you heard and check your answer
-            """)
+            st.markdown(f"""
+            <div style='background: #f8f9fa; 
+                        padding: 0.7em; 
+                        border-radius: 6px; 
+                        margin: 0.3em 0;
+                        border-left: 3px solid {accuracy_color};'>
+                <p style='margin: 0; font-size: 0.9em; color: #2a3b5d;'>
+                    <strong>#{idx} {entry['name']}</strong>
+                </p>
+                <p style='margin: 0.2em 0 0 0; font-size: 0.8em; color: #636e72;'>
+                    Best: {entry['best_accuracy']}% | Avg: {entry['avg_accuracy']}% | 
+                    {entry['total_quizzes']} quiz(es) | Total: {entry['total_score']}/{entry['total_questions']}
+                </p>
+                <p style='margin: 0.2em 0 0 0; font-size: 0.75em; color: #95a5a6;'>
+                    Last quiz: {entry['last_quiz_date']}
+                </p>
+            </div>
+            """, unsafe_allow_html=True)
         
-        st.markdown('</div>', unsafe_allow_html=True)
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("⬅️ Previous", key="all_scores_prev", disabled=start == 0, use_container_width=True):
+                st.session_state.all_scores_start = max(0, start - ALL_SCORES_PAGE_SIZE)
+                rerun_fragment()
+        with col_page:
+            st.markdown(f"<p style='text-align: center;'>Page {start // ALL_SCORES_PAGE_SIZE + 1} of {(total - 1) // ALL_SCORES_PAGE_SIZE + 1}</p>", unsafe_allow_html=True)
+        with col_next:
+            if st.button("Next ➡️", key="all_scores_next", disabled=start + ALL_SCORES_PAGE_SIZE >= total, use_container_width=True):
+                st.session_state.all_scores_start = start + ALL_SCORES_PAGE_SIZE
+                rerun_fragment()
+    elif query.strip():
+        st.info(f"No users found matching **{query}**.")
+    else:
+        st.info("📭 No scores recorded yet. Be the first to complete a quiz!")
 
 def leaderboard_tile():
     """Display leaderboard with top scores and user history."""
@@ -1765,7 +1832,14 @@ def leaderboard_tile():
             st.markdown("### 🏅 Top 10 Performers")
             st.markdown("*Ranked by best accuracy*")
             
-            top_scores = get_top_scores(10)
+            window = st.radio(
+                "Period:",
+                [None, *LEADERBOARD_WINDOWS],
+                format_func=lambda w: LEADERBOARD_WINDOWS.get(w, "All Time"),
+                horizontal=True,
+                key="top_scores_window"
+            )
+            top_scores = get_top_scores(10, window)
             
             if top_scores:
                 for idx, entry in enumerate(top_scores, 1):
@@ -1812,6 +1886,8 @@ def leaderboard_tile():
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
+            elif window:
+                st.info(f"🎯 No quizzes yet {LEADERBOARD_WINDOWS[window].lower()}! Complete one to top this leaderboard!")
             else:
                 st.info("🎯 No scores yet! Complete a quiz to be the first on the leaderboard!")
         
@@ -1836,6 +1912,16 @@ def leaderboard_tile():
                     with col4:
                         st.metric("📝 Total Score", f"{user_data['total_score']}/{user_data['total_questions']}")
                     
+                    user_rank = get_user_rank(user_name)
+                    if user_rank:
+                        rank, ranked_users, top_percent = user_rank
+                        st.markdown(f"🏅 **Rank #{rank}** of {ranked_users} students (top {top_percent}%)")
+                    
+                    trend = get_accuracy_trend(user_data)
+                    if len(trend) > 1:
+                        with st.expander("📈 Accuracy Trend"):
+                            st.dataframe(trend, hide_index=True, use_container_width=True)
+                    
                     st.markdown("---")
                     st.markdown("**Recent Attempts:**")
                     
@@ -1876,41 +1962,158 @@ def leaderboard_tile():
                 st.warning("👤 Please login to view your scores!")
         
         with lb_tab3:
-            st.markdown("### 📋 All Users Overview")
+            all_scores_view()
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+
+def word_difficulty_tile():
+    """Which words students miss most, per word list, from every graded quiz answer."""
+    with st.container():
+        st.markdown('<div class="tile"><div class="tile-title">📊 Word Difficulty</div>', unsafe_allow_html=True)
+        st.caption("👩‍🏫 For teachers: miss rates and the most common misspellings across all students.")
+        
+        tables = word_difficulty_tables()
+        if not tables:
+            st.info("📭 No quiz answers recorded yet. Stats appear here once students start taking quizzes.")
+        else:
+            col_list, col_min = st.columns([2, 1])
+            with col_list:
+                list_name = st.selectbox("Word list", options=sorted(tables), key="word_difficulty_list")
+            with col_min:
+                min_attempts = st.number_input("Min. attempts", min_value=1, value=1, step=1, key="word_difficulty_min_attempts")
             
-            all_scores = load_leaderboard()
+            rows = [row for row in tables[list_name] if row['Attempts'] >= min_attempts]
+            attempts = sum(row['Attempts'] for row in rows)
+            misses = sum(row['Misses'] for row in rows)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("📝 Words Attempted", len(rows))
+            with col2:
+                st.metric("🎯 Answers", attempts)
+            with col3:
+                st.metric("❌ Overall Miss Rate", f"{100 * misses / attempts:.1f}%" if attempts else "–")
             
-            if all_scores:
-                st.info(f"Showing {len(all_scores)} users")
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def grade_paper_test(text, year, category):
+    """Grade an answer sheet CSV against a yearly list, cached per (file, list) so the
+    reruns while a teacher looks through the results (or saves them) don't re-grade it."""
+    numbered, list_name = load_numbered_list(year, category)
+    rows, problems = read_answer_sheet(text)
+    graded, grade_problems = grade_answer_sheet(rows, numbered)
+    return graded, sorted(problems + grade_problems), list_name
+
+def paper_test_tile():
+    """Grade a paper or form spelling test, uploaded as a CSV of answers, against a yearly list."""
+    with st.container():
+        st.markdown('<div class="tile"><div class="tile-title">📝 Grade Paper Tests</div>', unsafe_allow_html=True)
+        st.caption("👩‍🏫 For teachers: upload a CSV with one row per answer - **student, word number, answer** - "
+                   "and grade it against this year's list, the same way the quiz does.")
+        
+        available_years = get_available_years()
+        if not available_years:
+            st.info("📭 No yearly word lists have been added yet.")
+            st.markdown('</div>', unsafe_allow_html=True)
+            return
+        col_year, col_division = st.columns(2)
+        with col_year:
+            year = st.selectbox("📆 Year", options=available_years, key="paper_test_year")
+        categories = get_categories_for_year(year)
+        if not categories:
+            st.warning(f"📭 No word lists found for {year} yet.")
+            st.markdown('</div>', unsafe_allow_html=True)
+            return
+        with col_division:
+            category = st.selectbox(
+                "🏫 Division",
+                options=categories,
+                format_func=lambda c: c.replace('_', ' ').title(),
+                key=f"paper_test_category_{year}"
+            )
+        
+        sheet = st.file_uploader("Answer sheet (CSV)", type=["csv"], key="paper_test_csv",
+                                 help="A header row (Student, Word #, Answer) is optional. Use the word "
+                                      "numbers as printed on the list.")
+        if sheet is not None:
+            try:
+                text = sheet.getvalue().decode('utf-8-sig')
+            except UnicodeDecodeError:
+                st.error("❌ Couldn't read that file - please save it as a UTF-8 CSV.")
+                text = None
+            if text is not None:
+                with st.spinner("📝 Grading..."):
+                    graded, problems, list_name = grade_paper_test(text, year, category)
+                summary = summarize_answer_sheet(graded)
                 
-                # Convert dict to list and sort by best accuracy
-                all_users = list(all_scores.values())
-                all_users_sorted = sorted(all_users, key=lambda x: (x['best_accuracy'], x['total_score']), reverse=True)
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("👥 Students", len(summary))
+                with col2:
+                    st.metric("📝 Answers Graded", len(graded))
+                with col3:
+                    correct = sum(row['correct'] for row in graded)
+                    st.metric("🎯 Class Accuracy", f"{100 * correct / len(graded):.1f}%" if graded else "–")
                 
-                # Display in a scrollable container
-                for idx, entry in enumerate(all_users_sorted, 1):
-                    accuracy_color = "#2ecc71" if entry['best_accuracy'] >= 75 else "#f39c12" if entry['best_accuracy'] >= 50 else "#e74c3c"
+                if problems:
+                    with st.expander(f"⚠️ {len(problems)} row(s) skipped"):
+                        for line, message in problems:
+                            st.write(f"Line {line}: {message}")
+                
+                if graded:
+                    st.dataframe([{
+                        'Student': total['student'],
+                        'Correct': total['score'],
+                        'Answered': total['total'],
+                        'Accuracy (%)': total['accuracy'],
+                    } for total in summary], hide_index=True, use_container_width=True)
                     
-                    st.markdown(f"""
-                    <div style='background: #f8f9fa; 
-                                padding: 0.7em; 
-                                border-radius: 6px; 
-                                margin: 0.3em 0;
-                                border-left: 3px solid {accuracy_color};'>
-                        <p style='margin: 0; font-size: 0.9em; color: #2a3b5d;'>
-                            <strong>#{idx} {entry['name']}</strong>
-                        </p>
-                        <p style='margin: 0.2em 0 0 0; font-size: 0.8em; color: #636e72;'>
-                            Best: {entry['best_accuracy']}% | Avg: {entry['avg_accuracy']}% | 
-                            {entry['total_quizzes']} quiz(es) | Total: {entry['total_score']}/{entry['total_questions']}
-                        </p>
-                        <p style='margin: 0.2em 0 0 0; font-size: 0.75em; color: #95a5a6;'>
-                            Last quiz: {entry['last_quiz_date']}
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
-            else:
-                st.info("📭 No scores recorded yet. Be the first to complete a quiz!")
+                    results = [{
+                        'Student': row['student'],
+                        'Word #': row['number'],
+                        'Word': row['word'],
+                        'Answer': row['answer'],
+                        'Result': "✅ Correct" if row['correct'] else
+                                  "❌ Capitalization" if row['error_type'] == 'case' else "❌ Spelling",
+                        'Similarity (%)': round(row['similarity'], 1),
+                    } for row in graded]
+                    with st.expander("📋 View Every Answer", expanded=False):
+                        st.dataframe(results, hide_index=True, use_container_width=True)
+                    
+                    csv_lines = ["Student,Word #,Word,Answer,Correct,Error Type,Similarity (%)"]
+                    for row in graded:
+                        csv_lines.append(",".join(
+                            '"' + str(value).replace('"', '""') + '"' for value in (
+                                row['student'], row['number'], row['word'], row['answer'],
+                                "yes" if row['correct'] else "no", row['error_type'] or "",
+                                round(row['similarity'], 1))))
+                    st.download_button("⬇️ Download Graded CSV", data="\n".join(csv_lines) + "\n",
+                                       file_name=f"graded_{year}_{category}.csv", mime="text/csv",
+                                       key="paper_test_download")
+                    
+                    # Saving writes other students' scores, so only a logged-in user may do it,
+                    # and each sheet only once (save_answer_sheet checks across sessions too)
+                    sheet_key = answer_sheet_key(text, list_name)
+                    saved_sheets = st.session_state.setdefault('saved_paper_tests', set())
+                    if not st.session_state.get('name_submitted'):
+                        st.info("🔐 Log in (in the Pronunciation Quiz tab) to save these results to the leaderboard.")
+                    elif sheet_key in saved_sheets:
+                        st.success("✅ These results are saved to the leaderboard.")
+                    elif st.button("💾 Save Results to Leaderboard", key="paper_test_save", type="primary"):
+                        try:
+                            count = save_answer_sheet(graded, list_name, sheet_key, st.session_state.username)
+                            saved_sheets.add(sheet_key)
+                            st.success(f"✅ Saved results for {count} students to the leaderboard and word stats.")
+                        except ValueError as e:
+                            saved_sheets.add(sheet_key)
+                            st.warning(f"⚠️ {e}")
+                        except Exception as e:
+                            st.error(f"Error saving results: {e}")
+                    else:
+                        st.caption("Students are matched to accounts by username or full name; anyone without an "
+                                   "account is added to the leaderboard under the name in the sheet.")
         
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -2034,23 +2237,36 @@ rate_slider = st.slider("Adjust speech rate (%)", min_value=30, max_value=150, v
 # Display sidebar leaderboard
 sidebar_leaderboard()
 
-# Create tabs for different features
-tab1, tab2, tab3, tab4 = st.tabs([
-    "🎯 Pronunciation Quiz",
-    "📝 Spelling Checker & Pronunciation Helper",
-    "📄 PDF Word Pronunciation",
-    "✍️ Manual Word Pronunciation"
-])
+# Feature navigation. A radio (rather than st.tabs) so only the selected feature is
+# rendered - st.tabs executes every tab's body on every rerun, even the hidden ones.
+active_tab = st.radio(
+    "Feature",
+    options=[
+        "🎯 Pronunciation Quiz",
+        "🏆 Leaderboard",
+        "📝 Spelling Checker & Pronunciation Helper",
+        "📄 PDF Word Pronunciation",
+        "✍️ Manual Word Pronunciation",
+        "📊 Word Difficulty",
+        "📝 Grade Paper Tests"
+    ],
+    key="active_tab",
+    horizontal=True,
+    label_visibility="collapsed"
+)
 
-with tab1:
+if active_tab == "🎯 Pronunciation Quiz":
     # Pronunciation Quiz Tile (full width)
     quiz_tile(speech_rate=rate_slider)
 
-with tab2:
+elif active_tab == "🏆 Leaderboard":
+    leaderboard_tile()
+
+elif active_tab == "📝 Spelling Checker & Pronunciation Helper":
     # Spelling Checker Tile (full width)
     spelling_checker_tile(speech_rate=rate_slider)
 
-with tab3:
+elif active_tab == "📄 PDF Word Pronunciation":
     with st.container():
         st.markdown('<div class="tile"><div class="tile-title">📄 PDF Word Pronunciation</div>', unsafe_allow_html=True)
         st.caption("💡 Ask a parent or teacher for help picking the file if you're not sure!")
@@ -2058,7 +2274,7 @@ with tab3:
         pdf_words = []
         if pdf_file is not None:
             with st.spinner("📖 Reading your PDF..."):
-                text = read_pdf_text(pdf_file)
+                text = read_pdf_with_progress(pdf_file)
                 pdf_words = extract_words_from_text(text)
             st.write(f"Extracted {len(pdf_words)} unique words from PDF.")
             selected_word = st.selectbox("Select a word to learn pronunciation:", pdf_words)
@@ -2071,7 +2287,7 @@ with tab3:
                 st.warning("Pronunciation not found for this word.")
         st.markdown('</div>', unsafe_allow_html=True)
 
-with tab4:
+elif active_tab == "✍️ Manual Word Pronunciation":
     with st.container():
         st.markdown('<div class="tile"><div class="tile-title">⌨️ Manual Word Pronunciation</div>', unsafe_allow_html=True)
         word = st.text_input("Enter a word:")
@@ -2084,3 +2300,9 @@ with tab4:
             else:
                 st.warning("Pronunciation not found for this word.")
         st.markdown('</div>', unsafe_allow_html=True)
+
+elif active_tab == "📊 Word Difficulty":
+    word_difficulty_tile()
+
+elif active_tab == "📝 Grade Paper Tests":
+    paper_test_tile()
@@ -0,0 +1,509 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, so run a single app process there
+    fcntl = None
+
+# JSON persistence for users.json and leaderboard.json. Like pdf_extraction.py, this lives
+# outside spellbowl.py (which runs Streamlit commands at import time) so the writer thread and
+# non-Streamlit code can use it.
+
+WRITE_BATCH_SECONDS = 0.05  # after the first queued change, wait this long to collect a batch
+WRITE_RETRY_SECONDS = 1.0   # back-off before retrying a batch whose write failed
+FLUSH_TIMEOUT_SECONDS = 10  # how long flush() (and interpreter exit) waits for queued writes
+
+
+def atomic_write_json(path, data):
+    """Write `data` to a temp file next to `path`, fsync it, then rename it over `path`, so a
+    reader only ever sees the old file or the complete new one - never a half-written file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class VersionFile:
+    """A change counter kept next to a data file (`<file>.version`), which doubles as the
+    cross-process lock for that file. Several app processes (e.g. Streamlit workers behind a
+    load balancer) can share the data files: every write happens under the exclusive lock and
+    bumps the counter, and readers use the counter to notice that a file changed under them."""
+
+    WIDTH = 20  # fixed-width counter, rewritten in place with a single write
+
+    def __init__(self, path):
+        self.path = path
+
+    def read(self):
+        """The current version without taking the lock (None if unknown)."""
+        try:
+            with open(self.path, 'rb') as f:
+                return int(f.read(self.WIDTH))
+        except (OSError, ValueError):
+            return None
+
+    @contextmanager
+    def locked(self, exclusive=True):
+        """Hold the file lock; yields a _LockedCounter for reading/bumping the version."""
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield _LockedCounter(fd, self.WIDTH)
+        finally:
+            os.close(fd)  # also releases the lock
+
+
+class _LockedCounter:
+    def __init__(self, fd, width):
+        self.fd = fd
+        self.width = width
+
+    def get(self):
+        """The stored version, or None if the version file was only just created."""
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        try:
+            return int(os.read(self.fd, self.width))
+        except ValueError:
+            return None
+
+    def set(self, version):
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        os.write(self.fd, str(version).rjust(self.width).encode())
+        return version
+
+
+class PendingWrite:
+    """A change (a mutation or a log record) queued on a write-behind store; result() waits
+    until it is on disk."""
+
+    def __init__(self, change):
+        self.change = change
+        # Set by the writer, before the change reaches disk, to the version (JSON files) or log
+        # sequence number (logs) it is written at; load() uses it to skip a queued change that
+        # is already in the data it read
+        self.committed_at = None
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def _finish(self, result=None, error=None):
+        self._result, self._error = result, error
+        self._done.set()
+
+    def result(self, timeout=FLUSH_TIMEOUT_SECONDS):
+        """The mutation's return value once written; re-raises anything the mutation raised."""
+        if not self._done.wait(timeout):
+            raise TimeoutError("timed out waiting for the change to be saved")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class _WriteBehindQueue:
+    """An in-process queue of changes drained by a single writer thread. Each wake-up takes
+    everything queued so far as one batch and hands it to _write_batch(), so a burst of saves
+    costs one disk write. A batch that fails to write stays queued and is retried; queued
+    changes are flushed when the interpreter exits."""
+
+    def __init__(self, name, version_path):
+        self.last_error = None  # the most recent failed write, cleared by the next good one
+        self.version_file = VersionFile(version_path)
+        self._views = {}  # name -> (data signature, value), see cached()
+        self._queued_changes = 0
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"writer:{name}")
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _queued(self):
+        with self._lock:
+            return list(self._pending)
+
+    def _enqueue(self, write):
+        with self._changed:
+            self._pending.append(write)
+            self._queued_changes += 1
+            self._changed.notify_all()
+        return write
+
+    def _data_paths(self):
+        """Files whose mtime/size are part of the data signature."""
+        raise NotImplementedError
+
+    def _signature(self):
+        """Changes whenever load() could return something different: a write by any process
+        bumps the version, a hand edit changes a file's mtime/size, and a change queued here
+        bumps the local count."""
+        stats = []
+        for path in self._data_paths():
+            try:
+                st = os.stat(path)
+                stats.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stats.append(None)
+        return self.version(), tuple(stats), self._queued_changes
+
+    def cached(self, name, build):
+        """build(self.load()), shared by every session in the process and only rebuilt when
+        the data changes - otherwise a call costs a few stat() calls, no parsing. `name` keys
+        the cache (Streamlit re-creates functions on each rerun, so they can't be the key).
+        The result is shared: treat it as read-only."""
+        signature = self._signature()
+        with self._lock:
+            view = self._views.get(name)
+            if view is not None and view[0] == signature:
+                return view[1]
+        value = build(self.load())
+        with self._lock:
+            self._views[name] = (signature, value)
+        return value
+
+    def version(self):
+        """Change counter for the data on disk (shared by all processes); None if unknown."""
+        return self.version_file.read()
+
+    def flush(self, timeout=FLUSH_TIMEOUT_SECONDS):
+        """Wait until every queued change is on disk. Returns False on timeout."""
+        with self._changed:
+            return self._changed.wait_for(lambda: not self._pending, timeout)
+
+    def _write_batch(self, batch):
+        """Persist `batch` (a list of PendingWrite); returns one (result, error) per write."""
+        raise NotImplementedError
+
+    def _run(self):
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._pending)
+            time.sleep(WRITE_BATCH_SECONDS)  # let a burst of saves (e.g. a class finishing) share a write
+            batch = self._queued()
+            try:
+                outcomes = self._write_batch(batch)
+            except Exception as e:
+                # Keep the batch queued and retry; readers still see it meanwhile
+                self.last_error = e
+                time.sleep(WRITE_RETRY_SECONDS)
+                continue
+
+            self.last_error = None
+            for write, (result, error) in zip(batch, outcomes):
+                write._finish(result, error)
+            with self._changed:
+                for _ in batch:
+                    self._pending.popleft()
+                self._changed.notify_all()
+
+
+class WriteBehindJsonFile(_WriteBehindQueue):
+    """A JSON file whose changes go through a write-behind queue.
+
+    update(mutate) queues a function that changes the loaded data in place and returns at once;
+    the writer applies each batch to a fresh read of the file and writes it back atomically,
+    holding the cross-process lock from the read to the write so concurrent processes can't
+    overwrite each other's changes. load() replays changes that are still queued, so callers
+    always see their own writes.
+
+    Mutations are applied more than once (by every load() while queued, then by the writer),
+    so they must be deterministic - capture timestamps when queuing, not inside the mutation -
+    and should raise before changing anything if they reject the change."""
+
+    def __init__(self, path, default=dict, convert=None):
+        self.path = path
+        self.default = default
+        self.convert = convert  # optional fix-up applied to the parsed file (e.g. legacy formats)
+        super().__init__(os.path.basename(path), path + '.version')
+
+    def _data_paths(self):
+        return (self.path,)
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return self.default()
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        return self.convert(data) if self.convert else data
+
+    def load(self):
+        """The file's data with any still-queued changes applied."""
+        # Take the queue before reading: a change written in between is then both in the queue
+        # and on disk, and is skipped by its committed_at. The shared lock keeps the version
+        # and the file contents in step.
+        pending = self._queued()
+        with self.version_file.locked(exclusive=False) as counter:
+            version = counter.get() or 0
+            data = self._read()
+        for write in pending:
+            if write.committed_at is not None and write.committed_at <= version:
+                continue
+            try:
+                write.change(data)
+            except Exception:
+                pass  # a rejected change is reported to its caller by the writer
+        return data
+
+    def update(self, mutate):
+        """Queue `mutate(data)` to be applied and saved; returns a PendingWrite."""
+        return self._enqueue(PendingWrite(mutate))
+
+    def _write_batch(self, batch):
+        with self.version_file.locked() as counter:
+            data = self._read()
+            version = (counter.get() or 0) + 1
+            outcomes = []
+            for write in batch:
+                write.committed_at = version
+                try:
+                    outcomes.append((write.change(data), None))
+                except Exception as e:
+                    outcomes.append((None, e))
+            atomic_write_json(self.path, data)
+            counter.set(version)
+        return outcomes
+
+
+COMPACT_AFTER_RECORDS = 200  # fold the log into the snapshot once it holds this many records
+
+
+class SnapshotLog(_WriteBehindQueue):
+    """Aggregate data kept as a JSON snapshot plus an append-only JSONL log of records.
+
+    append(record) queues a record; the writer appends each batch to the log with a single
+    fsync, so a save costs O(1) no matter how big the aggregate has grown. load() reads the
+    snapshot and folds in the log records it doesn't cover yet - fold(data, record) updates the
+    aggregate in place - plus records still queued. Once the log holds COMPACT_AFTER_RECORDS
+    records it is compacted: the folded result is written as the new snapshot (atomically),
+    then the log is emptied.
+
+    Every log record carries a sequence number and the snapshot stores the last one it
+    includes, so a crash between writing the snapshot and emptying the log can't apply a
+    record twice. A torn last line from a crash mid-append is ignored, and cut off before the
+    next append.
+
+    Sequence numbers come from the shared version counter, reserved under the cross-process
+    lock before appending, so several processes can append to the same log. Readers hold the
+    shared lock while reading the snapshot and the log: a compaction replaces one and empties
+    the other, and a reader that saw the old snapshot but the emptied log would lose records.
+
+    The snapshot starts with a schema header: {"schema": n, "log_seq": seq, "data": ...}.
+    A snapshot with an older schema, or none at all (files from before the header existed), is
+    upgraded by migrate(data, old_schema) - old_schema is None when there was no header - and
+    written back atomically the first time this process touches the file, so later loads are a
+    straight parse."""
+
+    def __init__(self, snapshot_path, log_path, fold, default=dict, schema=1, migrate=None):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.fold = fold
+        self.default = default
+        self.schema = schema
+        self.migrate = migrate
+        self._schema_checked = False
+        self.compact_error = None  # the most recent failed auto-compaction, cleared by the next good one
+        super().__init__(os.path.basename(log_path), snapshot_path + '.version')
+
+    def _data_paths(self):
+        return (self.snapshot_path, self.log_path)
+
+    def _parse_snapshot(self):
+        """(data, seq of the last record folded into it, schema) as stored on disk."""
+        if not os.path.exists(self.snapshot_path):
+            return self.default(), 0, self.schema
+        with open(self.snapshot_path, 'r') as f:
+            snapshot = json.load(f)
+        if isinstance(snapshot, dict) and 'log_seq' in snapshot and 'data' in snapshot:
+            return snapshot['data'], snapshot['log_seq'], snapshot.get('schema')
+        return snapshot, 0, None  # written before the log existed
+
+    def _read_snapshot(self):
+        """(data in the current schema, seq of the last record folded into it)."""
+        data, seq, schema = self._parse_snapshot()
+        if schema != self.schema and self.migrate:
+            # Only if the file was replaced after _ensure_migrated() ran (e.g. restored from a
+            # backup); upgraded in memory here and persisted by the next compaction
+            data = self.migrate(data, schema)
+        return data, seq
+
+    def _ensure_migrated(self, counter=None):
+        """Persist the snapshot in the current schema, once per process. Takes the lock unless
+        the caller already holds it (passing its `counter`)."""
+        if self._schema_checked:
+            return
+        if counter is None:
+            with self.version_file.locked() as counter:
+                return self._ensure_migrated(counter)
+        data, seq, schema = self._parse_snapshot()
+        if schema != self.schema and os.path.exists(self.snapshot_path):
+            if self.migrate:
+                data = self.migrate(data, schema)
+            version = counter.get()
+            if version is None:  # no version file yet: continue after the last seq on disk
+                version = max([seq] + [record['seq'] for record in self._read_log()])
+            self._write_snapshot(data, seq)
+            counter.set(version + 1)
+        self._schema_checked = True
+
+    def _write_snapshot(self, data, seq):
+        atomic_write_json(self.snapshot_path, {'schema': self.schema, 'log_seq': seq, 'data': data})
+
+    def _read_log(self):
+        """All complete records in the log, in order."""
+        records = []
+        if not os.path.exists(self.log_path):
+            return records
+        with open(self.log_path, 'r') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break  # torn (or still being appended by another process); never acknowledged
+                records.append(json.loads(line))
+        return records
+
+    def _read(self):
+        """(folded data, last seq on disk, number of log records)."""
+        data, snapshot_seq = self._read_snapshot()
+        last_seq, log_records = snapshot_seq, 0
+        for record in self._read_log():
+            log_records += 1
+            last_seq = max(last_seq, record['seq'])
+            if record['seq'] > snapshot_seq:
+                self.fold(data, record['record'])
+        return data, last_seq, log_records
+
+    def _read_consistent(self):
+        """_read() under the shared lock, so no append or compaction is half done."""
+        with self.version_file.locked(exclusive=False):
+            return self._read()
+
+    def load(self):
+        """The aggregate with every logged and still-queued record folded in."""
+        self._ensure_migrated()
+        # Take the queue before reading: a record logged in between is then both in the queue
+        # and in what was read, and is skipped by its sequence number
+        pending = self._queued()
+        data, last_seq, _ = self._read_consistent()
+        for write in pending:
+            if write.committed_at is not None and write.committed_at <= last_seq:
+                continue
+            self.fold(data, write.change)
+        return data
+
+    def append(self, record):
+        """Queue `record` to be logged; returns a PendingWrite."""
+        return self._enqueue(PendingWrite(record))
+
+    def append_many(self, records):
+        """Queue `records` as one unit: they are enqueued together, so the writer logs them in
+        the same batch (one append, one fsync) and readers see all of them or none. Returns a
+        PendingWrite per record."""
+        writes = [PendingWrite(record) for record in records]
+        with self._changed:
+            self._pending.extend(writes)
+            self._queued_changes += len(writes)
+            self._changed.notify_all()
+        return writes
+
+    def _cut_torn_tail(self):
+        """Drop a partial last line left by a process that crashed mid-append."""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            f.seek(0)
+            f.truncate(f.read().rfind(b'\n') + 1)
+
+    def _first_log_seq(self):
+        if not os.path.exists(self.log_path):
+            return None
+        with open(self.log_path, 'r') as f:
+            line = f.readline()
+        return json.loads(line)['seq'] if line.endswith('\n') else None
+
+    def _write_batch(self, batch):
+        with self.version_file.locked() as counter:
+            self._ensure_migrated(counter)
+            last_seq = counter.get()
+            if last_seq is None:  # no version file yet, e.g. a log written by an older version
+                last_seq = self._read()[1]
+            self._cut_torn_tail()
+            # Reserve the sequence numbers before appending: a crash can leave a gap, never a duplicate
+            counter.set(last_seq + len(batch))
+            lines = []
+            for offset, write in enumerate(batch, 1):
+                write.committed_at = last_seq + offset
+                lines.append(json.dumps({'seq': write.committed_at, 'record': write.change}) + '\n')
+            with open(self.log_path, 'a') as f:
+                f.write(''.join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+
+            # The batch is on disk now: a failed compaction must not fail the batch, or the
+            # writer would retry it and append the same records again. The log is just left
+            # longer, and the next batch tries again.
+            try:
+                first_seq = self._first_log_seq()
+                if first_seq is not None and last_seq + len(batch) - first_seq + 1 >= COMPACT_AFTER_RECORDS:
+                    self._compact(counter)
+                self.compact_error = None
+            except Exception as e:
+                self.compact_error = e
+        return [(None, None)] * len(batch)
+
+    def compact(self):
+        """Fold the log into a new snapshot, then empty the log."""
+        with self.version_file.locked() as counter:
+            self._compact(counter)
+
+    def _compact(self, counter):
+        data, last_seq, _ = self._read()
+        self._write_snapshot(data, last_seq)
+        with open(self.log_path, 'w'):
+            pass
+        # Bump the version so cached() views built before the compaction are rebuilt
+        counter.set(max(counter.get() or 0, last_seq) + 1)
+
+
+_files = {}
+_files_lock = threading.Lock()
+
+
+def _shared(path, create):
+    key = os.path.abspath(path)
+    with _files_lock:
+        if key not in _files:
+            _files[key] = create()
+        return _files[key]
+
+
+def json_file(path, default=dict, convert=None):
+    """The process-wide WriteBehindJsonFile for `path`, so every session shares one writer
+    thread (and one queue) per file."""
+    return _shared(path, lambda: WriteBehindJsonFile(path, default, convert))
+
+
+def snapshot_log(snapshot_path, log_path, fold, default=dict, schema=1, migrate=None):
+    """The process-wide SnapshotLog for `snapshot_path`/`log_path`."""
+    return _shared(snapshot_path, lambda: SnapshotLog(snapshot_path, log_path, fold, default, schema, migrate))
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+import quiz_engine
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    # The stores use paths relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(quiz_engine, "QUIZ_HISTORY_RETENTION", 3)
+    monkeypatch.setattr(quiz_engine, "DAILY_ROLLUP_DAYS", 10)
+
+
+def result(day, accuracy, name="Amy Adams"):
+    return {'name': name, 'score': accuracy // 10, 'total': 10, 'accuracy': accuracy,
+            'timestamp': f"{day} 10:00:00", 'word_source': 'yearly'}
+
+
+DAYS = ["2026-01-05", "2026-01-05", "2026-01-06", "2026-03-02", "2026-03-03", "2026-03-03", "2026-03-04"]
+
+
+def test_retention_rolls_old_attempts_into_daily_then_weekly_buckets():
+    leaderboard = {}
+    for n, day in enumerate(DAYS):
+        quiz_engine.apply_quiz_result(leaderboard, result(day, 10 * (n + 1)))
+    amy = leaderboard["Amy Adams"]
+
+    assert [q['timestamp'][:10] for q in amy['quiz_history']] == DAYS[-3:]
+    # January is over DAILY_ROLLUP_DAYS before the latest attempt, so it is kept per ISO week
+    assert amy['history_rollups'] == {
+        'daily': {"2026-03-02": {'count': 1, 'accuracy_sum': 40, 'best_accuracy': 40, 'score': 4, 'total': 10}},
+        'weekly': {"2026-W02": {'count': 3, 'accuracy_sum': 60, 'best_accuracy': 30, 'score': 6, 'total': 30}},
+    }
+    assert (amy['total_quizzes'], amy['accuracy_sum'], amy['avg_accuracy']) == (7, 280, 40.0)
+    trend = quiz_engine.get_accuracy_trend(amy)
+    assert [row['Period'] for row in trend] == ["Week 2026-W02", "2026-03-02", "2026-03-03", "2026-03-04"]
+    assert sum(row['Quizzes'] for row in trend) == 7
+    assert amy['windows']['day'] == {"2026-03-04": {
+        'count': 1, 'accuracy_sum': 70, 'best_accuracy': 70, 'score': 7, 'total': 10}}
+    assert amy['windows']['month']["2026-03"]['count'] == 4
+
+
+def test_legacy_leaderboard_is_migrated_to_the_current_schema_once(tmp_path):
+    legacy = [result(day, 10 * (n + 1)) for n, day in enumerate(DAYS)] + [result("2026-03-04", 90, "Ben")]
+    (tmp_path / quiz_engine.LEADERBOARD_FILE).write_text(json.dumps(legacy))
+
+    leaderboard = quiz_engine.leaderboard_file().load()
+
+    expected = {}
+    for record in legacy:
+        quiz_engine.apply_quiz_result(expected, record)
+    assert leaderboard == expected  # the same as if every result had gone through the log
+    snapshot = json.loads((tmp_path / quiz_engine.LEADERBOARD_FILE).read_text())
+    assert (snapshot['schema'], snapshot['log_seq'], snapshot['data']) == (
+        quiz_engine.LEADERBOARD_SCHEMA, 0, expected)
@@ -0,0 +1,76 @@
+import pytest
+
+import quiz_engine
+
+NUMBERED = {1: "aardvark", 2: "Big Dipper", 5: "o'clock"}
+SHEET = "Student,Word #,Answer\namy,1,aardvark\namy,2,big dipper\nBen Brown,5,oclock\n"
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    # The stores use paths relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    quiz_engine.users_file().update(lambda users: users.update(
+        {'amy': {'password': 'pw', 'full_name': 'Amy Adams', 'total_quizzes': 0, 'best_score': 0}})).result()
+
+
+def graded_sheet(text=SHEET):
+    rows, problems = quiz_engine.read_answer_sheet(text)
+    graded, _ = quiz_engine.grade_answer_sheet(rows, NUMBERED)
+    return graded, problems
+
+
+def leaderboard_names():
+    quiz_engine.leaderboard_file().flush()
+    return sorted(quiz_engine.leaderboard_file().load())
+
+
+def test_header_after_blank_lines_is_recognised():
+    rows, problems = quiz_engine.read_answer_sheet("\n\n" + SHEET)
+    assert problems == []
+    assert [row[1:] for row in rows] == [("amy", 1, "aardvark"), ("amy", 2, "big dipper"),
+                                         ("Ben Brown", 5, "oclock")]
+
+
+def test_sheet_is_saved_once():
+    graded, _ = graded_sheet()
+    key = quiz_engine.answer_sheet_key(SHEET, "2026/junior")
+    assert quiz_engine.save_answer_sheet(graded, "2026/junior", key, "teacher") == 2
+    with pytest.raises(ValueError, match="already saved by teacher"):
+        quiz_engine.save_answer_sheet(graded, "2026/junior", key, "teacher")
+    assert 'saving' not in quiz_engine.paper_tests_file().load()[key]
+    assert leaderboard_names() == ["Amy Adams", "Ben Brown"]
+
+
+def test_failed_save_can_be_retried(monkeypatch):
+    graded, _ = graded_sheet()
+    key = quiz_engine.answer_sheet_key(SHEET, "2026/junior")
+
+    def fail(users, username, accuracy):
+        raise OSError("disk full")
+
+    record_user_quiz = quiz_engine.record_user_quiz
+    monkeypatch.setattr(quiz_engine, "record_user_quiz", fail)
+    with pytest.raises(OSError):
+        quiz_engine.save_answer_sheet(graded, "2026/junior", key, "teacher")
+    quiz_engine.paper_tests_file().flush()
+    assert key not in quiz_engine.paper_tests_file().load()
+
+    monkeypatch.setattr(quiz_engine, "record_user_quiz", record_user_quiz)
+    assert quiz_engine.save_answer_sheet(graded, "2026/junior", key, "teacher") == 2
+    assert quiz_engine.users_file().load()['amy']['total_quizzes'] == 1
+
+
+def test_sheet_being_saved_is_not_saved_twice():
+    graded, _ = graded_sheet()
+    key = quiz_engine.answer_sheet_key(SHEET, "2026/junior")
+    started = quiz_engine.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    quiz_engine.paper_tests_file().update(lambda sheets: sheets.update(
+        {key: {'list': "2026/junior", 'saved_by': "other", 'timestamp': started, 'saving': "x"}})).result()
+    with pytest.raises(ValueError, match="being saved by other"):
+        quiz_engine.save_answer_sheet(graded, "2026/junior", key, "teacher")
+
+    # ...unless that save died long ago
+    quiz_engine.paper_tests_file().update(lambda sheets: sheets[key].update(
+        {'timestamp': "2020-01-01 00:00:00"})).result()
+    assert quiz_engine.save_answer_sheet(graded, "2026/junior", key, "teacher") == 2
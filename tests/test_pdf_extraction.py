@@ -0,0 +1,72 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from pdf_extraction import (
+    _collapse_spaced_hyphens, _numbered_entries, dedupe_and_sort_words, extract_words,
+    iter_page_texts, read_pdf_text,
+)
+
+APP_DIR = Path(__file__).resolve().parent.parent
+GOLDEN_DIR = Path(__file__).resolve().parent / "golden"
+BUNDLED_PDFS = sorted(APP_DIR.glob("2026/*/*.pdf"))
+
+
+def golden_entries(pdf_path):
+    """The list entries expected from a bundled PDF, as "number. entry" lines in list order."""
+    golden = GOLDEN_DIR / f"2026-{pdf_path.parent.name}.txt"
+    return golden.read_text(encoding="utf-8").splitlines()
+
+
+@pytest.mark.parametrize("pdf_path", BUNDLED_PDFS, ids=lambda p: p.parent.name)
+def test_bundled_list_matches_golden_file(pdf_path):
+    text = read_pdf_text(pdf_path)
+    entries = [f"{number}. {entry}" for number, entry in _numbered_entries(text)]
+    assert entries == golden_entries(pdf_path)
+    assert extract_words(text) == dedupe_and_sort_words(line.split(". ", 1)[1] for line in entries)
+
+
+@pytest.mark.parametrize("pdf_path", BUNDLED_PDFS, ids=lambda p: p.parent.name)
+def test_collapse_spaced_hyphens_matches_regex(pdf_path):
+    raw = "".join(page + "\n" for page in iter_page_texts(pdf_path))
+    raw += "good -natured  far - fetched  x -1  -- re -  entry  é -é"
+    assert _collapse_spaced_hyphens(raw) == re.sub(r'([^\W\d_])\s+-\s*([^\W\d_])', r'\1-\2', raw)
+
+
+def test_golden_files_cover_every_bundled_list():
+    assert len(BUNDLED_PDFS) == 3
+    assert {f"2026-{p.parent.name}.txt" for p in BUNDLED_PDFS} == {g.name for g in GOLDEN_DIR.iterdir()}
+
+
+def test_parallel_read_matches_serial_read(tmp_path, monkeypatch):
+    import pdf_extraction
+    import pypdf
+
+    # Single-column (elementary) and multi-column (senior) pages interleaved, so pages handled
+    # by the same worker need different extraction modes
+    writer = pypdf.PdfWriter()
+    elementary = pypdf.PdfReader(APP_DIR / "2026/elementary/ElementarySpellBowlList.pdf").pages
+    senior = pypdf.PdfReader(APP_DIR / "2026/senior/SeniorSpellBowlList.pdf").pages
+    for plain_page, layout_page in zip(elementary, senior):
+        writer.add_page(plain_page)
+        writer.add_page(layout_page)
+    pdf_path = tmp_path / "mixed.pdf"
+    with open(pdf_path, "wb") as f:
+        writer.write(f)
+
+    def read():
+        page_info = []
+        text = read_pdf_text(pdf_path, page_info=page_info)
+        return text, page_info
+
+    monkeypatch.setattr(pdf_extraction, "PARALLEL_MIN_PAGES", 10_000)
+    serial_text, serial_info = read()
+    monkeypatch.setattr(pdf_extraction, "PARALLEL_MIN_PAGES", 1)
+    monkeypatch.setattr(pdf_extraction, "PDF_WORKERS", 2)
+    parallel_text, parallel_info = read()
+
+    assert [info['mode'] for info in serial_info] == ['plain', 'layout'] * 4
+    assert parallel_info == serial_info
+    assert parallel_text == serial_text
+    assert extract_words(parallel_text) == extract_words(serial_text)
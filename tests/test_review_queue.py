@@ -0,0 +1,26 @@
+from quiz_engine import ReviewQueue
+
+
+def _record(due):
+    return {'ef': 2.5, 'interval': 1, 'reps': 1, 'lapses': 0, 'attempts': 1, 'due': due, 'last_review': due}
+
+
+def test_next_due_only_looks_at_the_quizzed_list():
+    records = {f"other{n}": _record("2020-01-01") for n in range(1000)}
+    records.update({"beta": _record("2020-02-02"), "alpha": _record("2020-02-01")})
+    queue = ReviewQueue("amy", records)
+    words = ["alpha", "beta", "gamma"]
+
+    assert queue.next_due(words, "2026/junior") == "alpha"
+    assert len(queue.list_heaps["2026/junior"][1]) == 2  # the other lists' due words aren't in it
+    assert queue.next_due(["beta", "gamma"], "2026/junior") == "beta"  # alpha skipped, still due
+    assert queue.next_due(words, "2026/junior") == "alpha"
+
+
+def test_next_due_follows_reviews_and_words_added_while_loading():
+    queue = ReviewQueue("amy", {"alpha": _record("2020-02-01"), "delta": _record("2020-01-01")})
+    assert queue.next_due(["alpha", "beta"], "2026/junior") == "alpha"
+
+    queue.review("alpha", 5, "2026-10-19")  # answered: due again in days, not today
+    assert queue.next_due(["beta"], "2026/junior") is None
+    assert queue.next_due(["beta", "delta"], "2026/junior") == "delta"  # loaded later
@@ -0,0 +1,137 @@
+import importlib.util
+import json
+
+import pytest
+
+import smart_extraction
+
+
+def _write_parity(model_dir, matches):
+    model_dir.mkdir(parents=True)
+    (model_dir / smart_extraction.ONNX_PARITY_FILE).write_text(json.dumps({"matches": matches}))
+
+
+@pytest.fixture
+def onnx_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(smart_extraction, "NER_ONNX_DIR", tmp_path)
+    monkeypatch.setattr(smart_extraction, "onnx_backend_available", lambda: True)
+    monkeypatch.setattr(smart_extraction, "_load_exported_onnx", lambda model_dir: "onnx")
+    monkeypatch.setattr(smart_extraction, "_load_torch_ner", lambda model_name, quantize=False: "torch")
+    return tmp_path
+
+
+def test_auto_uses_onnx_export_only_once_it_matched_torch(onnx_cache):
+    _write_parity(smart_extraction.onnx_model_dir(), matches=True)
+    assert smart_extraction.onnx_backend_verified()
+    assert smart_extraction.load_ner(backend="auto") == "onnx"
+
+
+def test_auto_falls_back_to_torch_when_onnx_export_differs(onnx_cache, monkeypatch):
+    _write_parity(smart_extraction.onnx_model_dir(), matches=False)
+    monkeypatch.setattr(smart_extraction, "export_onnx_model", pytest.fail)  # never re-exported
+    assert not smart_extraction.onnx_backend_verified()
+    assert smart_extraction.load_ner(backend="auto") == "torch"
+    assert smart_extraction.load_ner(backend="onnx") == "onnx"  # still available when asked for
+
+
+def test_ner_backend_names_the_backend_that_actually_loaded(onnx_cache, monkeypatch):
+    monkeypatch.setattr(smart_extraction, "_loaded_backends", {})
+
+    def broken_int8(model_name, quantize=False):
+        if quantize:
+            raise RuntimeError("no quantized kernels on this CPU")
+        return "torch"
+
+    monkeypatch.setattr(smart_extraction, "_load_torch_ner", broken_int8)
+    assert smart_extraction.ner_backend(backend="int8") == "int8"  # what it will try first
+    assert smart_extraction.load_ner(backend="int8") == "torch"
+    assert smart_extraction.ner_backend(backend="int8") == "torch"
+
+    _write_parity(smart_extraction.onnx_model_dir(), matches=True)
+    assert smart_extraction.ner_backend(backend="auto") == "onnx"
+    assert smart_extraction.load_ner(backend="auto") == "onnx"
+    assert smart_extraction.ner_backend(backend="auto") == "onnx"
+
+
+@pytest.mark.skipif(
+    not all(importlib.util.find_spec(name) for name in ("torch", "transformers", "optimum")),
+    reason="needs the packages in requirements-optional.txt")
+def test_onnx_export_finds_same_phrases_as_torch_on_bundled_lists(tmp_path, monkeypatch):
+    monkeypatch.setattr(smart_extraction, "NER_ONNX_DIR", tmp_path)
+    parity = smart_extraction.export_onnx_model()
+    assert parity["mismatches"] == {}
+    assert smart_extraction.onnx_backend_verified()
+
+
+@pytest.mark.skipif(
+    not all(importlib.util.find_spec(name) for name in ("torch", "transformers")),
+    reason="needs the packages in requirements-optional.txt")
+def test_int8_model_finds_nearly_the_same_phrases_as_torch_on_bundled_lists():
+    # Quantizing costs a little accuracy, so unlike the ONNX export it needn't match exactly
+    int8_pipe = smart_extraction._load_torch_ner(smart_extraction.NER_MODEL, quantize=True)
+    torch_pipe = smart_extraction._load_torch_ner(smart_extraction.NER_MODEL)
+    for name, text in smart_extraction.bundled_list_texts().items():
+        found = smart_extraction.extract_ner_phrases(text, int8_pipe)
+        expected = smart_extraction.extract_ner_phrases(text, torch_pipe)
+        assert len(found ^ expected) <= max(2, len(expected) // 20), name
+
+
+def _words(piece):
+    return len(piece.split())
+
+
+def test_chunks_keep_whole_lines_and_stay_within_budget():
+    text = "\n".join(f"{n}. word{n} and more" for n in range(1, 41))  # 4 words a line
+    chunks = smart_extraction.chunk_text_for_ner(text, 20, overlap_lines=2, size=_words)
+    assert len(chunks) > 1
+    lines = set(text.splitlines())
+    for offset, chunk in chunks:
+        assert text[offset:offset + len(chunk)] == chunk
+        assert set(chunk.splitlines()) <= lines
+        assert sum(_words(line) + 1 for line in chunk.splitlines()) - 1 <= 20
+    for (_, chunk), (_, following) in zip(chunks, chunks[1:]):
+        assert chunk.splitlines()[-2:] == following.splitlines()[:2]
+    assert {line for _, chunk in chunks for line in chunk.splitlines()} == lines
+
+
+def test_long_line_is_split_into_overlapping_runs():
+    text = " ".join(f"w{n}" for n in range(100))
+    chunks = smart_extraction.chunk_text_for_ner(text, 10, size=_words)
+    for offset, chunk in chunks:
+        assert text[offset:offset + len(chunk)] == chunk
+        assert _words(chunk) <= 10
+    # every pair of neighbouring words is seen together in some chunk
+    for n in range(99):
+        assert any(f"w{n} w{n + 1}" in chunk for _, chunk in chunks)
+
+
+def test_stitch_entity_spans_merges_overlaps_and_names_cut_at_a_chunk_edge():
+    text = "Mount Rushmore and Lake Placid, Paris Texas"
+    assert smart_extraction.stitch_entity_spans([(0, 14, False), (6, 14, False)], text) == ["Mount Rushmore"]
+    assert smart_extraction.stitch_entity_spans([(19, 23, True), (24, 30, False)], text) == ["Lake Placid"]
+    assert smart_extraction.stitch_entity_spans([(32, 37, False), (38, 43, False)], text) == ["Paris", "Texas"]
+
+
+class _CapitalizedRunsPipeline:
+    """Stands in for the NER pipeline: every run of capitalized words is an entity, and the
+    "tokenizer" counts words, failing like the real model on a chunk over its input size."""
+    max_tokens = 12
+
+    def tokenizer(self, piece, add_special_tokens=True):
+        return {'input_ids': piece.split()}
+
+    def __call__(self, chunks, batch_size=None):
+        if isinstance(chunks, str):
+            if len(chunks.split()) > self.max_tokens:
+                raise ValueError("sequence too long")
+            return [{'start': m.start(), 'end': m.end()}
+                    for m in smart_extraction.re.finditer(r'[A-Z]\w+(?: [A-Z]\w+)*', chunks)]
+        return [self(chunk) for chunk in chunks]
+
+
+def test_extract_ner_phrases_sizes_chunks_with_the_tokenizer(monkeypatch):
+    monkeypatch.setattr(smart_extraction, "NER_CHUNK_TOKENS", 10)
+    filler = " ".join(["word"] * 7)  # puts a run break inside "Mount Rushmore"
+    text = f"{filler} Mount Rushmore {filler} Lake Placid {filler}\n1. Grand Canyon\n2. Yellowstone"
+    assert smart_extraction.extract_ner_phrases(text, _CapitalizedRunsPipeline()) == {
+        "Mount Rushmore", "Lake Placid", "Grand Canyon", "Yellowstone"}
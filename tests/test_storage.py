@@ -0,0 +1,228 @@
+import json
+import threading
+
+import pytest
+
+import storage
+
+
+def count(data, record):
+    data[record['k']] = data.get(record['k'], 0) + 1
+
+
+def make_log(tmp_path, **kwargs):
+    return storage.SnapshotLog(str(tmp_path / "snap.json"), str(tmp_path / "log.jsonl"), count, **kwargs)
+
+
+def test_reader_never_sees_a_half_done_compaction(tmp_path):
+    writer, reader = make_log(tmp_path), make_log(tmp_path)
+    for _ in range(3):
+        writer.append({'k': 'x'})
+    assert writer.flush()
+    assert reader.load() == {'x': 3}
+
+    # Make the reader read the snapshot, then let the compaction run before it reads the log
+    snapshot_read, log_emptied = threading.Event(), threading.Event()
+
+    def read_snapshot_then_wait():
+        result = storage.SnapshotLog._read_snapshot(reader)
+        snapshot_read.set()
+        log_emptied.wait(1)
+        return result
+
+    reader._read_snapshot = read_snapshot_then_wait
+    loaded = []
+    thread = threading.Thread(target=lambda: loaded.append(reader.load()))
+    thread.start()
+    assert snapshot_read.wait(5)
+
+    class PausingCounter:
+        """Stops _compact after it has replaced the snapshot and emptied the log, before the
+        version bump, until the reader is done."""
+        def __init__(self, counter):
+            self.counter = counter
+
+        def get(self):
+            return self.counter.get()
+
+        def set(self, version):
+            log_emptied.set()
+            thread.join(5)
+            return self.counter.set(version)
+
+    with writer.version_file.locked() as counter:
+        writer._compact(PausingCounter(counter))
+    thread.join(5)
+    assert loaded == [{'x': 3}]
+    del reader._read_snapshot
+    assert reader.load() == writer.load() == {'x': 3}
+
+
+def bump(key):
+    def mutate(data):
+        data[key] = data.get(key, 0) + 1
+        return data[key]
+    return mutate
+
+
+def test_json_file_update_returns_at_once_and_load_sees_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "WRITE_BATCH_SECONDS", 0.2)
+    store = storage.WriteBehindJsonFile(str(tmp_path / "data.json"))
+    write = store.update(bump('x'))
+    assert not (tmp_path / "data.json").exists()  # still queued
+    assert store.load() == {'x': 1}
+    assert write.result() == 1
+    assert json.loads((tmp_path / "data.json").read_text()) == {'x': 1}
+
+
+def test_json_file_writes_a_burst_as_one_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "WRITE_BATCH_SECONDS", 0.2)
+    store = storage.WriteBehindJsonFile(str(tmp_path / "data.json"))
+    writes = [store.update(bump('x')) for _ in range(20)]
+    assert store.flush()
+    assert [write.result() for write in writes] == list(range(1, 21))
+    assert store.version() == 1  # one locked read-modify-write for the lot
+    assert storage.WriteBehindJsonFile(str(tmp_path / "data.json")).load() == {'x': 20}
+
+
+def test_json_file_rejected_change_is_reported_and_the_rest_saved(tmp_path):
+    store = storage.WriteBehindJsonFile(str(tmp_path / "data.json"))
+
+    def reject(data):
+        raise ValueError("no")
+
+    good, bad = store.update(bump('x')), store.update(reject)
+    with pytest.raises(ValueError, match="no"):
+        bad.result()
+    assert good.result() == 1
+    assert store.load() == {'x': 1}
+
+
+def test_json_file_failed_write_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "WRITE_RETRY_SECONDS", 0.01)
+    real_write = storage.atomic_write_json
+    failures = []
+
+    def fail_once(path, data):
+        if not failures:
+            failures.append(path)
+            raise OSError("disk full")
+        real_write(path, data)
+
+    monkeypatch.setattr(storage, "atomic_write_json", fail_once)
+    store = storage.WriteBehindJsonFile(str(tmp_path / "data.json"))
+    assert store.update(bump('x')).result() == 1  # applied once, although its batch ran twice
+    assert failures and store.last_error is None
+    assert json.loads((tmp_path / "data.json").read_text()) == {'x': 1}
+
+
+def test_json_file_load_skips_a_queued_change_already_on_disk(tmp_path):
+    store = storage.WriteBehindJsonFile(str(tmp_path / "data.json"))
+    write = store.update(bump('x'))
+    write.result()
+    # As if load() took the queue just before the writer saved this change
+    store._queued = lambda: [write]
+    assert store.load() == {'x': 1}
+
+
+def test_json_file_cached_view_is_rebuilt_after_a_change(tmp_path):
+    store = storage.WriteBehindJsonFile(str(tmp_path / "data.json"))
+    builds = []
+
+    def build(data):
+        builds.append(data)
+        return dict(data)
+
+    assert store.cached('view', build) == {}
+    assert store.cached('view', build) == {}
+    store.update(bump('x'))
+    assert store.cached('view', build) == {'x': 1}
+    assert len(builds) == 2
+
+
+def log_lines(tmp_path):
+    return [json.loads(line) for line in (tmp_path / "log.jsonl").read_text().splitlines()]
+
+
+def test_log_is_replayed_by_a_new_process(tmp_path):
+    log = make_log(tmp_path)
+    log.append_many([{'k': 'x'}, {'k': 'y'}, {'k': 'x'}])
+    assert log.flush()
+    assert [line['seq'] for line in log_lines(tmp_path)] == [1, 2, 3]
+    assert make_log(tmp_path).load() == {'x': 2, 'y': 1}
+
+
+def test_log_is_compacted_into_the_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "COMPACT_AFTER_RECORDS", 5)
+    log = make_log(tmp_path)
+    for _ in range(3):
+        log.append({'k': 'x'})
+        assert log.flush()
+    log.append_many([{'k': 'y'}, {'k': 'y'}])
+    assert log.flush()
+    assert log_lines(tmp_path) == []
+    snapshot = json.loads((tmp_path / "snap.json").read_text())
+    assert snapshot == {'schema': 1, 'log_seq': 5, 'data': {'x': 3, 'y': 2}}
+    log.append({'k': 'x'})
+    assert log.flush()
+    assert make_log(tmp_path).load() == {'x': 4, 'y': 2}
+
+
+def test_crash_between_snapshot_and_log_truncation_applies_records_once(tmp_path):
+    log = make_log(tmp_path)
+    log.append_many([{'k': 'x'}, {'k': 'x'}])
+    assert log.flush()
+    # The snapshot already covers both records, but the log wasn't emptied
+    (tmp_path / "snap.json").write_text(json.dumps({'schema': 1, 'log_seq': 2, 'data': {'x': 2}}))
+    assert make_log(tmp_path).load() == {'x': 2}
+
+
+def test_torn_last_line_is_ignored_and_cut_before_the_next_append(tmp_path):
+    log = make_log(tmp_path)
+    log.append({'k': 'x'})
+    assert log.flush()
+    with open(tmp_path / "log.jsonl", "a") as f:
+        f.write('{"seq": 2, "record": {"k"')  # a process died mid-append
+    other = make_log(tmp_path)
+    assert other.load() == {'x': 1}
+    other.append({'k': 'y'})
+    assert other.flush()
+    assert [line['record'] for line in log_lines(tmp_path)] == [{'k': 'x'}, {'k': 'y'}]
+    assert make_log(tmp_path).load() == {'x': 1, 'y': 1}
+
+
+def test_failed_auto_compaction_does_not_append_the_batch_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "COMPACT_AFTER_RECORDS", 2)
+    log = make_log(tmp_path)
+
+    def broken_compact(counter):
+        raise OSError("disk full")
+
+    log._compact = broken_compact
+    writes = log.append_many([{'k': 'x'}, {'k': 'x'}])
+    assert [write.result() for write in writes] == [None, None]
+    assert isinstance(log.compact_error, OSError)
+    assert len(log_lines(tmp_path)) == 2
+    del log._compact
+    log.append({'k': 'x'})
+    assert log.flush()
+    assert log.compact_error is None
+    assert log_lines(tmp_path) == []
+    assert make_log(tmp_path).load() == {'x': 3}
+
+
+def test_old_snapshot_is_migrated_once_and_written_back(tmp_path):
+    (tmp_path / "snap.json").write_text(json.dumps([['x', 2], ['y', 1]]))  # from before the header
+    calls = []
+
+    def migrate(data, schema):
+        calls.append(schema)
+        return dict(data)
+
+    log = make_log(tmp_path, schema=2, migrate=migrate)
+    assert log.load() == {'x': 2, 'y': 1}
+    assert log.load() == {'x': 2, 'y': 1}
+    assert calls == [None]
+    assert json.loads((tmp_path / "snap.json").read_text()) == {
+        'schema': 2, 'log_seq': 0, 'data': {'x': 2, 'y': 1}}
+    assert make_log(tmp_path, schema=2, migrate=pytest.fail).load() == {'x': 2, 'y': 1}